@@ -0,0 +1,112 @@
+from datetime import datetime
+from uuid import UUID
+
+import numpy as np
+
+from erad.convergence import get_asset_loads
+
+
+def poisson_binomial_pmf(probabilities: np.ndarray) -> np.ndarray:
+    """Distribution of the number of successes of independent Bernoulli trials.
+
+    The probability generating function prod(1 - p + p z) is multiplied out by pairwise FFT
+    convolutions, all polynomials of one level at once, in O(n log^2 n).
+
+    Args:
+        probabilities (np.ndarray): Success probability of each trial
+
+    Returns:
+        np.ndarray: Probability of 0, 1, ..., n successes
+    """
+    probabilities = np.asarray(probabilities, dtype=float).ravel()
+    n_trials = len(probabilities)
+    # Padding trials that never succeed have the neutral polynomial 1
+    size = 1 << max(n_trials - 1, 0).bit_length()
+    polynomials = np.zeros((size, 2))
+    polynomials[:, 0] = 1.0
+    polynomials[:n_trials, 0] = 1 - probabilities
+    polynomials[:n_trials, 1] = probabilities
+    while len(polynomials) > 1:
+        length = polynomials.shape[1]
+        spectra = np.fft.rfft(polynomials, 2 * length, axis=1)
+        polynomials = np.fft.irfft(spectra[0::2] * spectra[1::2], 2 * length, axis=1)
+        polynomials = polynomials[:, : 2 * length - 1]
+    pmf = np.clip(polynomials[0, : n_trials + 1], 0, None)
+    return pmf / pmf.sum()
+
+
+class FailureStatistics:
+    """Exact failure statistics of independent assets from their survival probabilities.
+
+    An asset fails at a timestamp with probability 1 - survival, independently of the
+    other assets and timestamps, as in `HazardScenarioGenerator` sampling. The statistics
+    are the limit of the sampled ones for an infinite number of samples, except that the
+    sampler outages an asset name at most once per sample.
+    """
+
+    def __init__(
+        self,
+        survival: np.ndarray,
+        timestamps: list[datetime],
+        component_uuids: list[UUID],
+    ):
+        """Constructor for the FailureStatistics class.
+
+        Args:
+            survival (np.ndarray): Survival probabilities (assets x timestamps) in timestamp
+                order
+            timestamps (list[datetime]): Timestamps of the columns
+            component_uuids (list[UUID]): UUID of the distribution component of each asset
+        """
+        self.survival = np.asarray(survival, dtype=float)
+        self.timestamps = list(timestamps)
+        self.component_uuids = list(component_uuids)
+        if self.survival.shape != (len(self.component_uuids), len(self.timestamps)):
+            raise ValueError("survival should have shape (assets, timestamps)")
+
+    @property
+    def cumulative_failure_probabilities(self) -> np.ndarray:
+        """Probability that each asset has failed at or before each timestamp."""
+        return 1 - np.cumprod(self.survival, axis=1)
+
+    @property
+    def first_failure_probabilities(self) -> np.ndarray:
+        """Probability that each asset first fails at each timestamp (assets x timestamps)."""
+        survived_before = np.ones_like(self.survival)
+        survived_before[:, 1:] = np.cumprod(self.survival, axis=1)[:, :-1]
+        return survived_before * (1 - self.survival)
+
+    @property
+    def failure_probabilities(self) -> np.ndarray:
+        """Probability that each asset fails at any timestamp."""
+        return 1 - self.survival.prod(axis=1)
+
+    def _get_timestamp_failure_probabilities(self, timestamp_index: int | None) -> np.ndarray:
+        if timestamp_index is None:
+            return self.failure_probabilities
+        return self.cumulative_failure_probabilities[:, timestamp_index]
+
+    def expected_failed_assets(self, timestamp_index: int | None = None) -> float:
+        """Expected number of assets failed by a timestamp index, the last one if None."""
+        return float(self._get_timestamp_failure_probabilities(timestamp_index).sum())
+
+    def failed_assets_variance(self, timestamp_index: int | None = None) -> float:
+        """Variance of the number of assets failed by a timestamp index, the last one if None."""
+        probabilities = self._get_timestamp_failure_probabilities(timestamp_index)
+        return float((probabilities * (1 - probabilities)).sum())
+
+    def failed_asset_count_distribution(self, timestamp_index: int | None = None) -> np.ndarray:
+        """Probability of 0, 1, ..., n assets failed by a timestamp index, the last if None."""
+        return poisson_binomial_pmf(self._get_timestamp_failure_probabilities(timestamp_index))
+
+    def expected_outaged_load(
+        self, asset_loads: dict[UUID, float], timestamp_index: int | None = None
+    ) -> float:
+        """Expected load of the assets failed by a timestamp index, the last one if None.
+
+        Args:
+            asset_loads (dict[UUID, float]): Load of the distribution component of each asset
+            timestamp_index (int | None): Timestamp index, None for the last timestamp
+        """
+        loads = get_asset_loads(self.component_uuids, asset_loads)
+        return float(self._get_timestamp_failure_probabilities(timestamp_index) @ loads)
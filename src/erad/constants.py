@@ -18,6 +18,7 @@ from erad.enums import AssetTypes
 # Get list of continuous distributions
 
 RASTER_DOWNLOAD_PATH = Path(elevation.CACHE_DIR) / "SRTM1" / "raster.tif"
+RASTER_BOUNDS_PATH = RASTER_DOWNLOAD_PATH.with_suffix(".json")
 ROOT_PATH = Path(__file__).parent.parent.parent
 TEST_PATH = Path(__file__).parent.parent.parent / "tests"
 DATA_FOLDER_NAME = "data"
@@ -42,6 +43,16 @@ DEFAULT_HEIGHTS_M = {
     AssetTypes.switch: 4.0,
 }
 
+# Units in which the vectorized engine stores each AssetState hazard parameter
+HAZARD_PARAMETER_UNITS = {
+    "wind_speed": "miles/hour",
+    "flood_velocity": "meter/second",
+    "flood_depth": "meter",
+    "fire_boundary_dist": "kilometer",
+    "peak_ground_velocity": "centimeter/second",
+    "peak_ground_acceleration": "meter/second**2",
+}
+
 ASSET_TYPES = (
     asset.AssetState,
     asset.Asset,
@@ -58,6 +69,14 @@ HAZARD_TYPES = (
     hazard.WindModel,
 )
 
+# AssetState hazard parameters computed for each hazard type
+HAZARD_PARAMETERS = {
+    hazard.EarthQuakeModel: ("peak_ground_velocity", "peak_ground_acceleration"),
+    hazard.FloodModel: ("flood_depth", "flood_velocity"),
+    hazard.FireModel: ("fire_boundary_dist",),
+    hazard.WindModel: ("wind_speed",),
+}
+
 HAZARD_MODELS = (
     hazard.EarthQuakeModel,
     hazard.FloodModelArea,
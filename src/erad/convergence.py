@@ -0,0 +1,192 @@
+from typing import Literal
+from uuid import UUID
+
+from scipy.stats import norm
+import numpy as np
+
+from erad.outage_matrix import NO_FAILURE, OutageMatrix
+
+ConvergenceMetric = Literal["failed_assets", "asset_failure_rates", "outaged_load"]
+
+CONVERGENCE_METRICS = ("failed_assets", "asset_failure_rates", "outaged_load")
+
+
+class RunningEstimate:
+    """Running weighted mean of a per-sample quantity and its confidence interval.
+
+    The estimate is the self-normalized mean sum(w x) / sum(w), its variance is estimated as
+    sum(w^2 (x - mean)^2) / sum(w)^2. With equal weights this is the usual variance of the
+    sample mean. Quantities may be scalars or vectors (one value per asset). Weights are
+    given as logarithms and the sums are kept relative to the largest weight seen so far,
+    which cancels out of both ratios.
+
+    Rare events often leave every sample with the same value (typically no failure), where
+    the variance estimate is 0. The interval of such an element falls back to the rule of
+    three, -ln(1 - confidence) * value_range / effective number of samples, so an estimate
+    is never considered exact from a finite number of samples.
+    """
+
+    def __init__(self, shape: tuple[int, ...] = (), value_range: float = 1.0):
+        """Constructor for the RunningEstimate class.
+
+        Args:
+            shape (tuple[int, ...]): Shape of the quantity of a single sample
+            value_range (float): Difference between the largest and smallest possible values
+                of the quantity, scales the interval when no variation has been observed
+        """
+        self.value_range = value_range
+        self.number_of_samples = 0
+        self.log_scale = -np.inf
+        self.sum_weights = 0.0
+        self.sum_squared_weights = 0.0
+        self.sum_weighted = np.zeros(shape)
+        self.sum_squared_weighted = np.zeros(shape)
+        self.sum_squared_weighted_squares = np.zeros(shape)
+
+    def update(self, values: np.ndarray, log_weights: np.ndarray | None = None):
+        """Add a block of samples.
+
+        Args:
+            values (np.ndarray): Quantity of each sample, shape (samples, *shape)
+            log_weights (np.ndarray | None): Log likelihood weight of each sample, None for
+                equal weights
+        """
+        values = np.asarray(values, dtype=float)
+        log_weights = (
+            np.zeros(len(values)) if log_weights is None else np.asarray(log_weights, dtype=float)
+        )
+        log_scale = max(self.log_scale, log_weights.max(initial=-np.inf))
+        if np.isfinite(self.log_scale) and log_scale > self.log_scale:
+            rescale = np.exp(self.log_scale - log_scale)
+            self.sum_weights *= rescale
+            self.sum_squared_weights *= rescale**2
+            self.sum_weighted *= rescale
+            self.sum_squared_weighted *= rescale**2
+            self.sum_squared_weighted_squares *= rescale**2
+        self.log_scale = log_scale
+        weights = np.exp(log_weights - log_scale)
+        expanded = weights.reshape(-1, *([1] * (values.ndim - 1)))
+        self.number_of_samples += len(values)
+        self.sum_weights += weights.sum()
+        self.sum_squared_weights += (weights**2).sum()
+        self.sum_weighted += (expanded * values).sum(axis=0)
+        self.sum_squared_weighted += (expanded**2 * values).sum(axis=0)
+        self.sum_squared_weighted_squares += (expanded**2 * values**2).sum(axis=0)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.sum_weighted / self.sum_weights
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Estimated variance of `mean`."""
+        mean = self.mean
+        squared_deviations = (
+            self.sum_squared_weighted_squares
+            - 2 * mean * self.sum_squared_weighted
+            + mean**2 * self.sum_squared_weights
+        )
+        return np.maximum(squared_deviations, 0) / self.sum_weights**2
+
+    @property
+    def effective_number_of_samples(self) -> float:
+        """Kish effective sample size sum(w)^2 / sum(w^2), the number of samples if unweighted."""
+        return self.sum_weights**2 / self.sum_squared_weights
+
+    def half_width(self, confidence: float = 0.95) -> np.ndarray:
+        """Half width of the confidence interval of `mean`.
+
+        Normal interval, or the rule of three bound for elements without observed variation.
+        """
+        variance = self.variance
+        rule_of_three = (
+            -np.log1p(-confidence) * self.value_range / self.effective_number_of_samples
+        )
+        return np.where(
+            variance > 0, norm.ppf((1 + confidence) / 2) * np.sqrt(variance), rule_of_three
+        )
+
+    def is_converged(
+        self,
+        confidence: float = 0.95,
+        relative_tolerance: float = 0.05,
+        absolute_tolerance: float = 0.0,
+    ) -> bool:
+        """True when every element of the interval is within the requested precision."""
+        tolerance = np.maximum(absolute_tolerance, relative_tolerance * np.abs(self.mean))
+        return bool(np.all(self.half_width(confidence) <= tolerance))
+
+
+def get_metric_values(
+    outage_matrix: OutageMatrix,
+    metric: ConvergenceMetric,
+    asset_loads: np.ndarray | None = None,
+) -> np.ndarray:
+    """Per-sample values of a convergence metric.
+
+    Args:
+        outage_matrix (OutageMatrix): Block of sampled scenarios
+        metric (ConvergenceMetric): "failed_assets" (number of failed assets),
+            "asset_failure_rates" (failure indicator of every asset) or "outaged_load" (load
+            connected to the failed assets)
+        asset_loads (np.ndarray | None): Load of each asset, required for "outaged_load"
+    """
+    failed = outage_matrix.first_failures != NO_FAILURE
+    if metric == "failed_assets":
+        return failed.sum(axis=1)
+    if metric == "asset_failure_rates":
+        return failed
+    if metric == "outaged_load":
+        if asset_loads is None:
+            raise ValueError("asset_loads are required to estimate the outaged load")
+        return failed @ asset_loads
+    raise ValueError(f"Unsupported convergence metric {metric}, use one of {CONVERGENCE_METRICS}")
+
+
+def get_asset_loads(
+    component_uuids: list[UUID], asset_loads: dict[UUID, float] | None
+) -> np.ndarray | None:
+    """Load of each component in `component_uuids` order, 0 for components without load."""
+    if asset_loads is None:
+        return None
+    return np.array([asset_loads.get(uuid, 0.0) for uuid in component_uuids], dtype=float)
+
+
+class AdaptiveSamplingResult:
+    """Scenarios and metric estimates of an adaptive sampling run."""
+
+    def __init__(
+        self,
+        outage_matrix: OutageMatrix,
+        estimates: dict[str, RunningEstimate],
+        converged: bool,
+        elapsed_s: float,
+        confidence: float = 0.95,
+    ):
+        """Constructor for the AdaptiveSamplingResult class.
+
+        Args:
+            outage_matrix (OutageMatrix): All sampled scenarios
+            estimates (dict[str, RunningEstimate]): Running estimate of each metric
+            converged (bool): True if sampling stopped because every metric reached the
+                requested precision
+            elapsed_s (float): Wall time spent sampling in seconds
+            confidence (float): Confidence level of the intervals
+        """
+        self.outage_matrix = outage_matrix
+        self.estimates = estimates
+        self.converged = converged
+        self.elapsed_s = elapsed_s
+        self.confidence = confidence
+
+    @property
+    def number_of_samples(self) -> int:
+        return self.outage_matrix.number_of_samples
+
+    def get_estimate(self, metric: ConvergenceMetric) -> np.ndarray:
+        return self.estimates[metric].mean
+
+    def get_confidence_interval(self, metric: ConvergenceMetric) -> tuple[np.ndarray, np.ndarray]:
+        estimate = self.estimates[metric]
+        half_width = estimate.half_width(self.confidence)
+        return estimate.mean - half_width, estimate.mean + half_width
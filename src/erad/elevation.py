@@ -0,0 +1,412 @@
+"""Elevation providers used to look up the ground elevation of assets in bulk."""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+import asyncio
+import sqlite3
+import threading
+import time
+
+from elevation import CACHE_DIR as ELEVATION_CACHE_DIR
+from pyhigh import get_elevation_batch
+from pyproj import Transformer
+from loguru import logger
+import numpy as np
+import requests
+
+DEFAULT_ELEVATION_M = 999.0
+ELEVATION_CACHE_PATH = Path(ELEVATION_CACHE_DIR) / "erad" / "elevation_cache.sqlite"
+USGS_EPQS_URL = (
+    "https://epqs.nationalmap.gov/v1/json?x={longitude}&y={latitude}&units=Meters&wkid=4326"
+)
+
+
+class ElevationProvider(ABC):
+    """Looks up ground elevations for arrays of coordinates."""
+
+    @abstractmethod
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        """Ground elevation in meters for each coordinate, NaN where it is unknown.
+
+        Args:
+            latitude (np.ndarray): Latitudes in degrees
+            longitude (np.ndarray): Longitudes in degrees
+        """
+
+
+class PyhighElevationProvider(ElevationProvider):
+    """SRTM elevations from pyhigh, downloading one tile per 1 x 1 degree cell on first use."""
+
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        latitude = np.asarray(latitude, dtype=float)
+        longitude = np.asarray(longitude, dtype=float)
+        elevations = np.full(len(latitude), np.nan)
+        tiles = np.column_stack([np.floor(latitude), np.floor(longitude)])
+        if not len(tiles):
+            return elevations
+        unique_tiles, tile_index = np.unique(tiles, axis=0, return_inverse=True)
+        for ii, (tile_latitude, tile_longitude) in enumerate(unique_tiles):
+            indices = np.flatnonzero(tile_index.ravel() == ii)
+            try:
+                elevations[indices] = get_elevation_batch(
+                    list(zip(latitude[indices], longitude[indices]))
+                )
+            except Exception:
+                logger.warning(
+                    f"Error getting elevation information for tile ({tile_latitude}, "
+                    f"{tile_longitude}) covering {len(indices)} coordinates"
+                )
+        return elevations
+
+
+class RasterElevationProvider(ElevationProvider):
+    """Samples a local elevation raster (GeoTIFF) such as the clip of `get_elevation_raster`.
+
+    All coordinates are sampled from a single windowed read covering their bounding box, so
+    only the raster blocks around the assets are loaded. Requires the optional rasterio
+    dependency.
+    """
+
+    def __init__(self, raster_path: Path | str, band: int = 1):
+        """Constructor for the RasterElevationProvider class.
+
+        Args:
+            raster_path (Path | str): Path to the raster file, elevations in meters
+            band (int): Raster band holding the elevations
+        """
+        self.raster_path = Path(raster_path)
+        self.band = band
+        if not self.raster_path.exists():
+            raise FileNotFoundError(f"File path {self.raster_path} does not exist")
+
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        try:
+            import rasterio
+            from rasterio.windows import Window
+        except ImportError as error:
+            raise ImportError(
+                "rasterio is required to sample elevation rasters, install erad[raster]"
+            ) from error
+
+        latitude = np.asarray(latitude, dtype=float)
+        longitude = np.asarray(longitude, dtype=float)
+        elevations = np.full(len(latitude), np.nan)
+        with rasterio.open(self.raster_path) as src:
+            x, y = longitude, latitude
+            if src.crs is not None and not src.crs.is_geographic:
+                transformer = Transformer.from_crs("EPSG:4326", src.crs.to_wkt(), always_xy=True)
+                x, y = transformer.transform(longitude, latitude)
+            rows, cols = rasterio.transform.rowcol(src.transform, x, y)
+            rows, cols = np.atleast_1d(rows), np.atleast_1d(cols)
+            inside = (rows >= 0) & (rows < src.height) & (cols >= 0) & (cols < src.width)
+            if not inside.any():
+                return elevations
+
+            row_min, col_min = rows[inside].min(), cols[inside].min()
+            window = Window(
+                col_min,
+                row_min,
+                cols[inside].max() - col_min + 1,
+                rows[inside].max() - row_min + 1,
+            )
+            data = src.read(self.band, window=window, masked=True)
+            values = data[rows[inside] - row_min, cols[inside] - col_min]
+            elevations[inside] = np.ma.filled(values.astype(float), np.nan)
+        return elevations
+
+
+class CachedElevationProvider(ElevationProvider):
+    """Persistent SQLite cache in front of another elevation provider.
+
+    Coordinates are quantized to `precision` decimal places (5 places is about 1 m) and the
+    cache keeps at most `max_entries` elevations, evicting the least recently used ones. The
+    cache file can be shared by concurrent processes. Unknown (NaN) elevations are not cached.
+    """
+
+    def __init__(
+        self,
+        provider: ElevationProvider,
+        cache_path: Path | str = ELEVATION_CACHE_PATH,
+        precision: int = 5,
+        max_entries: int = 5_000_000,
+    ):
+        """Constructor for the CachedElevationProvider class.
+
+        Args:
+            provider (ElevationProvider): Provider queried for coordinates missing in the cache
+            cache_path (Path | str): SQLite file holding the cache, created if missing
+            precision (int): Number of decimal places coordinates are quantized to
+            max_entries (int): Maximum number of cached elevations
+        """
+        self.provider = provider
+        self.cache_path = Path(cache_path)
+        self.precision = precision
+        self.max_entries = max_entries
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS elevation (
+                    precision INTEGER NOT NULL,
+                    latitude INTEGER NOT NULL,
+                    longitude INTEGER NOT NULL,
+                    elevation REAL NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (precision, latitude, longitude)
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS elevation_last_used ON elevation (last_used)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection committed on success and always closed."""
+        conn = sqlite3.connect(self.cache_path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _quantize(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        scale = 10**self.precision
+        return np.column_stack([np.round(latitude * scale), np.round(longitude * scale)]).astype(
+            np.int64
+        )
+
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        latitude = np.asarray(latitude, dtype=float)
+        longitude = np.asarray(longitude, dtype=float)
+        elevations = np.full(len(latitude), np.nan)
+        if not len(latitude):
+            return elevations
+        keys, first_index, inverse = np.unique(
+            self._quantize(latitude, longitude), axis=0, return_index=True, return_inverse=True
+        )
+        inverse = inverse.ravel()
+        key_rows = [(int(lat), int(lon)) for lat, lon in keys]
+
+        now = time.time_ns()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TEMP TABLE query_keys "
+                "(latitude INTEGER, longitude INTEGER, position INTEGER)"
+            )
+            conn.executemany(
+                "INSERT INTO query_keys VALUES (?, ?, ?)",
+                [(lat, lon, ii) for ii, (lat, lon) in enumerate(key_rows)],
+            )
+            cached = conn.execute(
+                """SELECT q.position, e.elevation FROM query_keys q JOIN elevation e
+                ON e.precision = ? AND e.latitude = q.latitude AND e.longitude = q.longitude""",
+                (self.precision,),
+            ).fetchall()
+            conn.execute(
+                """UPDATE elevation SET last_used = ? WHERE precision = ?
+                AND (latitude, longitude) IN (SELECT latitude, longitude FROM query_keys)""",
+                (now, self.precision),
+            )
+            conn.execute("DROP TABLE query_keys")
+
+        key_elevations = np.full(len(keys), np.nan)
+        if cached:
+            positions, values = zip(*cached)
+            key_elevations[list(positions)] = values
+
+        missing = np.flatnonzero(np.isnan(key_elevations))
+        if len(missing):
+            key_elevations[missing] = self.provider.get_elevations(
+                latitude[first_index[missing]], longitude[first_index[missing]]
+            )
+            found = missing[~np.isnan(key_elevations[missing])]
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO elevation VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (self.precision, *key_rows[ii], float(key_elevations[ii]), now)
+                        for ii in found
+                    ],
+                )
+                self._evict(conn)
+
+        elevations[:] = key_elevations[inverse]
+        return elevations
+
+    def _evict(self, conn: sqlite3.Connection):
+        (count,) = conn.execute("SELECT COUNT(*) FROM elevation").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                """DELETE FROM elevation WHERE rowid IN
+                (SELECT rowid FROM elevation ORDER BY last_used LIMIT ?)""",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        """Remove all cached elevations."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM elevation")
+
+
+class _ThreadSessions:
+    """One requests.Session per worker thread, sessions are not safe to share across threads."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._sessions = []
+
+    def get(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            self._sessions.append(session)
+        return session
+
+    def __enter__(self) -> "_ThreadSessions":
+        return self
+
+    def __exit__(self, *args):
+        for session in self._sessions:
+            session.close()
+
+
+class PointServiceElevationProvider(ElevationProvider):
+    """Elevations from an HTTP point-query service, one request per unique coordinate.
+
+    Requests are issued from an asyncio event loop with at most `max_concurrency` in flight,
+    identical coordinates are requested once and failed requests are retried with an
+    exponential backoff. Blocking requests run in worker threads, each with its own
+    requests.Session. The default URL is the USGS Elevation Point Query Service.
+    """
+
+    def __init__(
+        self,
+        url_template: str = USGS_EPQS_URL,
+        value_key: str = "value",
+        max_concurrency: int = 16,
+        retries: int = 3,
+        backoff_s: float = 0.5,
+        timeout_s: float = 30.0,
+    ):
+        """Constructor for the PointServiceElevationProvider class.
+
+        Args:
+            url_template (str): Request URL with `{latitude}` and `{longitude}` placeholders
+            value_key (str): Key of the elevation (meters) in the JSON response
+            max_concurrency (int): Maximum number of requests in flight
+            retries (int): Number of retries of a failed request
+            backoff_s (float): Delay before the first retry, doubled for every further retry
+            timeout_s (float): Timeout of a single request
+        """
+        self.url_template = url_template
+        self.value_key = value_key
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+
+    def _request(self, sessions: _ThreadSessions, latitude: float, longitude: float) -> float:
+        response = sessions.get().get(
+            self.url_template.format(latitude=latitude, longitude=longitude),
+            timeout=self.timeout_s,
+        )
+        response.raise_for_status()
+        return float(response.json()[self.value_key])
+
+    async def _fetch(
+        self,
+        sessions: _ThreadSessions,
+        semaphore: asyncio.Semaphore,
+        latitude: float,
+        longitude: float,
+    ) -> float:
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    return await asyncio.to_thread(self._request, sessions, latitude, longitude)
+                except Exception as error:
+                    if attempt == self.retries:
+                        logger.warning(
+                            f"Error getting elevation for coordinates {latitude}, {longitude}: "
+                            f"{error}"
+                        )
+                        return np.nan
+                    await asyncio.sleep(self.backoff_s * 2**attempt)
+
+    async def prefetch(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        """Fetch the elevations of all unique coordinates concurrently.
+
+        Args:
+            latitude (np.ndarray): Latitudes in degrees
+            longitude (np.ndarray): Longitudes in degrees
+        """
+        coordinates = np.column_stack(
+            [np.asarray(latitude, dtype=float), np.asarray(longitude, dtype=float)]
+        )
+        if not len(coordinates):
+            return np.full(0, np.nan)
+        unique_coordinates, inverse = np.unique(coordinates, axis=0, return_inverse=True)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        with _ThreadSessions() as sessions:
+            elevations = await asyncio.gather(
+                *[
+                    self._fetch(sessions, semaphore, float(lat), float(lon))
+                    for lat, lon in unique_coordinates
+                ]
+            )
+        return np.array(elevations, dtype=float)[inverse.ravel()]
+
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.prefetch(latitude, longitude))
+        # Called from a running event loop (e.g. a notebook), run the prefetch in a new thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.prefetch(latitude, longitude)).result()
+
+
+_default_provider: ElevationProvider | None = None
+
+
+def get_default_elevation_provider() -> ElevationProvider:
+    """Provider used by `Asset.elevation` and `AssetSystem.set_elevations` by default.
+
+    Unless replaced with `set_default_elevation_provider`, this is pyhigh behind the SQLite
+    cache at `ELEVATION_CACHE_PATH`, created on first use.
+    """
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = CachedElevationProvider(PyhighElevationProvider())
+    return _default_provider
+
+
+def set_default_elevation_provider(provider: ElevationProvider):
+    """Replace the provider used by `Asset.elevation` and `AssetSystem.set_elevations`."""
+    global _default_provider
+    _default_provider = provider
+
+
+def lookup_elevations(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    provider: ElevationProvider | None = None,
+) -> np.ndarray:
+    """Ground elevations in meters, unknown values default to 999 meters.
+
+    Args:
+        latitude (np.ndarray): Latitudes in degrees
+        longitude (np.ndarray): Longitudes in degrees
+        provider (ElevationProvider | None): Provider to use, defaults to the default provider
+    """
+    provider = get_default_elevation_provider() if provider is None else provider
+    elevations = np.asarray(provider.get_elevations(latitude, longitude), dtype=float)
+    missing = np.isnan(elevations)
+    if missing.any():
+        logger.warning(
+            f"Elevation not found for {int(missing.sum())} coordinates. "
+            f"Defaulting to {DEFAULT_ELEVATION_M:g} meters"
+        )
+        elevations[missing] = DEFAULT_ELEVATION_M
+    return elevations
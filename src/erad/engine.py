@@ -0,0 +1,153 @@
+from functools import cached_property
+
+from infrasys.quantities import Distance
+import numpy as np
+import shapely
+
+from erad.models.probability import (
+    AccelerationProbability,
+    DistanceProbability,
+    SpeedProbability,
+)
+from erad.constants import HAZARD_PARAMETER_UNITS
+from erad.fragility_table import FragilityTable
+from erad.quantities import Acceleration, Speed
+from erad.models.asset import Asset, set_asset_elevations
+import erad.models.hazard as hz
+import erad.kernels as kernels
+
+PROBABILITY_MODELS = {
+    "wind_speed": (SpeedProbability, "speed", Speed),
+    "flood_velocity": (SpeedProbability, "speed", Speed),
+    "flood_depth": (DistanceProbability, "distance", Distance),
+    "fire_boundary_dist": (DistanceProbability, "distance", Distance),
+    "peak_ground_velocity": (SpeedProbability, "speed", Speed),
+    "peak_ground_acceleration": (AccelerationProbability, "acceleration", Acceleration),
+}
+
+
+class AssetArrays:
+    """Columnar view of a list of assets used by the vectorized engine."""
+
+    def __init__(self, assets: list[Asset]):
+        self.assets = list(assets)
+        self.latitude = np.array([asset.latitude for asset in self.assets], dtype=float)
+        self.longitude = np.array([asset.longitude for asset in self.assets], dtype=float)
+        self.height = np.array(
+            [asset.height.to("meter").magnitude for asset in self.assets], dtype=float
+        )
+        self.asset_type = np.array([asset.asset_type.value for asset in self.assets], dtype=int)
+        self.asset_type_groups = {
+            int(asset_type): np.flatnonzero(self.asset_type == asset_type)
+            for asset_type in np.unique(self.asset_type)
+        }
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    @cached_property
+    def point_tree(self) -> shapely.STRtree:
+        """Spatial index of the asset locations, built on first use."""
+        return shapely.STRtree(shapely.points(self.longitude, self.latitude))
+
+    @cached_property
+    def elevation(self) -> np.ndarray:
+        """Ground elevation of the assets in meters, looked up in bulk on first use."""
+        set_asset_elevations(self.assets)
+        return np.array(
+            [asset.elevation.to("meter").magnitude for asset in self.assets], dtype=float
+        )
+
+
+class VectorizedHazardEngine:
+    """Evaluates hazard intensities and survival probabilities for all assets in one pass."""
+
+    def __init__(self, assets: list[Asset], fragility_table: FragilityTable):
+        """Constructor for the VectorizedHazardEngine class.
+
+        Args:
+            assets (list[Asset]): Assets to evaluate, packed into arrays once
+            fragility_table (FragilityTable): Compiled fragility curves used for survival
+        """
+        self.arrays = AssetArrays(assets)
+        self.fragility_table = fragility_table
+
+    def get_footprint_index(self, hazard_model: hz.BaseDisasterModel) -> np.ndarray | slice:
+        """Index of the assets inside the influence footprint of a hazard model.
+
+        Assets outside the footprint keep the kernel's default intensities, so only the
+        returned assets need to be evaluated. A model without a footprint selects all assets.
+        """
+        footprint = hazard_model.influence_footprint()
+        if footprint is None:
+            return slice(None)
+        return np.sort(self.arrays.point_tree.query(footprint, predicate="intersects"))
+
+    def compute_intensities(
+        self, hazard_models: list[hz.BaseDisasterModel]
+    ) -> dict[str, np.ndarray]:
+        """Hazard intensities experienced by every asset, keyed by AssetState parameter.
+
+        Values are in the units given by `HAZARD_PARAMETER_UNITS`. When several models of the
+        same hazard type share a timestamp the last one wins, as in the per-asset path. Wind
+        and flood kernels only run on the assets inside the model's influence footprint.
+        """
+        arrays = self.arrays
+        intensities: dict[str, np.ndarray] = {}
+        for hazard_model in hazard_models:
+            if isinstance(hazard_model, hz.EarthQuakeModel):
+                pgv, pga = kernels.earthquake_ground_motion(
+                    arrays.latitude, arrays.longitude, hazard_model
+                )
+                intensities["peak_ground_velocity"] = pgv
+                intensities["peak_ground_acceleration"] = pga
+            elif isinstance(hazard_model, hz.FireModel):
+                intensities["fire_boundary_dist"] = kernels.fire_boundary_distance(
+                    arrays.latitude, arrays.longitude, hazard_model
+                )
+            elif isinstance(hazard_model, hz.WindModel):
+                index = self.get_footprint_index(hazard_model)
+                speed = np.zeros(len(arrays))
+                speed[index] = kernels.wind_speed(
+                    arrays.latitude[index], arrays.longitude[index], hazard_model
+                )
+                intensities["wind_speed"] = speed
+            elif isinstance(hazard_model, hz.FloodModel):
+                index = self.get_footprint_index(hazard_model)
+                depth = np.full(len(arrays), kernels.NOT_FLOODED_DEPTH_M)
+                velocity = np.zeros(len(arrays))
+                flooded = np.zeros(len(arrays), dtype=bool)
+                depth[index], velocity[index], flooded[index] = kernels.flood_depth_and_velocity(
+                    arrays.latitude[index],
+                    arrays.longitude[index],
+                    arrays.elevation[index] + arrays.height[index],
+                    hazard_model,
+                )
+                if "flood_depth" in intensities:
+                    depth = np.where(flooded, depth, intensities["flood_depth"])
+                    velocity = np.where(flooded, velocity, intensities["flood_velocity"])
+                intensities["flood_depth"] = depth
+                intensities["flood_velocity"] = velocity
+            else:
+                raise ValueError(f"Unsupported hazard type {hazard_model.__class__.__name__}")
+        return intensities
+
+    def compute_survival_probabilities(
+        self, intensities: dict[str, np.ndarray]
+    ) -> dict[str, np.ndarray]:
+        """Survival probability of every asset for each computed hazard parameter."""
+        return {
+            param: self.fragility_table.survival_probability(
+                param, values, self.arrays.asset_type_groups
+            )
+            for param, values in intensities.items()
+        }
+
+    @staticmethod
+    def build_probability_model(param: str, value: float, survival_probability: float):
+        """Build the AssetState probability component for a single computed value."""
+        model_class, quantity_name, quantity_class = PROBABILITY_MODELS[param]
+        return model_class(
+            **{quantity_name: quantity_class(float(value), HAZARD_PARAMETER_UNITS[param])},
+            survival_probability=float(survival_probability),
+        )
@@ -0,0 +1,124 @@
+from infrasys.base_quantity import ureg
+from loguru import logger
+import numpy as np
+
+from erad.models.fragility_curve import HazardFragilityCurves, ProbabilityFunction
+from erad.default_fragility_curves import DEFAULT_FRAGILTY_CURVES
+from erad.constants import HAZARD_PARAMETER_UNITS
+from erad.enums import AssetTypes
+
+
+class CompiledFragilityCurve:
+    """Frozen fragility distribution evaluated on values in canonical units."""
+
+    def __init__(self, prob_function: ProbabilityFunction, units: str):
+        """Constructor for the CompiledFragilityCurve class.
+
+        Args:
+            prob_function (ProbabilityFunction): Fragility curve definition
+            units (str): Canonical units of the values passed to `survival_probability`
+        """
+        self.prob_function = prob_function
+        self.prob_model = prob_function.prob_model
+        # Affine map from canonical units to the units the curve was defined in
+        self.offset = ureg.Quantity(0.0, units).to(self.prob_model.units).magnitude
+        self.scale = ureg.Quantity(1.0, units).to(self.prob_model.units).magnitude - self.offset
+
+    def survival_probability(self, values: np.ndarray) -> np.ndarray:
+        """Survival probabilities for an array of values in canonical units."""
+        return self.prob_model.survival_probability(np.asarray(values) * self.scale + self.offset)
+
+
+class FragilityTable:
+    """Dense lookup table of compiled fragility curves.
+
+    Rows are AssetState hazard parameters and columns are `AssetTypes` values. When a curve
+    set defines the same (parameter, asset type) pair more than once the first definition
+    wins, as in `Asset.get_vadid_curve`.
+    """
+
+    def __init__(
+        self,
+        frag_curves: list[HazardFragilityCurves],
+        parameters: list[str] | None = None,
+        asset_types: list[AssetTypes] | None = None,
+    ):
+        """Constructor for the FragilityTable class.
+
+        Args:
+            frag_curves (list[HazardFragilityCurves]): Curve set to compile
+            parameters (list[str] | None): Parameters that must have curves, defaults to all
+            asset_types (list[AssetTypes] | None): Asset types that must have curves, defaults
+                to all
+
+        Raises:
+            ValueError: If a required (parameter, asset type) pair has no curve
+        """
+        self.parameters = list(HAZARD_PARAMETER_UNITS)
+        self.parameter_index = {param: ii for ii, param in enumerate(self.parameters)}
+        self.curves = np.full((len(self.parameters), max(AssetTypes) + 1), None, dtype=object)
+        for frag_curve in frag_curves:
+            ii = self.parameter_index[frag_curve.asset_state_param]
+            for curve in frag_curve.curves:
+                if self.curves[ii, curve.asset_type.value] is None:
+                    self.curves[ii, curve.asset_type.value] = CompiledFragilityCurve(
+                        curve.prob_function, HAZARD_PARAMETER_UNITS[frag_curve.asset_state_param]
+                    )
+
+        required_parameters = self.parameters if parameters is None else parameters
+        required_asset_types = list(AssetTypes) if asset_types is None else asset_types
+        missing = [
+            f"{param} - {AssetTypes(asset_type).name}"
+            for param in required_parameters
+            for asset_type in sorted(set(required_asset_types))
+            if self.get_curve(param, asset_type) is None
+        ]
+        if missing:
+            raise ValueError(
+                "No fragility curve found for (asset state parameter - asset type): \n"
+                + "\n".join(missing)
+            )
+
+    @classmethod
+    def from_hazard_system(
+        cls, hazard_system, curve_set: str = "DEFAULT_CURVES", **kwargs
+    ) -> "FragilityTable":
+        """Compile a named curve set of a HazardSystem, falling back to the default curves."""
+        frag_curves = list(
+            hazard_system.get_components(
+                HazardFragilityCurves, filter_func=lambda x: x.name == curve_set
+            )
+        )
+        if not frag_curves:
+            logger.warning(
+                "No HazardFragilityCurves definitions found in the passed HazardSystem, using default curve definitions"
+            )
+            frag_curves = DEFAULT_FRAGILTY_CURVES
+        return cls(frag_curves, **kwargs)
+
+    def get_curve(self, param: str, asset_type: AssetTypes | int) -> CompiledFragilityCurve | None:
+        return self.curves[self.parameter_index[param], int(asset_type)]
+
+    def get_prob_function(
+        self, param: str, asset_type: AssetTypes | int
+    ) -> ProbabilityFunction | None:
+        curve = self.get_curve(param, asset_type)
+        return curve.prob_function if curve else None
+
+    def survival_probability(
+        self, param: str, values: np.ndarray, asset_type_groups: dict[int, np.ndarray]
+    ) -> np.ndarray:
+        """Survival probabilities of all assets for one parameter.
+
+        Args:
+            param (str): AssetState hazard parameter
+            values (np.ndarray): Intensities in the units of `HAZARD_PARAMETER_UNITS`
+            asset_type_groups (dict[int, np.ndarray]): Asset indices for each asset type value
+        """
+        probabilities = np.ones(len(values))
+        for asset_type, indices in asset_type_groups.items():
+            curve = self.get_curve(param, asset_type)
+            if curve is None:
+                raise ValueError(f"No fragility curve found for field - {param}")
+            probabilities[indices] = curve.survival_probability(values[indices])
+        return probabilities
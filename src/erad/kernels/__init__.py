@@ -0,0 +1,4 @@
+from erad.kernels.earthquake import earthquake_ground_motion, earthquake_ground_motion_events
+from erad.kernels.fire import fire_boundary_distance
+from erad.kernels.flood import NOT_FLOODED_DEPTH_M, flood_depth_and_velocity
+from erad.kernels.wind import wind_speed, wind_speed_track
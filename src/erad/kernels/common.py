@@ -0,0 +1,35 @@
+from pyproj import Geod
+import numpy as np
+
+WGS84 = Geod(ellps="WGS84")
+
+
+def geodesic_distance_km(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    origin_latitude: float | np.ndarray,
+    origin_longitude: float | np.ndarray,
+) -> np.ndarray:
+    """Geodesic distance in kilometers on the WGS84 ellipsoid, broadcasting over the inputs.
+
+    pyproj solves the inverse geodesic problem with GeographicLib (Karney, 2013), the same
+    algorithm behind `geopy.distance.geodesic` used by the per-asset path. Both agree to well
+    below a millimeter (Karney quotes a round-off error of about 15 nanometers), so the
+    vectorized kernels reproduce the per-asset intensities.
+
+    Args:
+        latitude (np.ndarray): Asset latitudes in degrees
+        longitude (np.ndarray): Asset longitudes in degrees
+        origin_latitude (float | np.ndarray): Hazard origin latitude(s) in degrees
+        origin_longitude (float | np.ndarray): Hazard origin longitude(s) in degrees
+    """
+    lat, lon, origin_lat, origin_lon = np.broadcast_arrays(
+        np.asarray(latitude, dtype=float),
+        np.asarray(longitude, dtype=float),
+        np.asarray(origin_latitude, dtype=float),
+        np.asarray(origin_longitude, dtype=float),
+    )
+    if lat.size == 0:
+        return np.zeros(lat.shape)
+    _, _, distance_m = WGS84.inv(origin_lon.ravel(), origin_lat.ravel(), lon.ravel(), lat.ravel())
+    return np.asarray(distance_m).reshape(lat.shape) / 1000.0
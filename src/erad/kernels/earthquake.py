@@ -0,0 +1,54 @@
+import numpy as np
+
+from erad.kernels.common import geodesic_distance_km
+from erad.models.hazard import EarthQuakeModel
+
+STANDARD_GRAVITY = 9.80665
+
+
+def earthquake_ground_motion(
+    latitude: np.ndarray, longitude: np.ndarray, hazard_model: EarthQuakeModel
+) -> tuple[np.ndarray, np.ndarray]:
+    """Peak ground velocity (cm/s) and peak ground acceleration (m/s**2) for each asset.
+
+    Vectorized counterpart of `AssetState.calculate_earthquake_vectors`.
+
+    Args:
+        latitude (np.ndarray): Asset latitudes in degrees
+        longitude (np.ndarray): Asset longitudes in degrees
+        hazard_model (EarthQuakeModel): Earthquake to evaluate
+    """
+    pgv, pga = earthquake_ground_motion_events(latitude, longitude, [hazard_model])
+    return pgv[0], pga[0]
+
+
+def earthquake_ground_motion_events(
+    latitude: np.ndarray, longitude: np.ndarray, events: list[EarthQuakeModel]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Peak ground velocity (cm/s) and acceleration (m/s**2) for many earthquakes at once.
+
+    Args:
+        latitude (np.ndarray): Asset latitudes in degrees
+        longitude (np.ndarray): Asset longitudes in degrees
+        events (list[EarthQuakeModel]): Earthquakes to evaluate, one row of the results each
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: PGV and PGA arrays of shape (len(events), number of
+            assets)
+    """
+    origin_latitude = np.array([[event.origin.y] for event in events], dtype=float)
+    origin_longitude = np.array([[event.origin.x] for event in events], dtype=float)
+    depth = np.array([[event.depth.to("km").magnitude] for event in events], dtype=float)
+    magnitude = np.array([[event.magnitude] for event in events], dtype=float)
+
+    epicenter_distance = geodesic_distance_km(
+        latitude, longitude, origin_latitude, origin_longitude
+    )
+    hypocentral_distance = (depth**2 + epicenter_distance**2) ** 0.5
+
+    # Modified Mercalli Intensity, Atkinson & Wald (2007)
+    mmi = 3.31 + 1.28 * magnitude - 1.42 * np.log10(hypocentral_distance)
+
+    pgv = 10 ** ((mmi - 3.78) / 1.47)
+    pga = 10 ** ((mmi - 1.78) / 3.70) / 100.0 * STANDARD_GRAVITY
+    return pgv, pga
@@ -0,0 +1,99 @@
+from uuid import UUID
+
+from pyproj import Transformer
+import numpy as np
+import shapely
+
+from erad.models.hazard import FireModel
+
+
+def _local_transformer(bounds: tuple[float, float, float, float]) -> Transformer:
+    """Azimuthal equidistant projection in meters centered on a bounding box."""
+    min_x, min_y, max_x, max_y = bounds
+    return Transformer.from_crs(
+        "EPSG:4326",
+        f"+proj=aeqd +lat_0={(min_y + max_y) / 2} +lon_0={(min_x + max_x) / 2} "
+        "+datum=WGS84 +units=m",
+        always_xy=True,
+    )
+
+
+class FireBoundaryIndex:
+    """Spatial index over the affected areas of a FireModel.
+
+    Areas are projected once to an azimuthal equidistant CRS centered on the fire, so
+    distances are metric and accurate to well under 1% within a few hundred kilometers of
+    the fire. Area polygons and their exteriors are indexed in STRtrees so each asset only
+    touches the candidate areas near it.
+    """
+
+    def __init__(self, hazard_model: FireModel):
+        """Constructor for the FireBoundaryIndex class.
+
+        Args:
+            hazard_model (FireModel): Wild fire to index
+        """
+        polygons = [area.affected_area for area in hazard_model.affected_areas]
+        self.transformer = _local_transformer(shapely.total_bounds(polygons))
+        self.polygons = shapely.transform(np.array(polygons, dtype=object), self._project)
+        self.exteriors = shapely.get_exterior_ring(self.polygons)
+        self.polygon_tree = shapely.STRtree(self.polygons)
+        self.exterior_tree = shapely.STRtree(self.exteriors)
+
+    def _project(self, coordinates: np.ndarray) -> np.ndarray:
+        x, y = self.transformer.transform(coordinates[:, 0], coordinates[:, 1])
+        return np.column_stack([x, y])
+
+    def distance_km(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        """Distance in kilometers of each point to the closest fire boundary, zero inside."""
+        x, y = self.transformer.transform(np.asarray(longitude), np.asarray(latitude))
+        points = shapely.points(x, y)
+        point_index, exterior_index = self.exterior_tree.query_nearest(points, all_matches=False)
+        distances = np.full(len(points), np.inf)
+        distances[point_index] = shapely.distance(
+            points[point_index], self.exteriors[exterior_index]
+        )
+        point_index, _ = self.polygon_tree.query(points, predicate="within")
+        distances[point_index] = 0.0
+        return distances / 1000.0
+
+
+_cached_index: tuple[UUID, list, FireBoundaryIndex] | None = None
+
+
+def fire_boundary_index(hazard_model: FireModel) -> FireBoundaryIndex:
+    """FireBoundaryIndex of a FireModel, reused across calls for the same model.
+
+    The per-asset engine evaluates every asset against one model before moving to the next,
+    so only the index of the most recent model is kept. It is rebuilt when the model uuid
+    changes or its affected areas are replaced.
+
+    Args:
+        hazard_model (FireModel): Wild fire to index
+    """
+    global _cached_index
+    polygons = [area.affected_area for area in hazard_model.affected_areas]
+    if (
+        _cached_index is None
+        or _cached_index[0] != hazard_model.uuid
+        or len(_cached_index[1]) != len(polygons)
+        or any(cached is not polygon for cached, polygon in zip(_cached_index[1], polygons))
+    ):
+        _cached_index = (hazard_model.uuid, polygons, FireBoundaryIndex(hazard_model))
+    return _cached_index[2]
+
+
+def fire_boundary_distance(
+    latitude: np.ndarray, longitude: np.ndarray, hazard_model: FireModel
+) -> np.ndarray:
+    """Distance in kilometers of each asset to the closest wild fire boundary.
+
+    Vectorized counterpart of `AssetState.calculate_fire_vectors`; assets inside an affected
+    area are at distance zero.
+
+    Args:
+        latitude (np.ndarray): Asset latitudes in degrees
+        longitude (np.ndarray): Asset longitudes in degrees
+        hazard_model (FireModel): Wild fire to evaluate
+    """
+    return fire_boundary_index(hazard_model).distance_km(latitude, longitude)
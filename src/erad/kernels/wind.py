@@ -0,0 +1,67 @@
+import numpy as np
+
+from erad.kernels.common import geodesic_distance_km
+from erad.models.hazard import WindModel
+
+KNOTS_TO_MPH = 1.150779448
+KM_TO_NAUTICAL_MILE = 1 / 1.852
+
+
+def _wind_profile_knots(
+    r: np.ndarray, r_max: np.ndarray, r_v_max: np.ndarray, v_max: np.ndarray
+) -> np.ndarray:
+    """Piecewise radial wind profile, all distances in nautical miles and speeds in knots."""
+    k = 1.14
+    b = 10
+
+    a = np.log(b) / (r_max - r_v_max)
+    m = (1 / r_v_max) * np.log(k / (k - 1))
+
+    return np.select(
+        [(r >= 0) & (r < r_v_max), (r >= r_v_max) & (r < r_max)],
+        [k * v_max * (1 - np.exp(-m * r)), v_max * np.exp(-a * (r - r_v_max))],
+        default=0.0,
+    )
+
+
+def wind_speed(latitude: np.ndarray, longitude: np.ndarray, hazard_model: WindModel) -> np.ndarray:
+    """Wind speed in miles per hour experienced by each asset.
+
+    Vectorized counterpart of `AssetState.calculate_wind_vectors`.
+
+    Args:
+        latitude (np.ndarray): Asset latitudes in degrees
+        longitude (np.ndarray): Asset longitudes in degrees
+        hazard_model (WindModel): Hurricane snapshot to evaluate
+    """
+    return wind_speed_track(latitude, longitude, [hazard_model])[0]
+
+
+def wind_speed_track(
+    latitude: np.ndarray, longitude: np.ndarray, track: list[WindModel]
+) -> np.ndarray:
+    """Wind speed in miles per hour for every snapshot of a hurricane track and every asset.
+
+    Args:
+        latitude (np.ndarray): Asset latitudes in degrees
+        longitude (np.ndarray): Asset longitudes in degrees
+        track (list[WindModel]): Hurricane snapshots, one row of the result each
+
+    Returns:
+        np.ndarray: Array of shape (len(track), number of assets)
+    """
+    center_latitude = np.array([[model.center.y] for model in track], dtype=float)
+    center_longitude = np.array([[model.center.x] for model in track], dtype=float)
+    r_max = np.array(
+        [[model.radius_of_closest_isobar.to("nautical_mile").magnitude] for model in track]
+    )
+    r_v_max = np.array(
+        [[model.radius_of_max_wind.to("nautical_mile").magnitude] for model in track]
+    )
+    v_max = np.array([[model.max_wind_speed.to("knot").magnitude] for model in track])
+
+    r = (
+        geodesic_distance_km(latitude, longitude, center_latitude, center_longitude)
+        * KM_TO_NAUTICAL_MILE
+    )
+    return _wind_profile_knots(r, r_max, r_v_max, v_max) * KNOTS_TO_MPH
@@ -2,13 +2,12 @@ from datetime import datetime
 from uuid import UUID
 import math
 
-from pydantic import computed_field, Field
+from pydantic import computed_field, Field, PrivateAttr
 from infrasys.quantities import Distance
 from geopy.distance import geodesic
 from shapely.geometry import Point
-from pyhigh import get_elevation
 from infrasys import Component
-from loguru import logger
+import numpy as np
 
 # from erad.constants import RASTER_DOWNLOAD_PATH
 from erad.quantities import Acceleration, Speed
@@ -17,9 +16,26 @@ from erad.models.probability import (
     DistanceProbability,
     SpeedProbability,
 )
+from erad.kernels.fire import fire_boundary_index
+from erad.elevation import ElevationProvider, lookup_elevations
 from erad.enums import AssetTypes
 import erad.models.hazard as hz
 
+PROBABILITY_QUANTITIES = {
+    SpeedProbability: "speed",
+    DistanceProbability: "distance",
+    AccelerationProbability: "acceleration",
+}
+
+ASSET_STATE_PARAMETERS = (
+    "wind_speed",
+    "flood_velocity",
+    "flood_depth",
+    "fire_boundary_dist",
+    "peak_ground_velocity",
+    "peak_ground_acceleration",
+)
+
 
 class AssetState(Component):
     name: str = ""
@@ -83,14 +99,13 @@ class AssetState(Component):
         Wildfire Risk Reduction Methods 2024 – EPRI
         """
 
-        distances_to_wild_fire_boundaries = []
-        for wild_fire_area in hazard_model.affected_areas:
-            if wild_fire_area.affected_area.contains(asset_coordinate):
-                distance = 0
-            else:
-                distance = wild_fire_area.affected_area.exterior.distance(asset_coordinate)
-            distances_to_wild_fire_boundaries.append(distance)
-        minimum_distance_km = min(distances_to_wild_fire_boundaries)
+        # Distances are measured in a metric projection centered on the fire, the index is
+        # built once per fire model and shared by every asset
+        minimum_distance_km = float(
+            fire_boundary_index(hazard_model).distance_km(
+                np.array([asset_coordinate.y]), np.array([asset_coordinate.x])
+            )[0]
+        )
         self.fire_boundary_dist = DistanceProbability(
             distance=Distance(minimum_distance_km, "kilometer"),
             survival_probability=1,
@@ -212,31 +227,80 @@ class Asset(Component):
         ..., description="List of asset states associated with the asset"
     )
     _raster_handler: str | None = None
+    _elevation: Distance | None = None
+    _elevation_coordinates: tuple[float, float] | None = None
+    _result_store: object | None = None
+    _state_index: dict[datetime, AssetState] = PrivateAttr(default_factory=dict)
+    _indexed_states: list[AssetState] | None = None
+    _indexed_count: int = 0
 
     @computed_field
     @property
     def elevation(self) -> Distance:
-        try:
-            elev = Distance(get_elevation(lat=self.latitude, lon=self.longitude), "meter")
-        except Exception:
-            logger.warning(
-                f"Error getting elevation information for asset {self.name} with coordinates {self.latitude}, {self.longitude}. Defaulting to 999 meters"
-            )
-            elev = Distance(999, "meter")
-        return elev
+        """Ground elevation, looked up with the default elevation provider on first access."""
+        if not self.has_elevation():
+            elevation_m = lookup_elevations(np.array([self.latitude]), np.array([self.longitude]))[
+                0
+            ]
+            self.set_elevation(Distance(elevation_m, "meter"))
+        return self._elevation
+
+    def has_elevation(self) -> bool:
+        """True if the elevation is stored for the current asset coordinates."""
+        return self._elevation is not None and self._elevation_coordinates == (
+            self.latitude,
+            self.longitude,
+        )
+
+    def set_elevation(self, elevation: Distance):
+        """Store the ground elevation of the asset at its current coordinates."""
+        self._elevation = elevation
+        self._elevation_coordinates = (self.latitude, self.longitude)
+
+    def get_asset_states(self) -> list[AssetState]:
+        """Get the asset states, built on demand when results live in an AssetStateStore."""
+        if self._result_store is not None and self._result_store.has_asset(self.uuid):
+            return self._result_store.get_asset_states(self.uuid)
+        return self.asset_state
+
+    def _get_state_index(self) -> dict[datetime, AssetState]:
+        """Timestamp to AssetState index, rebuilt only when asset_state was changed externally."""
+        if self._indexed_states is not self.asset_state or self._indexed_count != len(
+            self.asset_state
+        ):
+            state_index = {}
+            for asset_state in self.asset_state:
+                state_index.setdefault(asset_state.timestamp, asset_state)
+            self._state_index = state_index
+            self._indexed_states = self.asset_state
+            self._indexed_count = len(self.asset_state)
+        return self._state_index
+
+    def get_asset_state(self, timestamp: datetime) -> AssetState | None:
+        """Get the asset state at a timestamp, None if the asset was not simulated then."""
+        if self._result_store is not None and self._result_store.has_asset(self.uuid):
+            return self._result_store.get_asset_state(self.uuid, timestamp)
+        return self._get_state_index().get(timestamp)
 
     def _get_asset_state_at_timestamp(self, timestamp: datetime) -> AssetState | None:
-        for asset_state in self.asset_state:
-            if asset_state.timestamp == timestamp:
-                return asset_state
+        asset_state = self._get_state_index().get(timestamp)
+        if asset_state is not None:
+            return asset_state
         return AssetState(
             timestamp=timestamp,
         )
 
+    def _add_asset_state(self, asset_state: AssetState):
+        state_index = self._get_state_index()
+        self.asset_state.append(asset_state)
+        state_index.setdefault(asset_state.timestamp, asset_state)
+        self._indexed_count += 1
+
     def update_survival_probability(
         self, time_stamp: datetime, hazard_model: hz.BaseDisasterModel, frag_curves
     ):
         asset_state = self._get_asset_state_at_timestamp(time_stamp)
+        is_new_state = time_stamp not in self._get_state_index()
         asset_location = Point(self.longitude, self.latitude)
 
         if isinstance(hazard_model, hz.EarthQuakeModel):
@@ -253,32 +317,26 @@ class Asset(Component):
             raise (f"Unsupported hazard type {hazard_model.__class__.__name__}")
 
         self.calculate_probabilities(asset_state, frag_curves)
-        if asset_state not in self.asset_state:
-            self.asset_state.append(asset_state)
+        if is_new_state:
+            self._add_asset_state(asset_state)
         return asset_state
 
     def calculate_probabilities(self, asset_state: AssetState, frag_curves):
-        fields = [
-            model_field
-            for model_field in list(asset_state.model_fields.keys())
-            if model_field not in ["uuid", "name", "timestamp"]
-        ]
-        for field in fields:
+        for field in ASSET_STATE_PARAMETERS:
             prob_model = getattr(asset_state, field)
             if prob_model and prob_model.survival_probability == 1:
                 curve = self.get_vadid_curve(frag_curves, field)
                 if curve is None:
                     raise Exception(f"No fragility curve found for field - {field}")
                 prob_inst = curve.prob_model
-                quantity_name = [
-                    model_field
-                    for model_field in list(prob_model.model_fields.keys())
-                    if model_field not in ["uuid", "name", "survival_probability"]
-                ][0]
-                quantity = getattr(prob_model, quantity_name)
+                quantity = getattr(prob_model, PROBABILITY_QUANTITIES[type(prob_model)])
                 prob_model.survival_probability = 1 - prob_inst.probability(quantity)
 
-    def get_vadid_curve(self, frag_curves, field: SyntaxError) -> float:
+    def get_vadid_curve(self, frag_curves, field: str):
+        """Get the probability function for a field from a curve list or a FragilityTable."""
+        if hasattr(frag_curves, "get_prob_function"):
+            return frag_curves.get_prob_function(field, self.asset_type)
+
         for frag_curve in frag_curves:
             if frag_curve.asset_state_param == field:
                 for curve in frag_curve.curves:
@@ -298,3 +356,25 @@ class Asset(Component):
             longitude=-122.4194,
             asset_state=[AssetState.example()],
         )
+
+
+def set_asset_elevations(
+    assets: list[Asset], provider: ElevationProvider | None = None, overwrite: bool = False
+):
+    """Look up the ground elevation of many assets at once and store it on them.
+
+    Identical coordinates are only looked up once.
+
+    Args:
+        assets (list[Asset]): Assets to update
+        provider (ElevationProvider | None): Provider to use, defaults to the default provider
+        overwrite (bool): Replace elevations that are already stored on the assets
+    """
+    assets = [asset for asset in assets if overwrite or not asset.has_elevation()]
+    if not assets:
+        return
+    coordinates = np.array([(asset.latitude, asset.longitude) for asset in assets], dtype=float)
+    unique_coordinates, inverse = np.unique(coordinates, axis=0, return_inverse=True)
+    elevations = lookup_elevations(unique_coordinates[:, 0], unique_coordinates[:, 1], provider)
+    for asset, elevation_m in zip(assets, elevations[inverse.ravel()]):
+        asset.set_elevation(Distance(float(elevation_m), "meter"))
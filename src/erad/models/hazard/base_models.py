@@ -1,3 +1,4 @@
+from shapely.geometry.base import BaseGeometry
 import plotly.graph_objects as go
 from pydantic import ConfigDict
 from infrasys import Component
@@ -10,3 +11,11 @@ class BaseDisasterModel(Component):
         self, time_index: int, figure: go.Figure, map_obj: go.Scattergeo | go.Scattermap
     ) -> int:
         raise NotImplementedError("This method should be implemented in the derived classes")
+
+    def influence_footprint(self) -> BaseGeometry | None:
+        """Conservative area (longitude, latitude) outside of which the model has no effect.
+
+        Assets outside the footprint get the same intensities they would get from a full
+        evaluation, so the simulator can skip them. None means the model affects every asset.
+        """
+        return None
@@ -1,10 +1,12 @@
 from datetime import datetime
 
 from pydantic import field_serializer, field_validator
+from shapely.geometry.base import BaseGeometry
 from shapely.geometry import Polygon, Point
 from gdm.quantities import Distance
 import plotly.graph_objects as go
 from infrasys import Component
+import shapely
 
 from erad.models.hazard.base_models import BaseDisasterModel
 from erad.quantities import Speed
@@ -55,6 +57,10 @@ class FloodModel(BaseDisasterModel):
             affected_areas=[FloodModelArea.example()],
         )
 
+    def influence_footprint(self) -> BaseGeometry:
+        """Union of the affected areas, assets outside all areas are not flooded."""
+        return shapely.union_all([area.affected_area for area in self.affected_areas])
+
     def plot(
         self,
         time_index: int = 0,
@@ -1,10 +1,11 @@
 from datetime import datetime
 import sqlite3
+import math
 import os
 
 from pydantic import field_serializer, field_validator
 from infrasys.quantities import Distance
-from shapely.geometry import Point
+from shapely.geometry import Point, Polygon, box
 import plotly.graph_objects as go
 import geopandas as gpd
 import pandas as pd
@@ -13,6 +14,10 @@ from erad.models.hazard.common import ERAD_DB, HISTROIC_HURRICANE_TABLE
 from erad.models.hazard.base_models import BaseDisasterModel
 from erad.quantities import Speed, Pressure
 
+# Lower bounds on the length of one degree of latitude / longitude (at the equator) on WGS84
+MIN_KM_PER_DEGREE_LATITUDE = 110.574
+MIN_KM_PER_DEGREE_LONGITUDE = 111.319
+
 
 class WindModel(BaseDisasterModel):
     timestamp: datetime
@@ -45,6 +50,30 @@ class WindModel(BaseDisasterModel):
             radius_of_closest_isobar=Distance(300, "miles"),
         )
 
+    def influence_footprint(self) -> Polygon | None:
+        """Longitude / latitude box around the disk of radius `radius_of_closest_isobar`.
+
+        Wind speeds are exactly zero beyond the closest isobar. The box uses lower bounds on
+        the degree lengths plus a 1% margin so it always contains the geodesic disk. No
+        footprint is returned near the poles or across the antimeridian.
+        """
+        radius_km = 1.01 * self.radius_of_closest_isobar.to("km").magnitude
+        delta_latitude = radius_km / MIN_KM_PER_DEGREE_LATITUDE
+        max_latitude = abs(self.center.y) + delta_latitude
+        if max_latitude >= 89.0:
+            return None
+        delta_longitude = radius_km / (
+            MIN_KM_PER_DEGREE_LONGITUDE * math.cos(math.radians(max_latitude))
+        )
+        if abs(self.center.x) + delta_longitude >= 180.0:
+            return None
+        return box(
+            self.center.x - delta_longitude,
+            self.center.y - delta_latitude,
+            self.center.x + delta_longitude,
+            self.center.y + delta_latitude,
+        )
+
     @classmethod
     def from_hurricane_sid(cls, hurricane_sid: str) -> list["WindModel"]:
         assert os.path.exists(ERAD_DB), f"The data file {ERAD_DB} not found"
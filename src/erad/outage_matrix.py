@@ -0,0 +1,284 @@
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+import json
+
+from gdm.tracked_changes import TrackedChange, PropertyEdit
+from scipy import sparse
+from scipy.special import logsumexp
+import numpy as np
+
+from erad.models.edit_store import EditStore
+
+NO_FAILURE = -1
+
+
+class OutageMatrix:
+    """Columnar representation of sampled outage scenarios.
+
+    `first_failures[s, a]` is the index into `timestamps` at which component `a` goes out of
+    service in sample `s`, or -1 if it survives. Indices are held in the narrowest signed
+    integer type fitting the timestamps, int8 for up to 127 of them, so arithmetic on them
+    should widen first. TrackedChanges are only built on demand.
+
+    Sample weights are kept as logarithms, importance sampling likelihood ratios of large
+    systems do not fit a float. A deduplicated matrix (see `deduplicate`) holds each distinct
+    scenario once, `counts` gives the number of samples it stands for and `log_weights` the
+    log of the sum of their weights.
+    """
+
+    def __init__(
+        self,
+        first_failures: np.ndarray,
+        component_uuids: list[UUID],
+        timestamps: list[datetime],
+        sample_offset: int = 0,
+        log_weights: np.ndarray | None = None,
+        counts: np.ndarray | None = None,
+    ):
+        """Constructor for the OutageMatrix class.
+
+        Args:
+            first_failures (np.ndarray): First failure timestamp indices (samples x assets)
+            component_uuids (list[UUID]): UUID of the distribution component of each asset
+            timestamps (list[datetime]): Timestamps the indices refer to
+            sample_offset (int): Number of the first sample, scenarios are named sample_<n>
+            log_weights (np.ndarray | None): Log likelihood weight of each sample, None when
+                all samples are equally likely
+            counts (np.ndarray | None): Number of sampled scenarios each row stands for, None
+                when every row is a single sample
+        """
+        self.timestamps = list(timestamps)
+        self.first_failures = np.asarray(first_failures).astype(
+            _index_dtype(len(self.timestamps)), copy=False
+        )
+        self.component_uuids = list(component_uuids)
+        self.sample_offset = sample_offset
+        self.log_weights = None if log_weights is None else np.asarray(log_weights, dtype=float)
+        self.counts = None if counts is None else np.asarray(counts, dtype=np.int64)
+        if self.first_failures.ndim != 2 or self.first_failures.shape[1] != len(
+            self.component_uuids
+        ):
+            raise ValueError("first_failures should have shape (samples, number of assets)")
+        if self.log_weights is not None and self.log_weights.shape != (self.number_of_samples,):
+            raise ValueError("log_weights should have one value per sample")
+        if self.counts is not None and self.counts.shape != (self.number_of_samples,):
+            raise ValueError("counts should have one value per sample")
+
+    @property
+    def number_of_samples(self) -> int:
+        return self.first_failures.shape[0]
+
+    @property
+    def sample_weights(self) -> np.ndarray:
+        """Weights of the samples normalized to sum to one."""
+        if self.log_weights is None:
+            return np.full(self.number_of_samples, 1 / self.number_of_samples)
+        return np.exp(self.log_weights - logsumexp(self.log_weights))
+
+    @property
+    def sample_counts(self) -> np.ndarray:
+        """Number of sampled scenarios each row stands for."""
+        if self.counts is None:
+            return np.ones(self.number_of_samples, dtype=np.int64)
+        return self.counts
+
+    @property
+    def sample_log_weights(self) -> np.ndarray:
+        """Unnormalized log weights, the log of `sample_counts` when no weights are given."""
+        if self.log_weights is None:
+            return np.log(self.sample_counts)
+        return self.log_weights
+
+    @property
+    def scenario_names(self) -> list[str]:
+        return [
+            f"sample_{sample}"
+            for sample in range(self.sample_offset, self.sample_offset + self.number_of_samples)
+        ]
+
+    def __len__(self) -> int:
+        """Number of outage events (TrackedChanges) in the matrix."""
+        return int(np.count_nonzero(self.first_failures != NO_FAILURE))
+
+    def to_sparse(self) -> sparse.csr_matrix:
+        """Failed assets as a sparse boolean (samples x assets) matrix."""
+        samples, assets = np.nonzero(self.first_failures != NO_FAILURE)
+        return sparse.csr_matrix(
+            (np.ones(len(samples), dtype=bool), (samples, assets)),
+            shape=self.first_failures.shape,
+        )
+
+    def iter_tracked_changes(self) -> Iterator[TrackedChange]:
+        """Lazily build one TrackedChange per outage, in sample then asset order."""
+        for scenario_name, failures in zip(self.scenario_names, self.first_failures):
+            for ii in np.flatnonzero(failures != NO_FAILURE).tolist():
+                yield TrackedChange(
+                    scenario_name=scenario_name,
+                    timestamp=self.timestamps[failures[ii]],
+                    edits=[
+                        PropertyEdit(
+                            component_uuid=self.component_uuids[ii],
+                            name="in_service",
+                            value=False,
+                        )
+                    ],
+                )
+
+    def to_tracked_changes(self) -> list[TrackedChange]:
+        return list(self.iter_tracked_changes())
+
+    def to_edit_store(self) -> EditStore:
+        return EditStore(updates=self.to_tracked_changes())
+
+    @classmethod
+    def concatenate(cls, matrices: list["OutageMatrix"]) -> "OutageMatrix":
+        """Stack consecutive blocks of samples sharing the same assets and timestamps."""
+        first = matrices[0]
+        log_weights, counts = None, None
+        if any(matrix.log_weights is not None or matrix.counts is not None for matrix in matrices):
+            log_weights = np.concatenate([matrix.sample_log_weights for matrix in matrices])
+        if any(matrix.counts is not None for matrix in matrices):
+            counts = np.concatenate([matrix.sample_counts for matrix in matrices])
+        return cls(
+            np.concatenate([matrix.first_failures for matrix in matrices]),
+            first.component_uuids,
+            first.timestamps,
+            first.sample_offset,
+            log_weights,
+            counts,
+        )
+
+    def deduplicate(self) -> "OutageMatrix":
+        """Merge identical scenarios, keeping the first occurrence of each.
+
+        Two samples are identical when the same assets fail at the same timestamps, rows are
+        matched exactly on their bytes with a single sort. The result has one row per distinct
+        scenario in order of first occurrence, its `counts` hold the number of occurrences and
+        its `log_weights` the log of the summed sample weights, so `sample_weights` are the
+        scenario probabilities.
+        """
+        first_failures = np.ascontiguousarray(self.first_failures)
+        if first_failures.shape[1]:
+            rows = first_failures.view(
+                np.dtype((np.void, first_failures.dtype.itemsize * first_failures.shape[1]))
+            ).ravel()
+        else:
+            rows = np.zeros(len(first_failures), dtype=np.int8)
+        _, first_index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        # Renumber the distinct scenarios in order of first occurrence
+        order = np.argsort(first_index)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        inverse = rank[inverse.ravel()]
+        return OutageMatrix(
+            self.first_failures[first_index[order]],
+            self.component_uuids,
+            self.timestamps,
+            self.sample_offset,
+            log_bincount(inverse, self.sample_log_weights, len(order)),
+            np.bincount(inverse, weights=self.sample_counts, minlength=len(order)),
+        )
+
+    def to_npz(self, file_path: Path | str):
+        """Write the matrix to a compressed numpy archive."""
+        arrays = {}
+        if self.log_weights is not None:
+            arrays["log_weights"] = self.log_weights
+        if self.counts is not None:
+            arrays["counts"] = self.counts
+        np.savez_compressed(
+            file_path,
+            first_failures=self.first_failures,
+            component_uuids=np.array([str(uuid) for uuid in self.component_uuids]),
+            timestamps=np.array(self.timestamps, dtype="datetime64[us]"),
+            sample_offset=np.array(self.sample_offset),
+            **arrays,
+        )
+
+    @classmethod
+    def from_npz(cls, file_path: Path | str) -> "OutageMatrix":
+        with np.load(file_path) as data:
+            return cls(
+                data["first_failures"],
+                [UUID(uuid) for uuid in data["component_uuids"]],
+                data["timestamps"].astype(datetime).tolist(),
+                int(data["sample_offset"]),
+                data["log_weights"] if "log_weights" in data else None,
+                data["counts"] if "counts" in data else None,
+            )
+
+    def to_parquet(self, file_path: Path | str):
+        """Write the outages in long (sample, asset, timestamp index) form to Parquet.
+
+        The component UUIDs, timestamps, sample log weights and counts are stored in the file
+        metadata. Requires the optional pyarrow dependency.
+        """
+        pa, pq = _import_pyarrow()
+        samples, assets = np.nonzero(self.first_failures != NO_FAILURE)
+        table = pa.table(
+            {
+                "sample": samples.astype(np.int32),
+                "asset": assets.astype(np.int32),
+                "timestamp": self.first_failures[samples, assets],
+            }
+        )
+        metadata = {
+            "number_of_samples": self.number_of_samples,
+            "sample_offset": self.sample_offset,
+            "component_uuids": [str(uuid) for uuid in self.component_uuids],
+            "timestamps": [timestamp.isoformat() for timestamp in self.timestamps],
+            "log_weights": None if self.log_weights is None else self.log_weights.tolist(),
+            "counts": None if self.counts is None else self.counts.tolist(),
+        }
+        table = table.replace_schema_metadata({"erad_outage_matrix": json.dumps(metadata)})
+        pq.write_table(table, file_path, compression="zstd")
+
+    @classmethod
+    def from_parquet(cls, file_path: Path | str) -> "OutageMatrix":
+        _, pq = _import_pyarrow()
+        table = pq.read_table(file_path)
+        metadata = json.loads(table.schema.metadata[b"erad_outage_matrix"])
+        first_failures = np.full(
+            (metadata["number_of_samples"], len(metadata["component_uuids"])),
+            NO_FAILURE,
+            dtype=_index_dtype(len(metadata["timestamps"])),
+        )
+        first_failures[table.column("sample").to_numpy(), table.column("asset").to_numpy()] = (
+            table.column("timestamp").to_numpy()
+        )
+        return cls(
+            first_failures,
+            [UUID(uuid) for uuid in metadata["component_uuids"]],
+            [datetime.fromisoformat(timestamp) for timestamp in metadata["timestamps"]],
+            metadata["sample_offset"],
+            metadata.get("log_weights"),
+            metadata.get("counts"),
+        )
+
+
+def log_bincount(indices: np.ndarray, log_weights: np.ndarray, minlength: int) -> np.ndarray:
+    """Log of the summed weights per index, the log space counterpart of `np.bincount`."""
+    sums = np.full(max(minlength, int(indices.max(initial=-1)) + 1), -np.inf)
+    np.logaddexp.at(sums, indices, log_weights)
+    return sums
+
+
+def _index_dtype(number_of_timestamps: int) -> type:
+    """Narrowest signed integer type holding the timestamp indices and the -1 sentinel."""
+    for dtype in (np.int8, np.int16):
+        if number_of_timestamps <= np.iinfo(dtype).max:
+            return dtype
+    return np.int32
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+        import pyarrow as pa
+    except ImportError as error:
+        raise ImportError(
+            "pyarrow is required to read and write Parquet outage matrices, install erad[parquet]"
+        ) from error
+    return pa, pq
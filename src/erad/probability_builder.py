@@ -1,5 +1,53 @@
 from infrasys import BaseQuantity
+import scipy.special as special
 import scipy.stats as stats
+import numpy as np
+
+
+def _shape_loc_scale(params: list[float], n_shapes: int) -> tuple[list[float], float, float]:
+    """Split positional scipy.stats parameters into shapes, loc and scale."""
+    shapes = list(params[:n_shapes])
+    loc = params[n_shapes] if len(params) > n_shapes else 0.0
+    scale = params[n_shapes + 1] if len(params) > n_shapes + 1 else 1.0
+    return shapes, loc, scale
+
+
+def _positive_support_sf(values: np.ndarray, params: list[float], n_shapes: int, sf) -> np.ndarray:
+    shapes, loc, scale = _shape_loc_scale(params, n_shapes)
+    z = (values - loc) / scale
+    survival = np.ones_like(z)
+    positive = z > 0
+    survival[positive] = sf(z[positive], *shapes)
+    survival[np.isnan(z)] = np.nan
+    return survival
+
+
+def _lognorm_sf(values: np.ndarray, params: list[float]) -> np.ndarray:
+    return _positive_support_sf(
+        values, params, 1, lambda z, s: 0.5 * special.erfc(np.log(z) / (s * np.sqrt(2)))
+    )
+
+
+def _weibull_min_sf(values: np.ndarray, params: list[float]) -> np.ndarray:
+    return _positive_support_sf(values, params, 1, lambda z, c: np.exp(-(z**c)))
+
+
+def _expon_sf(values: np.ndarray, params: list[float]) -> np.ndarray:
+    return _positive_support_sf(values, params, 0, lambda z: np.exp(-z))
+
+
+def _norm_sf(values: np.ndarray, params: list[float]) -> np.ndarray:
+    _, loc, scale = _shape_loc_scale(params, 0)
+    return 0.5 * special.erfc((values - loc) / (scale * np.sqrt(2)))
+
+
+# Closed form survival functions for the distributions used by the default fragility curves
+CLOSED_FORM_SURVIVAL = {
+    "lognorm": _lognorm_sf,
+    "weibull_min": _weibull_min_sf,
+    "expon": _expon_sf,
+    "norm": _norm_sf,
+}
 
 
 class ProbabilityFunctionBuilder:
@@ -17,6 +65,7 @@ class ProbabilityFunctionBuilder:
         self.units = base_quantity.units
         self.dist = getattr(stats, dist)
         self.params = [p.magnitude if isinstance(p, BaseQuantity) else p for p in params]
+        self.frozen = self.dist(*self.params)
         return
 
     def sample(self):
@@ -36,3 +85,18 @@ class ProbabilityFunctionBuilder:
             return cdf(value.to(self.units).magnitude, *self.params)
         except Exception:
             return cdf(value, *self.params)
+
+    def survival_probability(self, values: np.ndarray) -> np.ndarray:
+        """Survival probabilities (1 - cdf) for an array of values.
+
+        Unlike `probability` no unit conversion is done, the values must already be in
+        `self.units`. Distributions in `CLOSED_FORM_SURVIVAL` skip scipy.stats entirely.
+
+        Args:
+            values (np.ndarray): Values of the vector of interest in the builder units
+        """
+        values = np.asarray(values, dtype=float)
+        closed_form = CLOSED_FORM_SURVIVAL.get(self.dist.name)
+        if closed_form is not None:
+            return closed_form(values, self.params)
+        return self.frozen.sf(values)
@@ -0,0 +1,105 @@
+from datetime import datetime
+from uuid import UUID
+
+import numpy as np
+
+from erad.engine import VectorizedHazardEngine
+from erad.models.asset import AssetState
+
+
+class AssetStateStore:
+    """Array backed store of simulation results for assets x timestamps.
+
+    Each hazard parameter gets an intensity array and a survival probability array of shape
+    (number of assets, number of timestamps), allocated the first time the parameter is
+    written. Cells that were never computed hold NaN. AssetState objects are only built when
+    requested through `get_asset_state` / `get_asset_states`.
+    """
+
+    def __init__(
+        self,
+        asset_uuids: list[UUID],
+        timestamps: list[datetime],
+        dtype: type = np.float64,
+    ):
+        """Constructor for the AssetStateStore class.
+
+        Args:
+            asset_uuids (list[UUID]): UUIDs of the Asset components, one row each
+            timestamps (list[datetime]): Simulated timestamps, one column each
+            dtype (type): Floating point type of the arrays, np.float32 halves the memory
+        """
+        self.asset_uuids = list(asset_uuids)
+        self.timestamps = sorted(timestamps)
+        self.dtype = np.dtype(dtype)
+        self.asset_index = {uuid: ii for ii, uuid in enumerate(self.asset_uuids)}
+        self.timestamp_index = {timestamp: jj for jj, timestamp in enumerate(self.timestamps)}
+        self.intensities: dict[str, np.ndarray] = {}
+        self.survival: dict[str, np.ndarray] = {}
+        self.written = np.zeros(len(self.timestamps), dtype=bool)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (len(self.asset_uuids), len(self.timestamps))
+
+    def _get_array(self, arrays: dict[str, np.ndarray], param: str) -> np.ndarray:
+        if param not in arrays:
+            arrays[param] = np.full(self.shape, np.nan, dtype=self.dtype)
+        return arrays[param]
+
+    def write(
+        self,
+        timestamp: datetime,
+        intensities: dict[str, np.ndarray],
+        survival: dict[str, np.ndarray],
+    ):
+        """Store the intensities and survival probabilities of all assets at a timestamp.
+
+        Args:
+            timestamp (datetime): Timestamp the values were computed for
+            intensities (dict[str, np.ndarray]): Intensities per parameter in the units of
+                `HAZARD_PARAMETER_UNITS`, one value per asset
+            survival (dict[str, np.ndarray]): Survival probabilities per parameter
+        """
+        jj = self.timestamp_index[timestamp]
+        for param, values in intensities.items():
+            self._get_array(self.intensities, param)[:, jj] = values
+            self._get_array(self.survival, param)[:, jj] = survival[param]
+        self.written[jj] = True
+
+    @property
+    def survival_probability(self) -> np.ndarray:
+        """Overall survival probability matrix (assets x timestamps).
+
+        Parameters that were not computed for a cell count as certain survival, the same way
+        `AssetState.survival_probability` treats missing probability models.
+        """
+        survival = np.ones(self.shape, dtype=self.dtype)
+        for values in self.survival.values():
+            survival *= np.where(np.isnan(values), 1, values)
+        return survival
+
+    def has_asset(self, asset_uuid: UUID) -> bool:
+        return asset_uuid in self.asset_index
+
+    def get_asset_state(self, asset_uuid: UUID, timestamp: datetime) -> AssetState | None:
+        """Build the AssetState of an asset at a timestamp, None if it was not simulated."""
+        jj = self.timestamp_index.get(timestamp)
+        if jj is None or not self.written[jj]:
+            return None
+        return self._build_asset_state(self.asset_index[asset_uuid], jj)
+
+    def get_asset_states(self, asset_uuid: UUID) -> list[AssetState]:
+        """Build all AssetStates of an asset in timestamp order."""
+        ii = self.asset_index[asset_uuid]
+        return [self._build_asset_state(ii, jj) for jj in np.flatnonzero(self.written).tolist()]
+
+    def _build_asset_state(self, ii: int, jj: int) -> AssetState:
+        probability_models = {
+            param: VectorizedHazardEngine.build_probability_model(
+                param, values[ii, jj], self.survival[param][ii, jj]
+            )
+            for param, values in self.intensities.items()
+            if not np.isnan(values[ii, jj])
+        }
+        return AssetState(timestamp=self.timestamps[jj], **probability_models)
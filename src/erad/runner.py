@@ -1,27 +1,55 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from collections.abc import Iterator
 from datetime import datetime
+from typing import Literal
+from uuid import UUID
+import itertools
+import time
 
 from gdm.distribution import DistributionSystem
 from loguru import logger
 import numpy as np
 
-from gdm.tracked_changes import (
-    TrackedChange,
-    PropertyEdit,
-)
+from gdm.tracked_changes import TrackedChange
 
-from erad.default_fragility_curves import DEFAULT_FRAGILTY_CURVES
-from erad.models.fragility_curve import HazardFragilityCurves
+from erad.analytics import FailureStatistics
+from erad.constants import HAZARD_PARAMETERS, HAZARD_TYPES
+from erad.convergence import (
+    CONVERGENCE_METRICS,
+    AdaptiveSamplingResult,
+    ConvergenceMetric,
+    RunningEstimate,
+    get_asset_loads,
+    get_metric_values,
+)
+from erad.fragility_table import FragilityTable
+from erad.outage_matrix import NO_FAILURE, OutageMatrix
+from erad.result_store import AssetStateStore
+from erad.sampling import (
+    SAMPLING_STRATEGIES,
+    SamplingStrategy,
+    draw_uniform,
+    importance_survival,
+    log_likelihood_weights,
+)
+from erad.scenario_reduction import ReductionMethod, reduce_scenarios
+from erad.scenario_sink import ScenarioSink
+from erad.engine import VectorizedHazardEngine
 from erad.systems.hazard_system import HazardSystem
 from erad.systems.asset_system import AssetSystem
-from erad.constants import HAZARD_TYPES
 from erad.models.asset import Asset
 
+# Maximum number of random draws held in memory at once by the scenario samplers
+MAX_SAMPLE_BLOCK_SIZE = 2**24
+
 
 class HazardSimulator:
     def __init__(self, asset_system: AssetSystem):
         self._asset_system = asset_system
         self._asset_system.auto_add_composed_components = True
         self.assets: list[Asset] = list(asset_system.get_components(Asset))
+        self.result_store: AssetStateStore | None = None
 
     @classmethod
     def from_gdm(cls, dist_system: DistributionSystem) -> "HazardSimulator":
@@ -41,33 +69,86 @@ class HazardSimulator:
                 timestamps.append(model.timestamp)
         return sorted(timestamps)
 
-    def run(self, hazard_system: HazardSystem, curve_set: str = "DEFAULT_CURVES"):
-        probability_models = list(
-            hazard_system.get_components(
-                HazardFragilityCurves, filter_func=lambda x: x.name == curve_set
-            )
-        )
+    def run(
+        self,
+        hazard_system: HazardSystem,
+        curve_set: str = "DEFAULT_CURVES",
+        engine: Literal["per_asset", "vectorized"] = "per_asset",
+        result_dtype: type = np.float64,
+    ):
+        """Simulate the hazards in the HazardSystem for all assets.
 
-        if not probability_models:
-            logger.warning(
-                "No HazardFragilityCurves definitions found in the passed HazardSystem, using default curve definitions"
-            )
-            probability_models = DEFAULT_FRAGILTY_CURVES
+        Args:
+            hazard_system (HazardSystem): System containing the hazard models to simulate
+            curve_set (str): Name of the HazardFragilityCurves set to use
+            engine (str): "per_asset" evaluates one asset at a time, "vectorized" packs the
+                assets into arrays and evaluates all of them at each timestamp in one pass
+            result_dtype (type): Floating point type of the AssetStateStore written by the
+                vectorized engine
+
+        The vectorized engine does not create AssetState components. Its results are kept in
+        an AssetStateStore attached to the AssetSystem; use `Asset.get_asset_states()` to read
+        them or `AssetSystem.materialize_asset_states()` to convert them into components.
+        """
+        if engine not in ("per_asset", "vectorized"):
+            raise ValueError(f"Unsupported simulation engine {engine}")
 
         self.hazard_system = hazard_system
         self.timestamps = self._get_time_stamps()
-        for timestamp in self.timestamps:
+        # Compiling the curves up front reports missing curves before any work is done
+        fragility_table = FragilityTable.from_hazard_system(
+            hazard_system,
+            curve_set,
+            parameters=[
+                param
+                for hazard_type, params in HAZARD_PARAMETERS.items()
+                if list(hazard_system.get_components(hazard_type))
+                for param in params
+            ],
+            asset_types=[asset.asset_type for asset in self.assets],
+        )
+        if engine == "vectorized":
+            self._run_vectorized(fragility_table, result_dtype)
+            return
+
+        # States of an earlier vectorized run are updated in place by the per-asset engine
+        self._asset_system.materialize_asset_states()
+        self.result_store = None
+        for timestamp in sorted(set(self.timestamps)):
             logger.info(f"Simulating hazard at {timestamp}")
+            new_asset_states = []
             for hazard_type in HAZARD_TYPES:
                 for hazard_model in self.hazard_system.get_components(
                     hazard_type, filter_func=lambda x: x.timestamp == timestamp
                 ):
                     for asset in self.assets:
-                        assset_state = asset.update_survival_probability(
-                            timestamp, hazard_model, probability_models
+                        is_new_state = asset.get_asset_state(timestamp) is None
+                        asset_state = asset.update_survival_probability(
+                            timestamp, hazard_model, fragility_table
                         )
-                        if not self._asset_system.has_component(assset_state):
-                            self._asset_system.add_component(assset_state)
+                        if is_new_state:
+                            new_asset_states.append(asset_state)
+            self._asset_system.add_components(*new_asset_states)
+
+    def _run_vectorized(self, fragility_table: FragilityTable, dtype: type):
+        engine = VectorizedHazardEngine(self.assets, fragility_table)
+        timestamps = sorted(set(self.timestamps))
+        self.result_store = AssetStateStore(
+            [asset.uuid for asset in self.assets], timestamps, dtype
+        )
+        for timestamp in timestamps:
+            logger.info(f"Simulating hazard at {timestamp}")
+            hazard_models = [
+                hazard_model
+                for hazard_type in HAZARD_TYPES
+                for hazard_model in self.hazard_system.get_components(
+                    hazard_type, filter_func=lambda x: x.timestamp == timestamp
+                )
+            ]
+            intensities = engine.compute_intensities(hazard_models)
+            survival = engine.compute_survival_probabilities(intensities)
+            self.result_store.write(timestamp, intensities, survival)
+        self._asset_system.attach_result_store(self.result_store)
 
 
 class HazardScenarioGenerator:
@@ -76,52 +157,467 @@ class HazardScenarioGenerator:
         asset_system: AssetSystem,
         hazard_system: HazardSystem,
         curve_set: str = "DEFAULT_CURVES",
+        engine: Literal["per_asset", "vectorized"] = "per_asset",
     ):
         self.assets = list(asset_system.get_components(Asset))
+        self._duplicate_name_groups = self._get_duplicate_name_groups()
         self.hazard_simulator = HazardSimulator(asset_system)
-        self.hazard_simulator.run(hazard_system, curve_set)
+        self.hazard_simulator.run(hazard_system, curve_set, engine=engine)
 
-    def _sample(self, scenario_name: str) -> list[TrackedChange]:
-        outaged_assets = []
-        tracked_changes = []
+    def get_survival_matrix(self) -> tuple[np.ndarray, list[datetime]]:
+        """Survival probabilities of the assets (assets x timestamps) in timestamp order."""
+        store = self.hazard_simulator.result_store
+        if store is not None and all(store.has_asset(asset.uuid) for asset in self.assets):
+            rows = [store.asset_index[asset.uuid] for asset in self.assets]
+            columns = np.flatnonzero(store.written)
+            survival = store.survival_probability[np.ix_(rows, columns)].astype(np.float64)
+            return survival, [store.timestamps[jj] for jj in columns]
+
+        asset_states = [
+            sorted(asset.get_asset_states(), key=lambda asset_state: asset_state.timestamp)
+            for asset in self.assets
+        ]
+        timestamps = (
+            [asset_state.timestamp for asset_state in asset_states[0]] if asset_states else []
+        )
+        survival = np.array(
+            [
+                [asset_state.survival_probability for asset_state in states]
+                for states in asset_states
+            ],
+            dtype=np.float64,
+        ).reshape(len(self.assets), len(timestamps))
+        return survival, timestamps
 
-        n_assets = len(self.assets)
-        n_timestamps = len(self.assets[0].asset_state)
+    def get_failure_statistics(self) -> FailureStatistics:
+        """Exact failure statistics of the assets, an alternative to sampling scenarios."""
+        survival, timestamps = self.get_survival_matrix()
+        return FailureStatistics(
+            survival, timestamps, [asset.distribution_asset for asset in self.assets]
+        )
 
-        ramdom_samples = np.random.random((n_assets, n_timestamps))
+    @staticmethod
+    def get_first_failures(random_samples: np.ndarray, survival: np.ndarray) -> np.ndarray:
+        """Timestamp index of the first failure of each asset in each sample, -1 if none.
 
-        for ii, asset in enumerate(self.assets):
-            for jj, state in enumerate(
-                sorted(asset.asset_state, key=lambda asset_state: asset_state.timestamp)
-            ):
-                if (
-                    ramdom_samples[ii, jj] > state.survival_probability
-                    and asset.name not in outaged_assets
-                ):
-                    tracked_changes.append(
-                        TrackedChange(
-                            scenario_name=scenario_name,
-                            timestamp=state.timestamp,
-                            edits=[
-                                PropertyEdit(
-                                    component_uuid=asset.distribution_asset,
-                                    name="in_service",
-                                    value=False,
-                                )
-                            ],
-                        ),
-                    )
-                    outaged_assets.append(asset.name)
+        Args:
+            random_samples (np.ndarray): Uniform draws of shape (samples, assets, timestamps)
+            survival (np.ndarray): Survival probabilities of shape (assets, timestamps)
+        """
+        failed = random_samples > survival
+        if not failed.shape[2]:
+            return np.full(failed.shape[:2], NO_FAILURE)
+        return np.where(failed.any(axis=2), failed.argmax(axis=2), NO_FAILURE)
 
-        return tracked_changes
+    def _get_duplicate_name_groups(self) -> list[np.ndarray]:
+        names = np.array([asset.name for asset in self.assets], dtype=object)
+        _, inverse, counts = np.unique(names, return_inverse=True, return_counts=True)
+        return [np.flatnonzero(inverse == group) for group in np.flatnonzero(counts > 1)]
+
+    def _drop_duplicate_names(self, first_failures: np.ndarray) -> np.ndarray:
+        """Outage an asset name at most once per sample, by the first failed asset with it."""
+        for group in self._duplicate_name_groups:
+            failed = first_failures[:, group] != NO_FAILURE
+            keep = np.zeros_like(failed)
+            keep[np.arange(len(failed)), failed.argmax(axis=1)] = True
+            first_failures[:, group] = np.where(
+                failed & keep, first_failures[:, group], NO_FAILURE
+            )
+        return first_failures
+
+    def iter_outage_matrices(
+        self,
+        number_of_samples: int = 1,
+        seed: int = 0,
+        n_workers: int | None = None,
+        samples_per_block: int = 100,
+        strategy: SamplingStrategy = "monte_carlo",
+        importance_boost: float = 10.0,
+    ) -> Iterator[OutageMatrix]:
+        """Lazily sample outage scenarios, yielding one OutageMatrix per block of samples.
+
+        Draws for a block of samples are generated as one (samples x assets x timestamps)
+        array and the first failure of every asset is found with a vectorized argmax.
+
+        Plain Monte Carlo without `n_workers` draws from the global numpy random generator
+        seeded with `seed`, the same stream as drawing one (assets x timestamps) block per
+        sample. Otherwise every block of `samples_per_block` samples gets its own
+        `np.random.SeedSequence(seed).spawn` child, blocks are sampled on a process pool and
+        the scenarios only depend on `seed` and `samples_per_block`, not on the number of
+        workers.
 
-    def samples(self, number_of_samples: int = 1, seed: int = 0) -> list[TrackedChange]:
+        Latin hypercube, antithetic and Sobol designs stratify the samples within each
+        block, Sobol sampling requires `samples_per_block` to be a power of two. Importance
+        sampling draws failures with probabilities boosted by `importance_boost` and attaches
+        the log likelihood ratio of every sample as its log weight to the outage matrices.
+        Weighted estimates use those weights instead of 1 / samples.
+
+        Args:
+            number_of_samples (int): Number of scenarios, named sample_0, sample_1, ...
+            seed (int): Seed of the random draws
+            n_workers (int | None): Number of worker processes, None samples in this process
+            samples_per_block (int): Number of samples drawn at once
+            strategy (SamplingStrategy): "monte_carlo", "latin_hypercube", "antithetic",
+                "sobol" or "importance"
+            importance_boost (float): Factor applied to failure probabilities by importance
+                sampling
+        """
         if number_of_samples < 1:
             raise ValueError("number_of_samples should be a positive integer")
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(
+                f"Unsupported sampling strategy {strategy}, use one of {SAMPLING_STRATEGIES}"
+            )
+        if strategy == "sobol" and samples_per_block & (samples_per_block - 1):
+            raise ValueError(
+                "Sobol sampling requires a power of two samples_per_block, "
+                f"got {samples_per_block}"
+            )
+        survival, timestamps = self.get_survival_matrix()
+        if n_workers is None and strategy == "monte_carlo":
+            block_size = min(samples_per_block, MAX_SAMPLE_BLOCK_SIZE // max(survival.size, 1))
+            blocks = self._iter_first_failures(survival, number_of_samples, seed, block_size)
+        else:
+            blocks = iter_first_failures_parallel(
+                survival,
+                number_of_samples,
+                seed,
+                n_workers or 1,
+                samples_per_block,
+                strategy,
+                importance_boost,
+            )
+
+        component_uuids = [asset.distribution_asset for asset in self.assets]
+        sample_offset = 0
+        for first_failures, log_weights in blocks:
+            logger.info(
+                f"Generating samples {sample_offset + 1}-{sample_offset + len(first_failures)}"
+                f"/{number_of_samples}"
+            )
+            yield OutageMatrix(
+                self._drop_duplicate_names(first_failures),
+                component_uuids,
+                timestamps,
+                sample_offset,
+                log_weights,
+            )
+            sample_offset += len(first_failures)
+
+    def outage_matrix(self, number_of_samples: int = 1, seed: int = 0, **kwargs) -> OutageMatrix:
+        """Sample outage scenarios into a single OutageMatrix.
+
+        See `iter_outage_matrices` for the arguments. The scenarios are the same as the
+        TrackedChanges returned by `samples`.
+        """
+        return OutageMatrix.concatenate(
+            list(self.iter_outage_matrices(number_of_samples, seed, **kwargs))
+        )
+
+    def unique_outage_matrix(
+        self, number_of_samples: int = 1, seed: int = 0, **kwargs
+    ) -> OutageMatrix:
+        """Sample outage scenarios and merge the identical ones.
+
+        Every block of samples is deduplicated as it is drawn, so memory scales with the
+        number of distinct scenarios. The result holds each distinct scenario once with its
+        number of occurrences in `counts` and its probability in `sample_weights`, see
+        `OutageMatrix.deduplicate`. See `iter_outage_matrices` for the arguments.
+        """
+        return OutageMatrix.concatenate(
+            [
+                outage_matrix.deduplicate()
+                for outage_matrix in self.iter_outage_matrices(number_of_samples, seed, **kwargs)
+            ]
+        ).deduplicate()
+
+    def reduced_outage_matrix(
+        self,
+        number_of_scenarios: int,
+        number_of_samples: int = 1,
+        seed: int = 0,
+        method: ReductionMethod = "fast_forward",
+        asset_loads: dict[UUID, float] | None = None,
+        **kwargs,
+    ) -> OutageMatrix:
+        """Sample outage scenarios and reduce them to representative, weighted scenarios.
+
+        See `erad.scenario_reduction.reduce_scenarios` for the reduction and
+        `iter_outage_matrices` for the sampling arguments.
+
+        Args:
+            number_of_scenarios (int): Number of representative scenarios
+            number_of_samples (int): Number of sampled scenarios to reduce
+            seed (int): Seed of the random draws
+            method (ReductionMethod): "fast_forward" or "k_medoids"
+            asset_loads (dict[UUID, float] | None): Load of the distribution component of
+                each asset, used to weight the scenario distances
+        """
+        return reduce_scenarios(
+            self.unique_outage_matrix(number_of_samples, seed, **kwargs),
+            number_of_scenarios,
+            method,
+            asset_loads,
+        )
+
+    def adaptive_outage_matrix(
+        self,
+        seed: int = 0,
+        max_samples: int = 100_000,
+        min_samples: int = 100,
+        samples_per_block: int = 100,
+        metrics: tuple[ConvergenceMetric, ...] = ("failed_assets",),
+        relative_tolerance: float = 0.05,
+        absolute_tolerance: float = 0.0,
+        confidence: float = 0.95,
+        time_budget_s: float | None = None,
+        asset_loads: dict[UUID, float] | None = None,
+        **kwargs,
+    ) -> AdaptiveSamplingResult:
+        """Sample blocks of outage scenarios until the chosen metrics have converged.
+
+        After every block the running estimates and normal confidence intervals of `metrics`
+        are updated. Sampling stops once every interval half width is below
+        max(`absolute_tolerance`, `relative_tolerance` x |estimate|), or when `max_samples`
+        or `time_budget_s` is reached. Per-asset failure rates converge when every asset
+        does, so `absolute_tolerance` should be set for assets that rarely fail. A metric
+        without any observed variation, e.g. when nothing fails, gets the rule of three
+        interval instead of a zero width one. The intervals of stratified strategies assume
+        independent samples and are conservative.
+
+        Args:
+            seed (int): Seed of the random draws
+            max_samples (int): Maximum number of scenarios
+            min_samples (int): Number of scenarios drawn before convergence is checked
+            samples_per_block (int): Number of samples drawn between convergence checks
+            metrics (tuple[ConvergenceMetric, ...]): "failed_assets", "asset_failure_rates"
+                and / or "outaged_load"
+            relative_tolerance (float): Target half width relative to the estimate
+            absolute_tolerance (float): Target half width in the units of the metric
+            confidence (float): Confidence level of the intervals
+            time_budget_s (float | None): Stop after this many seconds, None for no limit
+            asset_loads (dict[UUID, float] | None): Load of the distribution component of
+                each asset, required by "outaged_load"
+            kwargs: Other arguments of `iter_outage_matrices`
+
+        Returns:
+            AdaptiveSamplingResult: Scenarios, estimates and convergence status
+        """
+        for metric in metrics:
+            if metric not in CONVERGENCE_METRICS:
+                raise ValueError(
+                    f"Unsupported convergence metric {metric}, use one of {CONVERGENCE_METRICS}"
+                )
+        if "outaged_load" in metrics and asset_loads is None:
+            raise ValueError("asset_loads are required to estimate the outaged load")
+        loads = get_asset_loads([asset.distribution_asset for asset in self.assets], asset_loads)
+        value_ranges = {
+            "failed_assets": len(self.assets),
+            "asset_failure_rates": 1.0,
+            "outaged_load": None if loads is None else loads.sum(),
+        }
+        estimates = {
+            metric: RunningEstimate(
+                (len(self.assets),) if metric == "asset_failure_rates" else (),
+                value_ranges[metric],
+            )
+            for metric in metrics
+        }
+
+        start = time.perf_counter()
+        blocks, converged = [], False
+        for outage_matrix in self.iter_outage_matrices(
+            max_samples, seed, samples_per_block=samples_per_block, **kwargs
+        ):
+            blocks.append(outage_matrix)
+            for metric, estimate in estimates.items():
+                estimate.update(
+                    get_metric_values(outage_matrix, metric, loads), outage_matrix.log_weights
+                )
+            n_samples = outage_matrix.sample_offset + outage_matrix.number_of_samples
+            converged = n_samples >= min_samples and all(
+                estimate.is_converged(confidence, relative_tolerance, absolute_tolerance)
+                for estimate in estimates.values()
+            )
+            if converged:
+                logger.info(f"Metrics converged after {n_samples} samples")
+                break
+            if time_budget_s is not None and time.perf_counter() - start >= time_budget_s:
+                logger.warning(f"Time budget reached after {n_samples} samples")
+                break
+        return AdaptiveSamplingResult(
+            OutageMatrix.concatenate(blocks),
+            estimates,
+            converged,
+            time.perf_counter() - start,
+            confidence,
+        )
+
+    def iter_samples(
+        self, number_of_samples: int = 1, seed: int = 0, **kwargs
+    ) -> Iterator[list[TrackedChange]]:
+        """Lazily sample outage scenarios, yielding the TrackedChanges of one block at a time.
+
+        Only one block of samples is held in memory, see `iter_outage_matrices` for the
+        arguments. The scenarios are the same as the ones returned by `samples`.
+        """
+        for outage_matrix in self.iter_outage_matrices(number_of_samples, seed, **kwargs):
+            yield outage_matrix.to_tracked_changes()
+
+    def _iter_first_failures(
+        self, survival: np.ndarray, number_of_samples: int, seed: int, block_size: int
+    ) -> Iterator[tuple[np.ndarray, None]]:
         np.random.seed(seed)
+        block_size = max(1, block_size)
+        for start in range(0, number_of_samples, block_size):
+            n_samples = min(block_size, number_of_samples - start)
+            random_samples = np.random.random((n_samples, *survival.shape))
+            yield self.get_first_failures(random_samples, survival), None
+
+    def samples(self, number_of_samples: int = 1, seed: int = 0, **kwargs) -> list[TrackedChange]:
+        """Sample outage scenarios.
+
+        See `iter_outage_matrices` for the arguments. TrackedChanges carry no sample weights,
+        use `outage_matrix` with importance sampling.
+
+        Args:
+            number_of_samples (int): Number of scenarios, named sample_0, sample_1, ...
+            seed (int): Seed of the random draws
+        """
         tracked_changes = []
-        for i in range(number_of_samples):
-            logger.info(f"Generating sample {i+1}/{number_of_samples}")
-            scenario_name = f"sample_{i}"
-            tracked_changes.extend(self._sample(scenario_name))
+        for block in self.iter_samples(number_of_samples, seed, **kwargs):
+            tracked_changes.extend(block)
         return tracked_changes
+
+    def write_samples(
+        self, sink: ScenarioSink, number_of_samples: int = 1, seed: int = 0, **kwargs
+    ) -> int:
+        """Sample outage scenarios and write them to a sink one block at a time.
+
+        Memory use does not grow with the number of samples. See `iter_outage_matrices` for
+        the arguments.
+
+        Returns:
+            int: Number of TrackedChanges written
+        """
+        n_changes = 0
+        with sink:
+            for block in self.iter_samples(number_of_samples, seed, **kwargs):
+                sink.write(block)
+                n_changes += len(block)
+        return n_changes
+
+
+def sample_first_failures(
+    survival: np.ndarray,
+    strategy: SamplingStrategy,
+    importance_boost: float,
+    seed_sequence: np.random.SeedSequence,
+    number_of_samples: int,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """First failures of one block of samples and their log weights, None without importance.
+
+    At most `MAX_SAMPLE_BLOCK_SIZE` draws are held in memory at once. Larger blocks draw the
+    assets in chunks, the stratification of Latin hypercube, antithetic and Sobol designs
+    then holds within each chunk of assets.
+
+    Args:
+        survival (np.ndarray): Survival probabilities of shape (assets, timestamps)
+        strategy (SamplingStrategy): Sampling strategy, see `draw_uniform`
+        importance_boost (float): Failure probability factor of importance sampling
+        seed_sequence (np.random.SeedSequence): Seed of the block
+        number_of_samples (int): Number of samples in the block
+    """
+    rng = np.random.default_rng(seed_sequence)
+    draw_survival = survival
+    if strategy == "importance":
+        draw_survival = importance_survival(survival, importance_boost)
+
+    # Stratified designs span all the samples of a block, so draws are capped by drawing the
+    # assets in chunks, each chunk with its own design over the full block of samples
+    assets_per_chunk = max(
+        1, MAX_SAMPLE_BLOCK_SIZE // max(number_of_samples * survival.shape[1], 1)
+    )
+    first_failures = np.empty((number_of_samples, len(survival)), dtype=int)
+    for start in range(0, len(survival), assets_per_chunk):
+        chunk_survival = draw_survival[start : start + assets_per_chunk]
+        random_samples = draw_uniform(strategy, rng, number_of_samples, chunk_survival.shape)
+        first_failures[:, start : start + assets_per_chunk] = (
+            HazardScenarioGenerator.get_first_failures(random_samples, chunk_survival)
+        )
+    if strategy != "importance":
+        return first_failures, None
+    return first_failures, log_likelihood_weights(first_failures, survival, draw_survival)
+
+
+# Survival matrix and strategy of a pool worker process, sent once by the pool initializer
+_worker_state: tuple | None = None
+
+
+def _init_sampling_worker(
+    survival: np.ndarray, strategy: SamplingStrategy, importance_boost: float
+):
+    global _worker_state
+    _worker_state = (survival, strategy, importance_boost)
+
+
+def _sample_worker_block(
+    seed_sequence: np.random.SeedSequence, number_of_samples: int
+) -> tuple[np.ndarray, np.ndarray | None]:
+    return sample_first_failures(*_worker_state, seed_sequence, number_of_samples)
+
+
+def iter_first_failures_parallel(
+    survival: np.ndarray,
+    number_of_samples: int,
+    seed: int,
+    n_workers: int,
+    samples_per_block: int = 100,
+    strategy: SamplingStrategy = "monte_carlo",
+    importance_boost: float = 10.0,
+) -> Iterator[tuple[np.ndarray, np.ndarray | None]]:
+    """First failure timestamp index of each asset per sample, -1 if none, drawn in parallel.
+
+    Block k of `samples_per_block` samples is drawn from child k of
+    `np.random.SeedSequence(seed)`, so the result is identical for any number of workers.
+    Blocks are yielded in order as (samples x assets) arrays with the log weights of the
+    samples, None unless importance sampling is used.
+
+    Args:
+        survival (np.ndarray): Survival probabilities of shape (assets, timestamps)
+        number_of_samples (int): Number of samples
+        seed (int): Entropy of the root seed sequence
+        n_workers (int): Number of worker processes, 1 samples in this process
+        samples_per_block (int): Number of samples drawn from each child seed sequence
+        strategy (SamplingStrategy): Sampling strategy, see `draw_uniform`
+        importance_boost (float): Failure probability factor of importance sampling
+    """
+    if n_workers < 1 or samples_per_block < 1:
+        raise ValueError("n_workers and samples_per_block should be positive integers")
+    block_sizes = [
+        min(samples_per_block, number_of_samples - start)
+        for start in range(0, number_of_samples, samples_per_block)
+    ]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    worker_state = (survival, strategy, importance_boost)
+    if n_workers == 1:
+        for seed_sequence, block_size in zip(seed_sequences, block_sizes):
+            yield sample_first_failures(*worker_state, seed_sequence, block_size)
+    else:
+        # Blocks are submitted lazily so a consumer that stops early does not wait on the rest
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_sampling_worker,
+            initargs=worker_state,
+        ) as executor:
+            pending = deque()
+            blocks = zip(seed_sequences, block_sizes)
+            for seed_sequence, block_size in itertools.islice(blocks, 2 * n_workers):
+                pending.append(executor.submit(_sample_worker_block, seed_sequence, block_size))
+            while pending:
+                result = pending.popleft().result()
+                for seed_sequence, block_size in itertools.islice(blocks, 1):
+                    pending.append(
+                        executor.submit(_sample_worker_block, seed_sequence, block_size)
+                    )
+                yield result
@@ -0,0 +1,95 @@
+from typing import Literal
+
+from scipy.stats import qmc
+import numpy as np
+
+SamplingStrategy = Literal["monte_carlo", "latin_hypercube", "antithetic", "sobol", "importance"]
+
+SAMPLING_STRATEGIES = ("monte_carlo", "latin_hypercube", "antithetic", "sobol", "importance")
+
+# Largest dimension (assets x timestamps) supported by scipy's Sobol sequence
+MAX_SOBOL_DIMENSION = 21201
+
+
+def draw_uniform(
+    strategy: SamplingStrategy,
+    rng: np.random.Generator,
+    number_of_samples: int,
+    shape: tuple[int, ...],
+) -> np.ndarray:
+    """Uniform draws of shape (number_of_samples, *shape) following a sampling strategy.
+
+    Latin hypercube, antithetic and Sobol designs are built over the samples of one call, so
+    their variance reduction applies within each block of samples. Sobol points are only
+    balanced in powers of two, a call draws the next power of two and keeps the first
+    `number_of_samples` points. Importance sampling uses plain uniform draws against the
+    proposal survival probabilities of `importance_survival`.
+
+    Args:
+        strategy (SamplingStrategy): Sampling strategy
+        rng (np.random.Generator): Random generator of the block
+        number_of_samples (int): Number of samples
+        shape (tuple[int, ...]): Shape of the draws of a single sample
+    """
+    dimension = int(np.prod(shape))
+    if strategy in ("monte_carlo", "importance"):
+        return rng.random((number_of_samples, *shape))
+    if strategy == "latin_hypercube":
+        design = qmc.LatinHypercube(d=max(dimension, 1), seed=rng).random(number_of_samples)
+    elif strategy == "sobol":
+        if dimension > MAX_SOBOL_DIMENSION:
+            raise ValueError(
+                f"Sobol sampling supports at most {MAX_SOBOL_DIMENSION} assets x timestamps, "
+                f"got {dimension}"
+            )
+        sobol = qmc.Sobol(d=max(dimension, 1), scramble=True, seed=rng)
+        design = sobol.random_base2(max(number_of_samples - 1, 0).bit_length())
+        design = design[:number_of_samples]
+    elif strategy == "antithetic":
+        half = rng.random(((number_of_samples + 1) // 2, dimension))
+        design = np.empty((2 * len(half), dimension))
+        design[0::2] = half
+        design[1::2] = 1 - half
+        design = design[:number_of_samples]
+    else:
+        raise ValueError(
+            f"Unsupported sampling strategy {strategy}, use one of {SAMPLING_STRATEGIES}"
+        )
+    return design[:, :dimension].reshape(number_of_samples, *shape)
+
+
+def importance_survival(survival: np.ndarray, boost: float) -> np.ndarray:
+    """Proposal survival probabilities with failure probabilities scaled up by `boost`.
+
+    Proposal failure probabilities are never lower than the true ones and are capped at 0.5
+    (unless the true probability is higher), so every outcome keeps a finite weight.
+    """
+    failure = 1 - survival
+    proposal_failure = np.maximum(failure, np.minimum(boost * failure, 0.5))
+    return 1 - proposal_failure
+
+
+def log_likelihood_weights(
+    first_failures: np.ndarray, survival: np.ndarray, proposal_survival: np.ndarray
+) -> np.ndarray:
+    """Log likelihood ratio of each sample between the true and the proposal distributions.
+
+    A scenario only records the first failure of each asset, so an asset contributes the
+    survival ratios of the timestamps before its first failure and the failure ratio of that
+    timestamp, or the survival ratios of every timestamp if it never fails. The ratio of a
+    large system easily leaves the float range, hence it is returned as a logarithm.
+
+    Args:
+        first_failures (np.ndarray): First failure timestamp indices (samples x assets) of
+            the draws, -1 if none
+        survival (np.ndarray): True survival probabilities (assets x timestamps)
+        proposal_survival (np.ndarray): Survival probabilities the draws were made with
+    """
+    assets, timestamps = np.nonzero(proposal_survival != survival)
+    true, proposal = survival[assets, timestamps], proposal_survival[assets, timestamps]
+    log_failed = np.log1p(-true) - np.log1p(-proposal)
+    log_survived = np.log(true) - np.log(proposal)
+    first_failures = first_failures[:, assets]
+    log_ratios = np.where(first_failures == timestamps, log_failed, log_survived)
+    counted = (first_failures < 0) | (timestamps <= first_failures)
+    return np.where(counted, log_ratios, 0.0).sum(axis=1)
@@ -0,0 +1,170 @@
+from typing import Literal
+from uuid import UUID
+
+import numpy as np
+
+from erad.convergence import get_asset_loads
+from erad.outage_matrix import OutageMatrix, log_bincount
+
+ReductionMethod = Literal["fast_forward", "k_medoids"]
+
+REDUCTION_METHODS = ("fast_forward", "k_medoids")
+
+# Number of scenarios whose distances are computed from the sparse matrix at once
+DISTANCE_CHUNK_SIZE = 1024
+
+# Largest number of distinct scenarios reduced at once, their float32 pairwise distances
+# take 400 MB and every fast forward step scans all of them
+MAX_REDUCTION_SCENARIOS = 10_000
+
+
+def get_scenario_distances(
+    outage_matrix: OutageMatrix, asset_weights: np.ndarray | None = None
+) -> np.ndarray:
+    """Pairwise (weighted) Hamming distances between the outage sets of the scenarios.
+
+    The distance between two scenarios is the summed weight of the assets failed in only one
+    of them, the number of such assets without weights. Distances are computed from the
+    sparse failure matrix, so the cost scales with the number of failures rather than the
+    number of assets, and returned as a dense float32 (scenarios x scenarios) array.
+
+    Args:
+        outage_matrix (OutageMatrix): Scenarios to compare
+        asset_weights (np.ndarray | None): Weight of each asset, e.g. its load
+
+    Raises:
+        ValueError: If there are more than `MAX_REDUCTION_SCENARIOS` scenarios
+    """
+    n_scenarios = outage_matrix.number_of_samples
+    if n_scenarios > MAX_REDUCTION_SCENARIOS:
+        raise ValueError(
+            f"Scenario distances are limited to {MAX_REDUCTION_SCENARIOS} scenarios, got "
+            f"{n_scenarios}, sample fewer scenarios or reduce them in batches"
+        )
+    failed = outage_matrix.to_sparse().astype(np.float64)
+    weighted = failed if asset_weights is None else failed.multiply(asset_weights).tocsr()
+    totals = np.asarray(weighted.sum(axis=1)).ravel()
+    distances = np.empty((n_scenarios, n_scenarios), dtype=np.float32)
+    for start in range(0, n_scenarios, DISTANCE_CHUNK_SIZE):
+        stop = min(start + DISTANCE_CHUNK_SIZE, n_scenarios)
+        overlap = (weighted[start:stop] @ failed.T).toarray()
+        distances[start:stop] = totals[start:stop, None] + totals[None, :] - 2 * overlap
+    return np.maximum(distances, 0, out=distances)
+
+
+def fast_forward_selection(
+    distances: np.ndarray, probabilities: np.ndarray, number_of_scenarios: int
+) -> np.ndarray:
+    """Indices of the scenarios picked by fast forward selection (Heitsch and Romisch).
+
+    Scenarios are added one at a time, each time the one that most reduces the probability
+    weighted distance of all scenarios to their closest selected scenario.
+
+    Args:
+        distances (np.ndarray): Pairwise scenario distances
+        probabilities (np.ndarray): Probability of each scenario
+        number_of_scenarios (int): Number of scenarios to select
+    """
+    n_scenarios = len(probabilities)
+    closest = np.full(n_scenarios, np.inf)
+    selected = []
+    for _ in range(min(number_of_scenarios, n_scenarios)):
+        costs = np.empty(n_scenarios)
+        for start in range(0, n_scenarios, DISTANCE_CHUNK_SIZE):
+            stop = min(start + DISTANCE_CHUNK_SIZE, n_scenarios)
+            costs[start:stop] = probabilities @ np.minimum(
+                closest[:, None], distances[:, start:stop]
+            )
+        costs[selected] = np.inf
+        best = int(np.argmin(costs))
+        selected.append(best)
+        closest = np.minimum(closest, distances[:, best])
+    return np.array(selected, dtype=np.int64)
+
+
+def k_medoids(
+    distances: np.ndarray,
+    probabilities: np.ndarray,
+    medoids: np.ndarray,
+    max_iterations: int = 100,
+) -> np.ndarray:
+    """Refine medoids by alternating assignment and probability weighted medoid updates.
+
+    Args:
+        distances (np.ndarray): Pairwise scenario distances
+        probabilities (np.ndarray): Probability of each scenario
+        medoids (np.ndarray): Indices of the initial medoids
+        max_iterations (int): Maximum number of assignment / update rounds
+    """
+    medoids = np.array(medoids, dtype=np.int64)
+    for _ in range(max_iterations):
+        clusters = np.argmin(distances[:, medoids], axis=1)
+        clusters[medoids] = np.arange(len(medoids))
+        new_medoids = medoids.copy()
+        for cluster in range(len(medoids)):
+            members = np.flatnonzero(clusters == cluster)
+            costs = probabilities[members] @ distances[np.ix_(members, members)]
+            new_medoids[cluster] = members[np.argmin(costs)]
+        if np.array_equal(new_medoids, medoids):
+            break
+        medoids = new_medoids
+    return medoids
+
+
+def reduce_scenarios(
+    outage_matrix: OutageMatrix,
+    number_of_scenarios: int,
+    method: ReductionMethod = "fast_forward",
+    asset_loads: dict[UUID, float] | None = None,
+) -> OutageMatrix:
+    """Select representative, probability weighted scenarios.
+
+    Identical scenarios are merged first (see `OutageMatrix.deduplicate`). Every remaining
+    scenario then hands its probability over to the closest selected one, so the weights of
+    the reduced matrix are the probabilities of the representative scenarios and its counts
+    the number of samples each of them stands for. Distances compare which assets fail, not
+    when; the representatives keep their own failure timestamps. The pairwise distance matrix
+    takes 4 bytes per pair of distinct scenarios, hence at most `MAX_REDUCTION_SCENARIOS`
+    distinct scenarios are supported.
+
+    Args:
+        outage_matrix (OutageMatrix): Sampled scenarios
+        number_of_scenarios (int): Number of representative scenarios
+        method (ReductionMethod): "fast_forward" selection, or "k_medoids" refinement of the
+            fast forward selection
+        asset_loads (dict[UUID, float] | None): Load of the distribution component of each
+            asset, weights the distance by the load that changes state, unweighted Hamming
+            distance if None
+
+    Returns:
+        OutageMatrix: Representative scenarios in order of selection
+
+    Raises:
+        ValueError: If the method is unknown, number_of_scenarios is not positive or there
+            are more than `MAX_REDUCTION_SCENARIOS` distinct scenarios
+    """
+    if method not in REDUCTION_METHODS:
+        raise ValueError(f"Unsupported reduction method {method}, use one of {REDUCTION_METHODS}")
+    if number_of_scenarios < 1:
+        raise ValueError("number_of_scenarios should be a positive integer")
+
+    unique = outage_matrix.deduplicate()
+    probabilities = unique.sample_weights
+    distances = get_scenario_distances(
+        unique, get_asset_loads(unique.component_uuids, asset_loads)
+    )
+    selected = fast_forward_selection(distances, probabilities, number_of_scenarios)
+    if method == "k_medoids":
+        selected = k_medoids(distances, probabilities, selected)
+
+    clusters = np.argmin(distances[:, selected], axis=1)
+    # A selected scenario is always its own representative, even at distance ties
+    clusters[selected] = np.arange(len(selected))
+    return OutageMatrix(
+        unique.first_failures[selected],
+        unique.component_uuids,
+        unique.timestamps,
+        unique.sample_offset,
+        log_bincount(clusters, unique.sample_log_weights, len(selected)),
+        np.bincount(clusters, weights=unique.counts, minlength=len(selected)),
+    )
@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+from gdm.tracked_changes import TrackedChange
+
+
+class ScenarioSink(ABC):
+    """Destination for blocks of sampled scenarios, used as a context manager."""
+
+    @abstractmethod
+    def write(self, tracked_changes: list[TrackedChange]):
+        """Write the TrackedChanges of one block of samples."""
+
+    def close(self):
+        """Flush and release the resources of the sink."""
+
+    def __enter__(self) -> "ScenarioSink":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class JsonLinesScenarioSink(ScenarioSink):
+    """Writes one JSON serialized TrackedChange per line."""
+
+    def __init__(self, file_path: Path | str, append: bool = False):
+        """Constructor for the JsonLinesScenarioSink class.
+
+        Args:
+            file_path (Path | str): Output file, created or truncated on the first write
+            append (bool): Append to an existing file instead of truncating it
+        """
+        self.file_path = Path(file_path)
+        self.append = append
+        self._file: TextIO | None = None
+
+    def write(self, tracked_changes: list[TrackedChange]):
+        if self._file is None:
+            self._file = open(self.file_path, "a" if self.append else "w")
+        for tracked_change in tracked_changes:
+            self._file.write(tracked_change.model_dump_json() + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.append = True
+
+    @staticmethod
+    def read(file_path: Path | str) -> Iterator[TrackedChange]:
+        """Lazily read back the TrackedChanges written to a file."""
+        with open(file_path) as f:
+            for line in f:
+                yield TrackedChange.model_validate_json(line)
@@ -1,5 +1,6 @@
 from collections import defaultdict, Counter
 from pathlib import Path
+import json
 
 from gdm.distribution.enums import PlotingStyle, MapType
 from sqlmodel import SQLModel, Session, create_engine
@@ -8,6 +9,7 @@ from shapely.geometry import Point, LineString
 import gdm.distribution.components as gdc
 from gdm.quantities import Distance
 import plotly.graph_objects as go
+from infrasys.base_quantity import ureg
 from infrasys import System
 from loguru import logger
 import geopandas as gpd
@@ -17,16 +19,38 @@ import numpy as np
 import elevation
 
 
-from erad.constants import ASSET_TYPES, DEFAULT_TIME_STAMP, RASTER_DOWNLOAD_PATH, DEFAULT_HEIGHTS_M
+from erad.constants import (
+    HAZARD_PARAMETER_UNITS,
+    RASTER_DOWNLOAD_PATH,
+    RASTER_BOUNDS_PATH,
+    DEFAULT_TIME_STAMP,
+    DEFAULT_HEIGHTS_M,
+    ASSET_TYPES,
+)
+from erad.elevation import ElevationProvider
 from erad.gdm_mapping import asset_to_gdm_mapping
-from erad.models.asset import Asset, AssetState
+from erad.result_store import AssetStateStore
+from erad.engine import PROBABILITY_MODELS
+from erad.models.asset import Asset, AssetState, set_asset_elevations
 from erad.enums import AssetTypes, NodeTypes
 from erad.tables import AssetStateTable
 
 
+# AssetStateTable column and unit for each AssetState hazard parameter
+EXPORT_COLUMNS = {
+    "wind_speed": ("wind_speed__miles_per_hour", "miles/hour"),
+    "fire_boundary_dist": ("fire_boundary_dist__feet", "feet"),
+    "flood_depth": ("flood_depth__feet", "feet"),
+    "flood_velocity": ("flood_velocity__feet_per_second", "feet/second"),
+    "peak_ground_acceleration": ("peak_ground_acceleration__feet_per_second2", "feet/second**2"),
+    "peak_ground_velocity": ("peak_ground_velocity__inch_per_second", "inches/second"),
+}
+
+
 class AssetSystem(System):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.result_store: AssetStateStore | None = None
 
     def add_component(self, component, **kwargs):
         assert isinstance(
@@ -41,6 +65,31 @@ class AssetSystem(System):
         )
         return super().add_components(*components, **kwargs)
 
+    def attach_result_store(self, result_store: AssetStateStore):
+        """Attach an AssetStateStore so assets read their states from it."""
+        self.result_store = result_store
+        for asset in self.get_components(Asset):
+            asset._result_store = result_store
+
+    def materialize_asset_states(self):
+        """Convert the attached AssetStateStore into AssetState components.
+
+        Use this before serializing the system or when downstream code expects the states in
+        `Asset.asset_state`. The store is detached afterwards.
+        """
+        if self.result_store is None:
+            return
+        asset_states = []
+        for asset in self.get_components(Asset):
+            if not self.result_store.has_asset(asset.uuid):
+                continue
+            states = self.result_store.get_asset_states(asset.uuid)
+            asset.asset_state = states
+            asset._result_store = None
+            asset_states.extend(states)
+        self.result_store = None
+        self.add_components(*asset_states)
+
     def get_dircted_graph(self):
         """Get the directed graph of the AssetSystem."""
 
@@ -56,6 +105,7 @@ class AssetSystem(System):
 
     def get_undirected_graph(self):
         """Get the undirected graph of the AssetSystem."""
+        self.set_elevations()
         g = nx.Graph()
         graph_data = []
         for asset in self.get_components(Asset):
@@ -73,14 +123,28 @@ class AssetSystem(System):
 
     @classmethod
     def from_gdm(
-        cls, dist_system: DistributionSystem, flip_coordinates: bool = False
+        cls,
+        dist_system: DistributionSystem,
+        flip_coordinates: bool = False,
+        elevation_provider: ElevationProvider | None = None,
     ) -> "AssetSystem":
-        """Create a AssetSystem from a DistributionSystem."""
+        """Create a AssetSystem from a DistributionSystem.
+
+        Args:
+            dist_system (DistributionSystem): Distribution model to map to assets
+            flip_coordinates (bool): Swap the x and y coordinates of the components
+            elevation_provider (ElevationProvider | None): When passed, the elevations of all
+                unique asset coordinates are fetched once with it while building the system,
+                e.g. with a `PointServiceElevationProvider`. Otherwise they are looked up on
+                first use.
+        """
         asset_map = AssetSystem.map_asets(dist_system)
         # list_of_assets = AssetSystem._build_assets(asset_map)
         system = AssetSystem(auto_add_composed_components=True)
         list_of_assets = system._build_assets(asset_map, flip_coordinates)
         system.add_components(*list_of_assets)
+        if elevation_provider is not None:
+            system.set_elevations(elevation_provider)
         return system
 
     def _add_node_data(
@@ -140,18 +204,20 @@ class AssetSystem(System):
     def to_gdf(self):
         node_data = defaultdict(list)
         edge_data = defaultdict(list)
-        assets: list[Asset] = self.get_components(Asset)
+        assets: list[Asset] = list(self.get_components(Asset))
+        set_asset_elevations(assets)
 
         for asset in assets:
+            asset_states = asset.get_asset_states()
             if len(set(asset.connections)) < 2:
-                if asset.asset_state:
-                    for asset_state in asset.asset_state:
+                if asset_states:
+                    for asset_state in asset_states:
                         node_data = self._add_node_data(node_data, asset, asset_state)
                 else:
                     node_data = self._add_node_data(node_data, asset, None)
             else:
-                if asset.asset_state:
-                    for asset_state in asset.asset_state:
+                if asset_states:
+                    for asset_state in asset_states:
                         edge_data = self._add_edge_data(edge_data, asset, asset_state)
                 else:
                     edge_data = self._add_edge_data(edge_data, asset, None)
@@ -400,11 +466,23 @@ class AssetSystem(System):
             return any(self._has_zero_zero_coords(g) for g in geom.geoms)
         return False
 
-    def get_elevation_raster(self) -> Path:
-        """Download and clip elevation raster for the AssetSystem."""
-        if RASTER_DOWNLOAD_PATH.exists():
-            RASTER_DOWNLOAD_PATH.unlink()
+    def set_elevations(self, provider: ElevationProvider | None = None, overwrite: bool = False):
+        """Look up and store the ground elevation of all assets in one bulk query.
 
+        Args:
+            provider (ElevationProvider | None): Provider to use, defaults to the default
+                elevation provider. `RasterElevationProvider(system.get_elevation_raster())`
+                samples a clipped local raster.
+            overwrite (bool): Replace elevations that are already stored on the assets
+        """
+        set_asset_elevations(list(self.get_components(Asset)), provider, overwrite)
+
+    def get_elevation_raster(self, reuse: bool = True) -> Path:
+        """Download and clip elevation raster for the AssetSystem, returns the raster path.
+
+        Args:
+            reuse (bool): Keep the previously clipped raster when it already covers the assets
+        """
         coordinates = np.array(
             [
                 (asset.latitude, asset.longitude)
@@ -417,17 +495,39 @@ class AssetSystem(System):
             lat_min, lat_max = float(coordinates[:, 0].min()), float(coordinates[:, 0].max())
             lon_min, lon_max = float(coordinates[:, 1].min()), float(coordinates[:, 1].max())
             bounds = (lon_min, lat_min, lon_max, lat_max)
+            if reuse and self._raster_covers(bounds):
+                logger.info(f"Reusing raster file {RASTER_DOWNLOAD_PATH} for bounds: {bounds}")
+                return RASTER_DOWNLOAD_PATH
+
+            for path in (RASTER_DOWNLOAD_PATH, RASTER_BOUNDS_PATH):
+                if path.exists():
+                    path.unlink()
             logger.info(f"Downloading raster file to path: {RASTER_DOWNLOAD_PATH}")
             logger.info(f"Clipping raster for bounds: {bounds}")
             elevation.clip(bounds=bounds, output=str(RASTER_DOWNLOAD_PATH.name))
             if not RASTER_DOWNLOAD_PATH.exists():
                 raise FileNotFoundError(f"File path {RASTER_DOWNLOAD_PATH} does not exist")
+            RASTER_BOUNDS_PATH.write_text(json.dumps(bounds))
+            return RASTER_DOWNLOAD_PATH
         else:
             logger.info(
                 "No assets found in the AssetSystem, no elevation raster will be downloaded."
             )
             return None
 
+    @staticmethod
+    def _raster_covers(bounds: tuple[float, float, float, float]) -> bool:
+        """True if the clipped raster on disk was clipped for bounds containing `bounds`."""
+        if not (RASTER_DOWNLOAD_PATH.exists() and RASTER_BOUNDS_PATH.exists()):
+            return False
+        lon_min, lat_min, lon_max, lat_max = json.loads(RASTER_BOUNDS_PATH.read_text())
+        return (
+            lon_min <= bounds[0]
+            and lat_min <= bounds[1]
+            and lon_max >= bounds[2]
+            and lat_max >= bounds[3]
+        )
+
     def plot(
         self,
         show: bool = True,
@@ -484,45 +584,68 @@ class AssetSystem(System):
         SQLModel.metadata.create_all(engine)
 
         with Session(engine) as session:
+            store_columns = self._get_store_columns() if self.result_store else None
             for asset in self.get_components(Asset):
-                for state in asset.asset_state:
-                    record = AssetStateTable(
-                        asset_name=asset.name,
-                        asset_type=asset.asset_type.name,
-                        distribution_asset=str(asset.distribution_asset),
-                        timestamp=state.timestamp.isoformat(),
-                        survival_probability=state.survival_probability,
-                        wind_speed__miles_per_hour=state.wind_speed.speed.to(
-                            "miles/hour"
-                        ).magnitude
-                        if state.wind_speed
-                        else None,
-                        fire_boundary_dist__feet=state.fire_boundary_dist.distance.to(
-                            "feet"
-                        ).magnitude
-                        if state.fire_boundary_dist
-                        else None,
-                        flood_depth__feet=state.flood_depth.distance.to("feet").magnitude
-                        if state.flood_depth
-                        else None,
-                        flood_velocity__feet_per_second=state.flood_velocity.speed.to(
-                            "feet/second"
-                        ).magnitude
-                        if state.flood_velocity
-                        else None,
-                        peak_ground_acceleration__feet_per_second2=state.peak_ground_acceleration.acceleration.to(
-                            "feet/second**2"
-                        ).magnitude
-                        if state.peak_ground_acceleration
-                        else None,
-                        peak_ground_velocity__inch_per_second=state.peak_ground_velocity.speed.to(
-                            "inches/second"
-                        ).magnitude
-                        if state.peak_ground_velocity
-                        else None,
-                    )
+                if self.result_store is not None and self.result_store.has_asset(asset.uuid):
+                    records = self._get_store_records(asset, store_columns)
+                else:
+                    records = self._get_state_records(asset)
+                for record in records:
                     session.add(record)
 
             session.commit()
 
         logger.info(f"Asset system results exported to {db_path}")
+
+    def _get_state_records(self, asset: Asset) -> list[AssetStateTable]:
+        records = []
+        for state in asset.asset_state:
+            values = {}
+            for param, (column, unit) in EXPORT_COLUMNS.items():
+                prob_model = getattr(state, param)
+                _, quantity_name, _ = PROBABILITY_MODELS[param]
+                values[column] = (
+                    getattr(prob_model, quantity_name).to(unit).magnitude if prob_model else None
+                )
+            records.append(
+                AssetStateTable(
+                    asset_name=asset.name,
+                    asset_type=asset.asset_type.name,
+                    distribution_asset=str(asset.distribution_asset),
+                    timestamp=state.timestamp.isoformat(),
+                    survival_probability=state.survival_probability,
+                    **values,
+                )
+            )
+        return records
+
+    def _get_store_columns(self) -> dict[str, np.ndarray]:
+        store = self.result_store
+        columns = {"survival_probability": store.survival_probability}
+        for param, values in store.intensities.items():
+            column, unit = EXPORT_COLUMNS[param]
+            factor = ureg.Quantity(1, HAZARD_PARAMETER_UNITS[param]).to(unit).magnitude
+            columns[column] = values * factor
+        return columns
+
+    def _get_store_records(
+        self, asset: Asset, store_columns: dict[str, np.ndarray]
+    ) -> list[AssetStateTable]:
+        store = self.result_store
+        ii = store.asset_index[asset.uuid]
+        records = []
+        for jj in np.flatnonzero(store.written).tolist():
+            values = {
+                column: None if np.isnan(values[ii, jj]) else float(values[ii, jj])
+                for column, values in store_columns.items()
+            }
+            records.append(
+                AssetStateTable(
+                    asset_name=asset.name,
+                    asset_type=asset.asset_type.name,
+                    distribution_asset=str(asset.distribution_asset),
+                    timestamp=store.timestamps[jj].isoformat(),
+                    **values,
+                )
+            )
+        return records
@@ -0,0 +1,478 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from uuid import UUID
+
+from gdm.distribution import DistributionSystem
+import gdm.distribution.components as gdc
+from scipy.sparse import csgraph
+from scipy import sparse
+import networkx as nx
+import numpy as np
+
+from erad.outage_matrix import NO_FAILURE, OutageMatrix
+from erad.analytics import FailureStatistics
+from erad.systems.asset_system import AssetSystem
+from erad.models.asset import Asset
+from erad.enums import AssetTypes
+
+# Maximum number of (sample, node) cells processed at once during propagation
+MAX_PROPAGATION_BLOCK_SIZE = 2**24
+
+
+class BaseTopology(ABC):
+    """Bus connectivity of an asset system evaluated for blocks of sampled outages.
+
+    Subclasses number the buses in `nodes` and index the assets by the UUID of their
+    distribution component in `component_index`.
+    """
+
+    nodes: list[str]
+    component_index: dict[UUID, int]
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    @abstractmethod
+    def get_node_deenergization(self, outage_matrix: OutageMatrix) -> np.ndarray:
+        """Timestamp index at which each node is first de-energized (samples x nodes)."""
+
+    @abstractmethod
+    def propagate(self, outage_matrix: OutageMatrix) -> OutageMatrix:
+        """Outage matrix of the de-energized assets, failed or cut off from supply."""
+
+    def get_customers_out(
+        self,
+        outage_matrix: OutageMatrix,
+        customers_per_bus: dict[UUID, int],
+        timestamp_index: int | None = None,
+    ) -> np.ndarray:
+        """Number of customers on de-energized buses in each sample.
+
+        Args:
+            outage_matrix (OutageMatrix): Sampled asset failures
+            customers_per_bus (dict[UUID, int]): Number of customers of each bus, see
+                `get_customers_per_bus`
+            timestamp_index (int | None): Count the buses de-energized by this timestamp
+                index, by the last timestamp if None
+        """
+        node_failures = self.get_node_deenergization(outage_matrix)
+        node_customers = self._get_node_customers(customers_per_bus)
+        deenergized = node_failures != NO_FAILURE
+        if timestamp_index is not None:
+            deenergized &= node_failures <= timestamp_index % len(outage_matrix.timestamps)
+        return deenergized @ node_customers
+
+    def _get_node_customers(self, customers_per_bus: dict[UUID, int]) -> np.ndarray:
+        customers = {str(bus): count for bus, count in customers_per_bus.items()}
+        return np.array([customers.get(node, 0) for node in self.nodes])
+
+
+class RadialTopology(BaseTopology):
+    """DFS interval index of a radial asset system for downstream outage propagation.
+
+    Nodes (buses) are numbered in DFS preorder from the substation, so the subtree of node
+    `v` is the contiguous range `v <= u < subtree_end[v]`. A node is de-energized at the
+    earliest failure that cuts it or one of its ancestors, a minimum passed down the tree
+    one depth level at a time for a whole block of samples at once.
+
+    A failed node asset de-energizes its bus and the subtree below it, a failed line,
+    cable, transformer or switch the subtree below its downstream bus and a failed
+    substation the whole feeder. Other single bus assets (solar panels, batteries) only go
+    out of service themselves. Every asset is de-energized when the bus it is supplied
+    from is, the upstream bus for lines.
+    """
+
+    def __init__(self, tree: nx.DiGraph, assets: list[Asset]):
+        """Constructor for the RadialTopology class.
+
+        Args:
+            tree (nx.DiGraph): Tree of bus UUID strings directed away from the substation,
+                as returned by `AssetSystem.get_dircted_graph`
+            assets (list[Asset]): Assets to index, edges that are not part of the tree
+                (loops) do not propagate their failures
+        """
+        root = next(node for node, in_degree in tree.in_degree() if in_degree == 0)
+        self.nodes = list(nx.dfs_preorder_nodes(tree, root))
+        self.node_index = {node: ii for ii, node in enumerate(self.nodes)}
+        self.parent = np.full(len(self.nodes), -1, dtype=np.int64)
+        for u, v in tree.edges():
+            self.parent[self.node_index[v]] = self.node_index[u]
+        subtree_size = np.ones(len(self.nodes), dtype=np.int64)
+        for ii in range(len(self.nodes) - 1, 0, -1):
+            subtree_size[self.parent[ii]] += subtree_size[ii]
+        self.subtree_end = np.arange(len(self.nodes)) + subtree_size
+        depth = np.zeros(len(self.nodes), dtype=np.int64)
+        for ii in range(1, len(self.nodes)):
+            depth[ii] = depth[self.parent[ii]] + 1
+        self.levels = [np.flatnonzero(depth == level) for level in range(1, depth.max() + 1)]
+
+        self.component_uuids = [asset.distribution_asset for asset in assets]
+        self.component_index = {uuid: ii for ii, uuid in enumerate(self.component_uuids)}
+        asset_nodes = np.array([self._get_asset_nodes(asset) for asset in assets], dtype=np.int64)
+        asset_nodes = asset_nodes.reshape(len(assets), 2)
+        self.cut_nodes, self.supply_nodes = asset_nodes[:, 0], asset_nodes[:, 1]
+
+    @classmethod
+    def from_asset_system(cls, asset_system: AssetSystem) -> "RadialTopology":
+        """Index the directed graph of an AssetSystem."""
+        return cls(asset_system.get_dircted_graph(), list(asset_system.get_components(Asset)))
+
+    def _get_asset_nodes(self, asset: Asset) -> tuple[int, int]:
+        """Node whose subtree the asset cuts off when it fails and node it is supplied from."""
+        if len(asset.connections) == 2:
+            u, v = (self.node_index.get(str(bus), -1) for bus in asset.connections)
+            if u >= 0 and v >= 0 and self.parent[v] == u:
+                return v, u
+            if u >= 0 and v >= 0 and self.parent[u] == v:
+                return u, v
+            return -1, -1
+        if len(asset.connections) == 1:
+            node = self.node_index.get(str(asset.connections[0]), -1)
+            return (node if asset.asset_type == AssetTypes.substation else -1), node
+        node = self.node_index.get(str(asset.distribution_asset), -1)
+        return node, node
+
+    def _get_component_nodes(self, component_uuids: list[UUID]) -> tuple[np.ndarray, np.ndarray]:
+        """Cut and supply nodes of components, -1 for components unknown to the topology."""
+        indices = np.array(
+            [self.component_index.get(uuid, -1) for uuid in component_uuids], dtype=np.int64
+        )
+        known = indices >= 0
+        cut_nodes = np.where(known, self.cut_nodes[indices], -1)
+        supply_nodes = np.where(known, self.supply_nodes[indices], -1)
+        return cut_nodes, supply_nodes
+
+    def get_node_deenergization(self, outage_matrix: OutageMatrix) -> np.ndarray:
+        """Timestamp index at which each node is first de-energized (samples x nodes).
+
+        Nodes that stay energized get -1. Every node first gets the earliest failure of the
+        assets that cut it, then the minimum with its parent, level by level from the
+        substation down, in O(samples x nodes) whatever the number of timestamps.
+        """
+        cut_nodes, _ = self._get_component_nodes(outage_matrix.component_uuids)
+        cutting = cut_nodes >= 0
+        cut_nodes = cut_nodes[cutting]
+        first_failures = outage_matrix.first_failures[:, cutting]
+        n_nodes, n_timestamps = self.number_of_nodes, len(outage_matrix.timestamps)
+
+        node_failures = np.full(
+            (outage_matrix.number_of_samples, n_nodes),
+            NO_FAILURE,
+            dtype=outage_matrix.first_failures.dtype,
+        )
+        block_size = max(1, MAX_PROPAGATION_BLOCK_SIZE // max(n_nodes, 1))
+        for start in range(0, outage_matrix.number_of_samples, block_size):
+            block = first_failures[start : start + block_size]
+            # n_timestamps stands for never, so that the minimum picks the earliest failure
+            cut_times = np.full((len(block), n_nodes), n_timestamps, dtype=np.int64)
+            samples, assets = np.nonzero(block != NO_FAILURE)
+            np.minimum.at(cut_times, (samples, cut_nodes[assets]), block[samples, assets])
+            for level in self.levels:
+                cut_times[:, level] = np.minimum(
+                    cut_times[:, level], cut_times[:, self.parent[level]]
+                )
+            node_failures[start : start + len(block)] = np.where(
+                cut_times == n_timestamps, NO_FAILURE, cut_times
+            )
+        return node_failures
+
+    def propagate(self, outage_matrix: OutageMatrix) -> OutageMatrix:
+        """Outage matrix of the de-energized assets, failed or downstream of a failure.
+
+        Assets get the earliest of their own failure and the de-energization of the bus
+        they are supplied from. Components unknown to the topology keep their own failures.
+        """
+        _, supply_nodes = self._get_component_nodes(outage_matrix.component_uuids)
+        node_failures = self.get_node_deenergization(outage_matrix)
+        supplied = supply_nodes >= 0
+        first_failures = outage_matrix.first_failures.copy()
+        first_failures[:, supplied] = _earliest_failure(
+            first_failures[:, supplied], node_failures[:, supply_nodes[supplied]]
+        )
+        return OutageMatrix(
+            first_failures,
+            outage_matrix.component_uuids,
+            outage_matrix.timestamps,
+            outage_matrix.sample_offset,
+            outage_matrix.log_weights,
+            outage_matrix.counts,
+        )
+
+    def get_connection_probabilities(self, statistics: FailureStatistics) -> np.ndarray:
+        """Probability that each node is still connected to the substation (nodes x timestamps).
+
+        A node is connected at a timestamp when no asset on its path from the substation has
+        failed by then, so the probability is the product of the cumulative survival
+        probabilities of those assets. The products of all nodes are sums of logarithms
+        over the DFS intervals, computed with one difference array for all timestamps.
+
+        Args:
+            statistics (FailureStatistics): Survival probabilities of the assets, see
+                `HazardScenarioGenerator.get_failure_statistics`
+        """
+        cut_nodes, _ = self._get_component_nodes(statistics.component_uuids)
+        cutting = cut_nodes >= 0
+        cut_nodes = cut_nodes[cutting]
+        survived = np.cumprod(statistics.survival[cutting], axis=1)
+
+        n_nodes, n_timestamps = self.number_of_nodes, survived.shape[1]
+        # Zero probabilities are counted separately, their logarithm breaks the differences
+        zero = survived <= 0
+        logs = np.log(np.where(zero, 1.0, survived))
+        log_differences = np.zeros((n_nodes + 1, n_timestamps))
+        zero_differences = np.zeros((n_nodes + 1, n_timestamps), dtype=np.int64)
+        np.add.at(log_differences, cut_nodes, logs)
+        np.add.at(log_differences, self.subtree_end[cut_nodes], -logs)
+        np.add.at(zero_differences, cut_nodes, zero)
+        np.add.at(zero_differences, self.subtree_end[cut_nodes], -zero.astype(np.int64))
+        zeros = np.cumsum(zero_differences[:n_nodes], axis=0)
+        return np.where(zeros > 0, 0.0, np.exp(np.cumsum(log_differences[:n_nodes], axis=0)))
+
+    def get_asset_connection_probabilities(self, statistics: FailureStatistics) -> np.ndarray:
+        """Probability that each asset of `statistics` is in service and supplied.
+
+        Returns:
+            np.ndarray: Probabilities (assets x timestamps) in `statistics.component_uuids`
+                order
+        """
+        cut_nodes, supply_nodes = self._get_component_nodes(statistics.component_uuids)
+        connected = np.cumprod(statistics.survival, axis=1)
+        node_connected = self.get_connection_probabilities(statistics)
+        # Assets that cut their own supply node are part of the path product already
+        own_node = (cut_nodes >= 0) & (cut_nodes == supply_nodes)
+        connected[own_node] = node_connected[supply_nodes[own_node]]
+        supplied = (supply_nodes >= 0) & ~own_node
+        connected[supplied] *= node_connected[supply_nodes[supplied]]
+        return connected
+
+    def get_expected_customers_out(
+        self, statistics: FailureStatistics, customers_per_bus: dict[UUID, int]
+    ) -> np.ndarray:
+        """Expected number of customers on de-energized buses at each timestamp.
+
+        Args:
+            statistics (FailureStatistics): Survival probabilities of the assets
+            customers_per_bus (dict[UUID, int]): Number of customers of each bus, see
+                `get_customers_per_bus`
+        """
+        node_customers = self._get_node_customers(customers_per_bus)
+        return node_customers @ (1 - self.get_connection_probabilities(statistics))
+
+
+class MeshedTopology(BaseTopology):
+    """Integer edge list of a meshed asset system for batched source connectivity.
+
+    Buses are numbered once and lines, cables, transformers and switches become an
+    (edges x 2) array of bus indices. For a block of samples the surviving edges of every
+    sample are stacked into one block diagonal sparse graph, with one extra node per sample
+    linked to its energized sources, and scipy's `connected_components` labels all samples
+    in a single call. A bus is energized when it is in the component of its sample's extra
+    node.
+
+    A failed node asset removes its bus, a failed edge asset its edge and a failed
+    substation its source. Other single bus assets only go out of service themselves.
+    Edge assets stay energized while either of their buses is.
+    """
+
+    def __init__(self, graph: nx.Graph, assets: list[Asset], sources: list[UUID] | None = None):
+        """Constructor for the MeshedTopology class.
+
+        Args:
+            graph (nx.Graph): Graph of bus UUID strings, as returned by
+                `AssetSystem.get_undirected_graph`
+            assets (list[Asset]): Assets to index
+            sources (list[UUID] | None): Source buses, defaults to the buses of the
+                substation assets
+
+        Raises:
+            ValueError: If there is no source bus in the graph
+        """
+        self.nodes = list(graph.nodes)
+        self.node_index = {node: ii for ii, node in enumerate(self.nodes)}
+        self.component_uuids = [asset.distribution_asset for asset in assets]
+        self.component_index = {uuid: ii for ii, uuid in enumerate(self.component_uuids)}
+
+        if sources is None:
+            sources = [
+                asset.connections[0]
+                for asset in assets
+                if asset.asset_type == AssetTypes.substation and len(asset.connections) == 1
+            ]
+        self.source_nodes = np.array(
+            sorted({self.node_index[str(bus)] for bus in sources if str(bus) in self.node_index}),
+            dtype=np.int64,
+        )
+        if not len(self.source_nodes):
+            raise ValueError("No source bus found in the graph")
+
+        # Bus of each node asset, buses of each edge asset and bus of each substation
+        node_assets, edge_assets, source_assets = [], [], []
+        self.supply_nodes = np.full((len(assets), 2), -1, dtype=np.int64)
+        for ii, asset in enumerate(assets):
+            buses = [self.node_index.get(str(bus), -1) for bus in asset.connections]
+            if len(buses) == 2 and min(buses) >= 0:
+                edge_assets.append((ii, *buses))
+                self.supply_nodes[ii] = buses
+            elif len(buses) == 1 and buses[0] >= 0:
+                if asset.asset_type == AssetTypes.substation:
+                    source_assets.append((ii, buses[0]))
+                self.supply_nodes[ii, 0] = buses[0]
+            elif not buses and str(asset.distribution_asset) in self.node_index:
+                node = self.node_index[str(asset.distribution_asset)]
+                node_assets.append((ii, node))
+                self.supply_nodes[ii, 0] = node
+        self.node_assets = np.array(node_assets, dtype=np.int64).reshape(-1, 2)
+        self.edge_assets = np.array(edge_assets, dtype=np.int64).reshape(-1, 3)
+        self.source_assets = np.array(source_assets, dtype=np.int64).reshape(-1, 2)
+
+    @classmethod
+    def from_asset_system(
+        cls, asset_system: AssetSystem, sources: list[UUID] | None = None
+    ) -> "MeshedTopology":
+        """Index the undirected graph of an AssetSystem."""
+        return cls(
+            asset_system.get_undirected_graph(), list(asset_system.get_components(Asset)), sources
+        )
+
+    def _get_component_columns(self, component_uuids: list[UUID]) -> np.ndarray:
+        """Outage matrix column of every indexed asset, -1 for assets missing from it."""
+        columns = np.full(len(self.component_uuids), -1, dtype=np.int64)
+        for column, uuid in enumerate(component_uuids):
+            if uuid in self.component_index:
+                columns[self.component_index[uuid]] = column
+        return columns
+
+    def _get_failed(self, failed: np.ndarray, columns: np.ndarray, assets: np.ndarray):
+        """Failure state (samples x assets) of indexed assets, False if not in the matrix."""
+        asset_columns = columns[assets]
+        if not failed.shape[1]:
+            return np.zeros((len(failed), len(assets)), dtype=bool)
+        return np.where(asset_columns >= 0, failed[:, asset_columns], False)
+
+    def _get_energized_nodes(self, failed: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Energized nodes (samples x nodes) for the failures of a block of samples."""
+        n_samples, n_nodes = len(failed), self.number_of_nodes
+        node_failed = np.zeros((n_samples, n_nodes), dtype=bool)
+        samples, assets = np.nonzero(self._get_failed(failed, columns, self.node_assets[:, 0]))
+        node_failed[samples, self.node_assets[assets, 1]] = True
+
+        source_failed = np.zeros((n_samples, n_nodes), dtype=bool)
+        samples, assets = np.nonzero(self._get_failed(failed, columns, self.source_assets[:, 0]))
+        source_failed[samples, self.source_assets[assets, 1]] = True
+        source_alive = ~(node_failed | source_failed)[:, self.source_nodes]
+
+        u, v = self.edge_assets[:, 1], self.edge_assets[:, 2]
+        edge_alive = (
+            ~self._get_failed(failed, columns, self.edge_assets[:, 0])
+            & ~node_failed[:, u]
+            & ~node_failed[:, v]
+        )
+        # Node s * n_nodes + v is bus v of sample s, node n_samples * n_nodes + s links the
+        # energized sources of sample s
+        n_graph_nodes = n_samples * (n_nodes + 1)
+        index_dtype = np.int32 if n_graph_nodes < np.iinfo(np.int32).max else np.int64
+        edge_samples, edges = np.nonzero(edge_alive)
+        link_samples, sources = np.nonzero(source_alive)
+        edge_offsets = edge_samples.astype(index_dtype) * n_nodes
+        link_offsets = link_samples.astype(index_dtype)
+        rows = np.concatenate(
+            [edge_offsets + u[edges].astype(index_dtype), n_samples * n_nodes + link_offsets]
+        )
+        cols = np.concatenate(
+            [
+                edge_offsets + v[edges].astype(index_dtype),
+                link_offsets * n_nodes + self.source_nodes[sources].astype(index_dtype),
+            ]
+        )
+        graph = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n_graph_nodes, n_graph_nodes)
+        )
+        _, labels = csgraph.connected_components(graph, directed=True, connection="weak")
+        node_labels = labels[: n_samples * n_nodes].reshape(n_samples, n_nodes)
+        return (node_labels == labels[n_samples * n_nodes :, None]) & ~node_failed
+
+    def get_node_deenergization(self, outage_matrix: OutageMatrix) -> np.ndarray:
+        """Timestamp index at which each node is first de-energized (samples x nodes).
+
+        Nodes that stay energized get -1. Failures are permanent, so a node de-energized at
+        a timestamp stays de-energized and its first de-energization is the number of
+        timestamps it was energized at.
+        """
+        columns = self._get_component_columns(outage_matrix.component_uuids)
+        n_nodes, n_timestamps = self.number_of_nodes, len(outage_matrix.timestamps)
+        intact = self._get_energized_nodes(
+            np.zeros((1, len(outage_matrix.component_uuids)), dtype=bool), columns
+        )[0]
+        node_failures = np.full(
+            (outage_matrix.number_of_samples, n_nodes),
+            NO_FAILURE,
+            dtype=outage_matrix.first_failures.dtype,
+        )
+        block_size = max(1, MAX_PROPAGATION_BLOCK_SIZE // max(n_nodes, 1))
+        for start in range(0, outage_matrix.number_of_samples, block_size):
+            block = outage_matrix.first_failures[start : start + block_size]
+            energized_count = np.zeros((len(block), n_nodes), dtype=np.int64)
+            energized = np.broadcast_to(intact, (len(block), n_nodes)).copy()
+            for timestamp_index in range(n_timestamps):
+                # Connectivity only changes in the samples with new failures at this timestamp
+                changed = (block == timestamp_index).any(axis=1)
+                if changed.any():
+                    failed = block[changed]
+                    energized[changed] = self._get_energized_nodes(
+                        (failed != NO_FAILURE) & (failed <= timestamp_index), columns
+                    )
+                energized_count += energized
+            node_failures[start : start + len(block)] = np.where(
+                energized_count == n_timestamps, NO_FAILURE, energized_count
+            )
+        return node_failures
+
+    def propagate(self, outage_matrix: OutageMatrix) -> OutageMatrix:
+        """Outage matrix of the de-energized assets, failed or cut off from every source.
+
+        Assets get the earliest of their own failure and the time their last energized bus
+        is de-energized. Components unknown to the topology keep their own failures.
+        """
+        node_failures = self.get_node_deenergization(outage_matrix)
+        first_failures = outage_matrix.first_failures.copy()
+        columns = self._get_component_columns(outage_matrix.component_uuids)
+        assets = np.flatnonzero((columns >= 0) & (self.supply_nodes[:, 0] >= 0))
+        supply = self.supply_nodes[assets]
+        deenergized = node_failures[:, supply[:, 0]]
+        two_buses = supply[:, 1] >= 0
+        deenergized[:, two_buses] = _latest_failure(
+            deenergized[:, two_buses], node_failures[:, supply[two_buses, 1]]
+        )
+        first_failures[:, columns[assets]] = _earliest_failure(
+            first_failures[:, columns[assets]], deenergized
+        )
+        return OutageMatrix(
+            first_failures,
+            outage_matrix.component_uuids,
+            outage_matrix.timestamps,
+            outage_matrix.sample_offset,
+            outage_matrix.log_weights,
+            outage_matrix.counts,
+        )
+
+
+def get_customers_per_bus(dist_system: DistributionSystem) -> dict[UUID, int]:
+    """Number of loads connected to each bus of a DistributionSystem."""
+    return dict(
+        Counter(load.bus.uuid for load in dist_system.get_components(gdc.DistributionLoad))
+    )
+
+
+def _earliest_failure(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    return np.where(
+        first == NO_FAILURE,
+        second,
+        np.where(second == NO_FAILURE, first, np.minimum(first, second)),
+    )
+
+
+def _latest_failure(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    return np.where(
+        (first == NO_FAILURE) | (second == NO_FAILURE), NO_FAILURE, np.maximum(first, second)
+    )
@@ -2,8 +2,43 @@ from gdmloader.constants import GCS_CASE_SOURCE
 from gdm.distribution import DistributionSystem
 from gdmloader.source import SystemLoader
 
+import numpy as np
 import pytest
 
+from erad.elevation import (
+    CachedElevationProvider,
+    ElevationProvider,
+    PyhighElevationProvider,
+    set_default_elevation_provider,
+)
+import erad.elevation
+
+
+class SeaLevelElevationProvider(ElevationProvider):
+    """Offline default of the tests, every coordinate is at 0 m."""
+
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        return np.zeros(len(latitude))
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "network: looks up elevations with pyhigh instead of the offline stub"
+    )
+
+
+@pytest.fixture(autouse=True)
+def elevation_provider(request, tmp_path, monkeypatch):
+    """Default elevation provider of every test, pyhigh only for tests marked `network`."""
+    # Restores the previous default provider without creating the user cache one
+    monkeypatch.setattr(erad.elevation, "_default_provider", None)
+    if request.node.get_closest_marker("network") is None:
+        set_default_elevation_provider(SeaLevelElevationProvider())
+    else:
+        set_default_elevation_provider(
+            CachedElevationProvider(PyhighElevationProvider(), tmp_path / "elevation_cache.sqlite")
+        )
+
 
 @pytest.fixture(scope="session")
 def gdm_system():
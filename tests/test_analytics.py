@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+import itertools
+
+from infrasys.quantities import Distance
+from shapely.geometry import Point
+from scipy.stats import binom
+import numpy as np
+import pytest
+
+from erad.analytics import FailureStatistics, poisson_binomial_pmf
+from erad.constants import DEFAULT_HEIGHTS_M
+from erad.runner import HazardScenarioGenerator
+from erad.models.hazard import WindModel
+from erad.models.asset import Asset
+from erad.quantities import Speed
+from erad.enums import AssetTypes
+from erad.systems.asset_system import AssetSystem
+from erad.systems.hazard_system import HazardSystem
+
+
+def get_scenario_generator() -> HazardScenarioGenerator:
+    """Vectorized generator of a 7 x 7 asset grid in a three hour, 130 mph wind track."""
+    asset_types = list(AssetTypes)
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    for i in range(7):
+        for j in range(7):
+            asset_type = asset_types[(i * 7 + j) % len(asset_types)]
+            asset_system.add_component(
+                Asset(
+                    name=f"asset_{i}_{j}",
+                    asset_type=asset_type,
+                    distribution_asset=uuid4(),
+                    height=Distance(DEFAULT_HEIGHTS_M[asset_type], "meter"),
+                    latitude=36.60 + (i - 3) * 0.5,
+                    longitude=-121.93 + (j - 3) * 0.5,
+                    asset_state=[],
+                )
+            )
+    hazard_system = HazardSystem(auto_add_composed_components=True)
+    for i in range(3):
+        hazard_system.add_component(
+            WindModel.example().model_copy(
+                update={
+                    "timestamp": datetime(2020, 1, 1) + timedelta(hours=i),
+                    "center": Point(-121.93036 + 0.1 * i, 36.60144),
+                    "max_wind_speed": Speed(130, "miles/hour"),
+                }
+            )
+        )
+    return HazardScenarioGenerator(
+        asset_system=asset_system, hazard_system=hazard_system, engine="vectorized"
+    )
+
+
+def test_poisson_binomial_pmf():
+    rng = np.random.default_rng(0)
+    probabilities = rng.random(7)
+    expected = np.zeros(8)
+    for outcome in itertools.product([0, 1], repeat=7):
+        outcome = np.array(outcome)
+        expected[outcome.sum()] += np.prod(np.where(outcome, probabilities, 1 - probabilities))
+    assert np.allclose(poisson_binomial_pmf(probabilities), expected, atol=1e-14)
+
+    assert np.allclose(
+        poisson_binomial_pmf(np.full(5000, 0.01)), binom.pmf(range(5001), 5000, 0.01)
+    )
+    assert poisson_binomial_pmf([]).tolist() == [1.0]
+    assert poisson_binomial_pmf([1.0]).tolist() == [0.0, 1.0]
+
+
+def test_failure_statistics():
+    survival = np.array([[0.5, 0.5, 1.0], [1.0, 0.0, 0.5], [0.9, 0.8, 0.7]])
+    uuids = [uuid4() for _ in range(3)]
+    statistics = FailureStatistics(
+        survival, [datetime(2024, 1, 1, hour) for hour in range(3)], uuids
+    )
+    first_failures = statistics.first_failure_probabilities
+    assert first_failures[0].tolist() == [0.5, 0.25, 0.0]
+    assert first_failures[1].tolist() == [0.0, 1.0, 0.0]
+    assert np.allclose(first_failures.sum(axis=1), statistics.failure_probabilities)
+    assert np.allclose(
+        statistics.cumulative_failure_probabilities, np.cumsum(first_failures, axis=1)
+    )
+    assert statistics.expected_failed_assets() == pytest.approx(0.75 + 1 + 1 - 0.504)
+    assert statistics.expected_failed_assets(0) == pytest.approx(0.6)
+    assert statistics.expected_outaged_load({uuids[1]: 3.0}) == pytest.approx(3.0)
+    distribution = statistics.failed_asset_count_distribution()
+    assert distribution[0] == pytest.approx(0.0)
+    assert distribution @ np.arange(4) == pytest.approx(statistics.expected_failed_assets())
+
+    with pytest.raises(ValueError):
+        FailureStatistics(survival, [datetime(2024, 1, 1)], uuids)
+
+
+def test_failure_statistics_match_samples():
+    scenario_generator = get_scenario_generator()
+    statistics = scenario_generator.get_failure_statistics()
+    outage_matrix = scenario_generator.outage_matrix(5_000, seed=1, n_workers=1)
+
+    sampled_first_failures = np.stack(
+        [
+            (outage_matrix.first_failures == jj).mean(axis=0)
+            for jj in range(len(statistics.timestamps))
+        ],
+        axis=1,
+    )
+    assert np.abs(sampled_first_failures - statistics.first_failure_probabilities).max() < 0.03
+    failures = (outage_matrix.first_failures != -1).sum(axis=1)
+    sampled_distribution = np.bincount(failures, minlength=len(statistics.component_uuids) + 1)
+    assert (
+        np.abs(sampled_distribution / 5_000 - statistics.failed_asset_count_distribution()).max()
+        < 0.03
+    )
@@ -24,6 +24,7 @@ def test_component_failure():
         h.add_component(test)
 
 
+@pytest.mark.network
 def test_from_gdm(gdm_system: DistributionSystem):
     asset_system = AssetSystem.from_gdm(gdm_system)
     asset_system.info()
@@ -37,6 +38,7 @@ def test_serialization_deserialization(tmp_path):
     AssetSystem.from_json(tmp_path / "asset_system.json")
 
 
+@pytest.mark.network
 def test_plot(gdm_system_2: DistributionSystem):
     asset_system = AssetSystem.from_gdm(gdm_system_2)
     asset_system.plot()
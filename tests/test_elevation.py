@@ -0,0 +1,220 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from collections import Counter
+import threading
+import json
+import time
+
+from infrasys.quantities import Distance
+import numpy as np
+import requests
+import pytest
+
+from erad.elevation import (
+    DEFAULT_ELEVATION_M,
+    CachedElevationProvider,
+    ElevationProvider,
+    PointServiceElevationProvider,
+    RasterElevationProvider,
+)
+from erad.models.asset import Asset, set_asset_elevations
+from erad.systems.asset_system import AssetSystem
+
+
+class CountingElevationProvider(ElevationProvider):
+    def __init__(self):
+        self.queried = []
+
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        self.queried.append(len(latitude))
+        return np.where(latitude > 0, 100.0 * latitude, np.nan)
+
+
+def write_raster(path, data, bounds):
+    rasterio = pytest.importorskip("rasterio")
+    transform = rasterio.transform.from_bounds(*bounds, data.shape[1], data.shape[0])
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        height=data.shape[0],
+        width=data.shape[1],
+        count=1,
+        dtype=data.dtype,
+        crs="EPSG:4326",
+        transform=transform,
+        nodata=-32768,
+    ) as dst:
+        dst.write(data, 1)
+
+
+def test_raster_elevation_provider(tmp_path):
+    # 10 x 10 cells of 0.1 degrees, cell value = 10 * row + column
+    data = np.arange(100, dtype=np.int16).reshape(10, 10)
+    data[0, 0] = -32768
+    raster_path = tmp_path / "raster.tif"
+    write_raster(raster_path, data, (-121.0, 36.0, -120.0, 37.0))
+
+    provider = RasterElevationProvider(raster_path)
+    elevations = provider.get_elevations(
+        np.array([36.95, 36.05, 36.55, 36.95, 38.0]),
+        np.array([-120.05, -120.95, -120.45, -120.95, -120.5]),
+    )
+    assert elevations[:3].tolist() == [9.0, 90.0, 45.0]
+    assert np.isnan(elevations[3:]).all()
+
+
+def test_set_asset_elevations():
+    assets = [Asset.example() for _ in range(4)]
+    assets[1].latitude = assets[0].latitude
+    assets[3].latitude = -10.0
+    provider = CountingElevationProvider()
+
+    set_asset_elevations(assets, provider)
+    assert provider.queried == [2]
+    assert assets[0].elevation.to("meter").magnitude == pytest.approx(100 * assets[0].latitude)
+    assert assets[3].elevation.to("meter").magnitude == DEFAULT_ELEVATION_M
+
+    set_asset_elevations(assets, provider)
+    assert provider.queried == [2]
+
+    assets[0].latitude = 20.0
+    assert not assets[0].has_elevation()
+    set_asset_elevations(assets, provider)
+    assert provider.queried == [2, 1]
+    assert assets[0].elevation == Distance(2000.0, "meter")
+
+
+def test_asset_system_set_elevations():
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    asset_system.add_component(Asset.example())
+    provider = CountingElevationProvider()
+    asset_system.set_elevations(provider)
+    asset_system.set_elevations(provider)
+    assert provider.queried == [1]
+    asset_system.set_elevations(provider, overwrite=True)
+    assert provider.queried == [1, 1]
+
+
+def test_cached_elevation_provider(tmp_path):
+    provider = CountingElevationProvider()
+    cached = CachedElevationProvider(provider, tmp_path / "cache.sqlite", precision=3)
+    latitude = np.array([10.0, 10.0001, 20.0, -5.0])
+    longitude = np.array([1.0, 1.0, 2.0, 3.0])
+
+    elevations = cached.get_elevations(latitude, longitude)
+    assert provider.queried == [3]
+    assert elevations[0] == elevations[1] == 1000.0
+    assert np.isnan(elevations[3])
+
+    # A new instance reads the same file, only the unknown coordinate is queried again
+    cached = CachedElevationProvider(provider, tmp_path / "cache.sqlite", precision=3)
+    assert np.array_equal(cached.get_elevations(latitude, longitude), elevations, equal_nan=True)
+    assert provider.queried == [3, 1]
+
+
+def test_cached_elevation_provider_eviction(tmp_path):
+    provider = CountingElevationProvider()
+    cached = CachedElevationProvider(provider, tmp_path / "cache.sqlite", max_entries=2)
+    cached.get_elevations(np.array([1.0]), np.array([1.0]))
+    cached.get_elevations(np.array([2.0]), np.array([1.0]))
+    cached.get_elevations(np.array([1.0]), np.array([1.0]))
+    cached.get_elevations(np.array([3.0]), np.array([1.0]))
+    assert provider.queried == [1, 1, 1]
+
+    # The least recently used coordinate (2, 1) was evicted
+    cached.get_elevations(np.array([1.0, 3.0]), np.array([1.0, 1.0]))
+    assert provider.queried == [1, 1, 1]
+    cached.get_elevations(np.array([2.0]), np.array([1.0]))
+    assert provider.queried == [1, 1, 1, 1]
+
+
+class ElevationRequestHandler(BaseHTTPRequestHandler):
+    """Stand-in point-query service, fails the first request for every coordinate."""
+
+    requests = Counter()
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        coordinate = (float(query["y"][0]), float(query["x"][0]))
+        cls = ElevationRequestHandler
+        with cls.lock:
+            cls.requests[coordinate] += 1
+            attempt = cls.requests[coordinate]
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.01)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        if attempt == 1 or coordinate[0] < 0:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({"value": 100.0 * coordinate[0]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def elevation_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ElevationRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    ElevationRequestHandler.requests.clear()
+    ElevationRequestHandler.max_in_flight = 0
+    yield f"http://127.0.0.1:{server.server_port}/?x={{longitude}}&y={{latitude}}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_point_service_elevation_provider(elevation_server):
+    provider = PointServiceElevationProvider(
+        elevation_server, max_concurrency=3, retries=2, backoff_s=0.01
+    )
+    latitude = np.array([1.0 + 0.1 * (ii % 10) for ii in range(30)] + [-1.0])
+    longitude = np.full(len(latitude), 5.0)
+
+    elevations = provider.get_elevations(latitude, longitude)
+    assert np.allclose(elevations[:-1], 100 * latitude[:-1])
+    assert np.isnan(elevations[-1])
+    assert len(ElevationRequestHandler.requests) == 11
+    assert ElevationRequestHandler.requests[(-1.0, 5.0)] == 3
+    assert all(
+        count == 2
+        for coordinate, count in ElevationRequestHandler.requests.items()
+        if coordinate[0] > 0
+    )
+    assert ElevationRequestHandler.max_in_flight <= 3
+
+
+def test_point_service_sessions_are_not_shared(elevation_server, monkeypatch):
+    session_threads = {}
+    closed = []
+
+    class RecordingSession(requests.Session):
+        def get(self, *args, **kwargs):
+            session_threads.setdefault(id(self), set()).add(threading.get_ident())
+            return super().get(*args, **kwargs)
+
+        def close(self):
+            closed.append(id(self))
+            super().close()
+
+    monkeypatch.setattr(requests, "Session", RecordingSession)
+    provider = PointServiceElevationProvider(elevation_server, max_concurrency=4, backoff_s=0.01)
+    latitude = np.array([1.0 + 0.1 * ii for ii in range(20)])
+
+    elevations = provider.get_elevations(latitude, np.full(len(latitude), 5.0))
+    assert np.allclose(elevations, 100 * latitude)
+    assert all(len(threads) == 1 for threads in session_threads.values())
+    assert sorted(closed) == sorted(session_threads)
@@ -6,6 +6,7 @@ from erad.default_fragility_curves import DEFAULT_FRAGILTY_CURVES
 from erad.quantities import Speed
 from erad.enums import AssetTypes
 
+import numpy as np
 import pytest
 
 
@@ -86,3 +87,26 @@ def test_invalid_probability_func_use():
         )
         prob_model = prob_data_model.prob_model
         prob_model.probability(45)
+
+
+@pytest.mark.parametrize(
+    "distribution, parameters",
+    [
+        ("lognorm", [Speed(0.45, "m/s"), Speed(50, "m/s"), 1 / 0.45]),
+        ("lognorm", [Speed(0.5, "m/s")]),
+        ("norm", [Speed(1.5, "m/s"), 2]),
+        ("weibull_min", [Speed(1.7, "m/s"), Speed(10, "m/s"), 30]),
+        ("expon", [Speed(0.65, "m/s"), 0.95]),
+        ("gamma", [Speed(2.0, "m/s"), Speed(5, "m/s"), 10]),
+    ],
+)
+def test_vectorized_survival_probability(distribution, parameters):
+    prob_model = ProbabilityFunction(distribution=distribution, parameters=parameters).prob_model
+    values = np.concatenate([np.linspace(-20, 200, 500), [np.nan]])
+    survival = prob_model.survival_probability(values)
+    expected = 1 - prob_model.probability(Speed(values, "m/s"))
+    assert np.allclose(survival[:-1], expected[:-1], rtol=0, atol=1e-12)
+    assert np.isnan(survival[-1])
+    assert prob_model.survival_probability(60.0) == pytest.approx(
+        1 - prob_model.probability(Speed(60.0, "m/s")), abs=1e-12
+    )
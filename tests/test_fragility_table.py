@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+from infrasys.quantities import Distance
+import numpy as np
+import pytest
+
+from erad.models.fragility_curve import HazardFragilityCurves, FragilityCurve, ProbabilityFunction
+from erad.default_fragility_curves import DEFAULT_FRAGILTY_CURVES
+from erad.constants import HAZARD_PARAMETER_UNITS
+from erad.systems.hazard_system import HazardSystem
+from erad.fragility_table import FragilityTable
+from erad.runner import HazardSimulator
+from erad.quantities import Speed
+from erad.enums import AssetTypes
+from erad.models.asset import Asset
+from erad.systems.asset_system import AssetSystem
+
+
+def get_asset_system(size: int = 3) -> AssetSystem:
+    asset_types = list(AssetTypes)
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    for i in range(size):
+        for j in range(size):
+            asset_system.add_component(
+                Asset(
+                    name=f"asset_{i}_{j}",
+                    asset_type=asset_types[(i * size + j) % len(asset_types)],
+                    distribution_asset=uuid4(),
+                    height=Distance(10, "meter"),
+                    latitude=36.6 + (i - size // 2) * 0.1,
+                    longitude=-121.9 + (j - size // 2) * 0.1,
+                    asset_state=[],
+                )
+            )
+    return asset_system
+
+
+def test_default_curves_table():
+    table = FragilityTable(DEFAULT_FRAGILTY_CURVES)
+    values = np.linspace(0, 200, 50)
+    for frag_curves in DEFAULT_FRAGILTY_CURVES:
+        param = frag_curves.asset_state_param
+        for curve in frag_curves.curves:
+            compiled = table.get_curve(param, curve.asset_type)
+            assert compiled.prob_function is curve.prob_function
+            prob_model = curve.prob_function.prob_model
+            expected = 1 - prob_model.probability(
+                prob_model.quantity(values, HAZARD_PARAMETER_UNITS[param])
+            )
+            assert np.allclose(compiled.survival_probability(values), expected)
+
+
+def test_first_curve_definition_wins():
+    first = ProbabilityFunction(distribution="lognorm", parameters=[Speed(35, "m/s"), 0.5])
+    second = ProbabilityFunction(distribution="lognorm", parameters=[Speed(45, "m/s"), 0.5])
+    frag_curves = [
+        HazardFragilityCurves(
+            asset_state_param="wind_speed",
+            curves=[FragilityCurve(asset_type=AssetTypes.substation, prob_function=first)],
+        ),
+        HazardFragilityCurves(
+            asset_state_param="wind_speed",
+            curves=[FragilityCurve(asset_type=AssetTypes.substation, prob_function=second)],
+        ),
+    ]
+    table = FragilityTable(
+        frag_curves, parameters=["wind_speed"], asset_types=[AssetTypes.substation]
+    )
+    assert table.get_prob_function("wind_speed", AssetTypes.substation) is first
+    assert table.get_curve("wind_speed", AssetTypes.switch) is None
+
+
+def test_missing_curves_reported_at_build():
+    frag_curves = [
+        HazardFragilityCurves(
+            asset_state_param="wind_speed",
+            curves=[
+                FragilityCurve(
+                    asset_type=AssetTypes.substation,
+                    prob_function=ProbabilityFunction.example(),
+                )
+            ],
+        )
+    ]
+    with pytest.raises(ValueError, match="wind_speed - switch"):
+        FragilityTable(frag_curves, parameters=["wind_speed"])
+
+    hazard_system = HazardSystem.wind_example()
+    hazard_system.add_components(*frag_curves)
+    simulator = HazardSimulator(asset_system=get_asset_system())
+    with pytest.raises(ValueError, match="No fragility curve found"):
+        simulator.run(hazard_system, engine="vectorized")
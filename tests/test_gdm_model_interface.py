@@ -4,12 +4,14 @@ from gdm.distribution.components import DistributionBus
 from gdm.distribution import DistributionSystem
 from gdm.quantities import Distance
 from shapely.geometry import Point
+import pytest
 
 from erad.systems.hazard_system import HazardSystem
 from erad.models.hazard import EarthQuakeModel
 from erad.runner import HazardSimulator
 
 
+@pytest.mark.network
 def test_gdm_model_earthquake(gdm_system: DistributionSystem):
     hazard_scenario = HazardSimulator.from_gdm(gdm_system)
     buses: list[DistributionBus] = list(gdm_system.get_components(DistributionBus))
@@ -26,6 +28,7 @@ def test_gdm_model_earthquake(gdm_system: DistributionSystem):
     hazard_scenario.run(hazard_system)
 
 
+@pytest.mark.network
 def test_asset_graph_undirected(gdm_system: DistributionSystem):
     dist_graph = gdm_system.get_undirected_graph()
     hazard_scenario = HazardSimulator.from_gdm(gdm_system)
@@ -38,6 +41,7 @@ def test_asset_graph_undirected(gdm_system: DistributionSystem):
     ), f"The number of nodes in the asset graph ({graph.number_of_nodes()}) should match the distribution system graph. ({dist_graph.number_of_nodes()})"
 
 
+@pytest.mark.network
 def test_asset_graph_directed(gdm_system: DistributionSystem):
     dist_graph = gdm_system.get_directed_graph()
     hazard_scenario = HazardSimulator.from_gdm(gdm_system)
@@ -1,11 +1,29 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
 from gdm.tracked_changes import filter_tracked_changes_by_name_and_date, apply_updates_to_system
 from gdm.distribution import DistributionSystem
+from infrasys.quantities import Distance
+from shapely.geometry import Point
+import numpy as np
+import pytest
 
-from erad.runner import HazardScenarioGenerator
+from erad.constants import DEFAULT_HEIGHTS_M
+from erad.scenario_sink import JsonLinesScenarioSink
+from erad.convergence import RunningEstimate
+from erad.runner import HazardScenarioGenerator, iter_first_failures_parallel
+from erad.sampling import draw_uniform
+from erad import runner
+from erad.outage_matrix import OutageMatrix
+from erad.models.hazard import WindModel
+from erad.models.asset import Asset
+from erad.quantities import Speed
+from erad.enums import AssetTypes
 from erad.systems.asset_system import AssetSystem
 from erad.systems.hazard_system import HazardSystem
 
 
+@pytest.mark.network
 def test_hazard_scenarios(gdm_system: DistributionSystem):
     number_of_samples = 5
     asset_system = AssetSystem.from_gdm(gdm_system)
@@ -34,3 +52,348 @@ def test_hazard_scenarios(gdm_system: DistributionSystem):
         ]
     )
     assert n_asset_inservice_before != n_asset_inservice_after
+
+
+def get_asset_grid(
+    latitude: float, longitude: float, spacing: float, size: int = 7
+) -> AssetSystem:
+    asset_types = list(AssetTypes)
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    for i in range(size):
+        for j in range(size):
+            asset_type = asset_types[(i * size + j) % len(asset_types)]
+            asset_system.add_component(
+                Asset(
+                    name=f"asset_{i}_{j}",
+                    asset_type=asset_type,
+                    distribution_asset=uuid4(),
+                    height=Distance(DEFAULT_HEIGHTS_M[asset_type], "meter"),
+                    latitude=latitude + (i - size // 2) * spacing,
+                    longitude=longitude + (j - size // 2) * spacing,
+                    asset_state=[],
+                )
+            )
+    return asset_system
+
+
+def get_wind_track(number_of_timestamps: int, max_wind_speed: float = 50) -> HazardSystem:
+    hazard_system = HazardSystem(auto_add_composed_components=True)
+    for i in range(number_of_timestamps):
+        wind_model = WindModel.example().model_copy(
+            update={
+                "timestamp": datetime(2020, 1, 1) + timedelta(hours=i),
+                "center": Point(-121.93036 + 0.1 * i, 36.60144),
+                "max_wind_speed": Speed(max_wind_speed, "miles/hour"),
+            }
+        )
+        hazard_system.add_component(wind_model)
+    return hazard_system
+
+
+def get_scenario_generator(
+    number_of_timestamps: int = 3, max_wind_speed: float = 130, spacing: float = 0.5
+) -> HazardScenarioGenerator:
+    return HazardScenarioGenerator(
+        asset_system=get_asset_grid(36.60, -121.93, spacing),
+        hazard_system=get_wind_track(number_of_timestamps, max_wind_speed),
+        engine="vectorized",
+    )
+
+
+def get_legacy_samples(assets: list[Asset], number_of_samples: int, seed: int) -> list[tuple]:
+    """Scenarios drawn one sample and one asset at a time, as the original sampler did."""
+    np.random.seed(seed)
+    scenarios = []
+    for i in range(number_of_samples):
+        outaged_assets = []
+        random_samples = np.random.random((len(assets), len(assets[0].get_asset_states())))
+        for ii, asset in enumerate(assets):
+            asset_states = sorted(asset.get_asset_states(), key=lambda state: state.timestamp)
+            for jj, state in enumerate(asset_states):
+                if (
+                    random_samples[ii, jj] > state.survival_probability
+                    and asset.name not in outaged_assets
+                ):
+                    scenarios.append((f"sample_{i}", state.timestamp, asset.distribution_asset))
+                    outaged_assets.append(asset.name)
+    return scenarios
+
+
+@pytest.mark.parametrize("engine", ["per_asset", "vectorized"])
+def test_vectorized_sampler_matches_legacy_sampler(engine):
+    asset_system = get_asset_grid(36.60, -121.93, 0.5)
+    asset = next(iter(asset_system.get_components(Asset)))
+    asset_system.add_component(
+        asset.model_copy(update={"uuid": uuid4(), "distribution_asset": uuid4()})
+    )
+    scenario_generator = HazardScenarioGenerator(
+        asset_system=asset_system, hazard_system=get_wind_track(4, 180), engine=engine
+    )
+    scenarios = scenario_generator.samples(number_of_samples=20, seed=7)
+    assert len(scenarios) > 0
+    assert [
+        (change.scenario_name, change.timestamp, change.edits[0].component_uuid)
+        for change in scenarios
+    ] == get_legacy_samples(scenario_generator.assets, 20, 7)
+
+
+def test_parallel_samples_do_not_depend_on_workers():
+    scenario_generator = get_scenario_generator(3, 180)
+    scenarios = [
+        [
+            (change.scenario_name, change.timestamp, change.edits[0].component_uuid)
+            for change in scenario_generator.samples(
+                number_of_samples=25, seed=3, n_workers=n_workers, samples_per_block=4
+            )
+        ]
+        for n_workers in [1, 3]
+    ]
+    assert scenarios[0] == scenarios[1]
+    assert {name for name, _, _ in scenarios[0]} == {f"sample_{i}" for i in range(25)}
+
+
+def test_interleaved_in_process_sampling():
+    survivals = [np.full((50, 4), 0.9), np.full((30, 2), 0.5)]
+    expected = [
+        list(iter_first_failures_parallel(survival, 12, 7, 1, 4, "importance"))
+        for survival in survivals
+    ]
+    # Each generator samples from its own survival matrix, however their blocks interleave
+    streams = zip(
+        *[
+            iter_first_failures_parallel(survival, 12, 7, 1, 4, "importance")
+            for survival in survivals
+        ]
+    )
+    for blocks, expected_blocks in zip(streams, zip(*expected)):
+        for (first_failures, log_weights), (expected_failures, expected_weights) in zip(
+            blocks, expected_blocks
+        ):
+            assert np.array_equal(first_failures, expected_failures)
+            assert np.array_equal(log_weights, expected_weights)
+
+
+@pytest.mark.parametrize(
+    "strategy", ["monte_carlo", "latin_hypercube", "antithetic", "sobol", "importance"]
+)
+def test_sample_block_size_cap(strategy, monkeypatch):
+    survival = np.full((10, 1), 0.5)
+    draw_sizes = []
+
+    def recording_draw_uniform(*args):
+        random_samples = draw_uniform(*args)
+        draw_sizes.append(random_samples.size)
+        return random_samples
+
+    monkeypatch.setattr(runner, "MAX_SAMPLE_BLOCK_SIZE", 48)
+    monkeypatch.setattr(runner, "draw_uniform", recording_draw_uniform)
+    (first_failures, _), *_ = iter_first_failures_parallel(survival, 16, 3, 1, 16, strategy)
+    assert first_failures.shape == (16, 10)
+    assert len(draw_sizes) == 4 and max(draw_sizes) <= 48
+    if strategy not in ("monte_carlo", "importance"):
+        # Each chunk of assets keeps its design over the whole block of samples
+        assert np.all((first_failures == 0).sum(axis=0) == 8)
+
+
+def test_streamed_samples(tmp_path):
+    scenario_generator = get_scenario_generator(2, 180)
+    scenarios = scenario_generator.samples(number_of_samples=10, seed=1)
+
+    blocks = list(scenario_generator.iter_samples(10, seed=1, samples_per_block=3))
+    assert len(blocks) == 4
+    assert [change for block in blocks for change in block] == scenarios
+
+    sink = JsonLinesScenarioSink(tmp_path / "scenarios.jsonl")
+    n_changes = scenario_generator.write_samples(sink, 10, seed=1, samples_per_block=3)
+    assert n_changes == len(scenarios)
+    streamed = list(JsonLinesScenarioSink.read(tmp_path / "scenarios.jsonl"))
+    assert [
+        (change.scenario_name, change.timestamp, change.edits[0].component_uuid)
+        for change in streamed
+    ] == [
+        (change.scenario_name, change.timestamp, change.edits[0].component_uuid)
+        for change in scenarios
+    ]
+
+
+@pytest.mark.parametrize("file_format", ["npz", "parquet"])
+def test_outage_matrix(tmp_path, file_format):
+    asset_system = get_asset_grid(36.60, -121.93, 0.5)
+    # Asset names are outaged at most once per sample
+    asset = next(iter(asset_system.get_components(Asset)))
+    asset_system.add_component(
+        asset.model_copy(update={"uuid": uuid4(), "distribution_asset": uuid4()})
+    )
+    scenario_generator = HazardScenarioGenerator(
+        asset_system=asset_system, hazard_system=get_wind_track(3, 180)
+    )
+    scenarios = scenario_generator.samples(number_of_samples=12, seed=5)
+    outage_matrix = scenario_generator.outage_matrix(12, seed=5, samples_per_block=5)
+    assert outage_matrix.first_failures.shape == (12, len(scenario_generator.assets))
+    assert outage_matrix.first_failures.dtype == np.int8
+    assert len(outage_matrix) == len(scenarios)
+
+    file_path = tmp_path / f"outages.{file_format}"
+    if file_format == "npz":
+        outage_matrix.to_npz(file_path)
+        loaded = OutageMatrix.from_npz(file_path)
+    else:
+        pytest.importorskip("pyarrow")
+        outage_matrix.to_parquet(file_path)
+        loaded = OutageMatrix.from_parquet(file_path)
+    assert np.array_equal(loaded.first_failures, outage_matrix.first_failures)
+    assert loaded.first_failures.dtype == np.int8
+    assert loaded.to_edit_store().updates == scenarios
+
+
+def test_outage_matrix_index_dtype():
+    timestamps = [datetime(2020, 1, 1) + timedelta(hours=hour) for hour in range(200)]
+    outage_matrix = OutageMatrix([[-1, 199], [0, -1]], [uuid4(), uuid4()], timestamps)
+    assert outage_matrix.first_failures.dtype == np.int16
+    assert np.array_equal(outage_matrix.first_failures, [[-1, 199], [0, -1]])
+    assert (
+        OutageMatrix([[-1, 126]], [uuid4(), uuid4()], timestamps[:127]).first_failures.dtype
+        == np.int8
+    )
+
+
+# Sobol warns when its points are not balanced
+@pytest.mark.filterwarnings("error::UserWarning")
+@pytest.mark.parametrize(
+    "strategy", ["monte_carlo", "latin_hypercube", "antithetic", "sobol", "importance"]
+)
+def test_sampling_strategies(strategy, tmp_path):
+    scenario_generator = get_scenario_generator()
+    survival, _ = scenario_generator.get_survival_matrix()
+    expected_failures = (1 - survival.prod(axis=1)).sum()
+
+    outage_matrix = scenario_generator.outage_matrix(
+        600, seed=11, strategy=strategy, samples_per_block=256
+    )
+    assert (outage_matrix.log_weights is not None) == (strategy == "importance")
+    failures = (outage_matrix.first_failures != -1).sum(axis=1)
+    assert (failures * outage_matrix.sample_weights).sum() == pytest.approx(
+        expected_failures, rel=0.05
+    )
+
+    outage_matrix.to_npz(tmp_path / "outages.npz")
+    loaded = OutageMatrix.from_npz(tmp_path / "outages.npz")
+    assert np.array_equal(loaded.sample_weights, outage_matrix.sample_weights)
+
+
+def test_importance_weights_large_system():
+    survival = np.full((20_000, 10), 0.999)
+    first_failures, log_weights = next(
+        iter_first_failures_parallel(survival, 20, 5, 1, 20, "importance", 10.0)
+    )
+    failed = first_failures != -1
+    # Every asset contributes its survived timestamps and, if any, its failure
+    survived = np.where(failed, first_failures, survival.shape[1]).sum(axis=1)
+    expected = survived * np.log(0.999 / 0.99) + failed.sum(axis=1) * np.log(0.001 / 0.01)
+    assert log_weights == pytest.approx(expected)
+
+    outage_matrix = OutageMatrix(
+        first_failures, [uuid4() for _ in range(len(survival))], [], 0, log_weights
+    )
+    assert np.all(np.isfinite(outage_matrix.sample_weights))
+    assert outage_matrix.sample_weights.sum() == pytest.approx(1.0)
+    assert outage_matrix.deduplicate().sample_weights.sum() == pytest.approx(1.0)
+
+
+def test_unsupported_sampling_strategy():
+    scenario_generator = get_scenario_generator(1, 50)
+    with pytest.raises(ValueError):
+        scenario_generator.samples(2, strategy="unknown")
+    with pytest.raises(ValueError):
+        scenario_generator.samples(2, strategy="sobol", samples_per_block=100)
+
+
+def test_adaptive_sampling():
+    scenario_generator = get_scenario_generator()
+    survival, _ = scenario_generator.get_survival_matrix()
+    failure_rates = 1 - survival.prod(axis=1)
+    asset_loads = {asset.distribution_asset: 2.0 for asset in scenario_generator.assets}
+
+    result = scenario_generator.adaptive_outage_matrix(
+        seed=3,
+        max_samples=20_000,
+        samples_per_block=200,
+        metrics=("failed_assets", "asset_failure_rates", "outaged_load"),
+        relative_tolerance=0.05,
+        absolute_tolerance=0.02,
+        asset_loads=asset_loads,
+    )
+    assert result.converged
+    assert result.number_of_samples < 20_000
+    assert result.number_of_samples % 200 == 0
+    low, high = result.get_confidence_interval("failed_assets")
+    assert low <= failure_rates.sum() <= high
+    assert result.get_estimate("outaged_load") == pytest.approx(
+        2 * result.get_estimate("failed_assets")
+    )
+    assert np.abs(result.get_estimate("asset_failure_rates") - failure_rates).max() < 0.05
+
+    # The same seed gives the first scenarios of a fixed size run
+    outage_matrix = scenario_generator.outage_matrix(
+        result.number_of_samples, seed=3, samples_per_block=200
+    )
+    assert np.array_equal(outage_matrix.first_failures, result.outage_matrix.first_failures)
+
+    result = scenario_generator.adaptive_outage_matrix(
+        max_samples=1_000, relative_tolerance=1e-6, samples_per_block=100
+    )
+    assert not result.converged
+    assert result.number_of_samples == 1_000
+
+    result = scenario_generator.adaptive_outage_matrix(
+        relative_tolerance=1e-6, time_budget_s=0.0, samples_per_block=100
+    )
+    assert not result.converged
+    assert result.number_of_samples == 100
+
+    with pytest.raises(ValueError):
+        scenario_generator.adaptive_outage_matrix(metrics=("outaged_load",))
+
+
+def test_adaptive_sampling_without_failures():
+    scenario_generator = get_scenario_generator(1, 1)
+    estimate = RunningEstimate()
+    estimate.update(np.zeros(100))
+    assert estimate.variance == 0
+    assert estimate.half_width(0.95) == pytest.approx(-np.log(0.05) / 100)
+    assert not estimate.is_converged(0.95, relative_tolerance=0.05)
+    assert estimate.is_converged(0.95, relative_tolerance=0.05, absolute_tolerance=0.03)
+
+    result = scenario_generator.adaptive_outage_matrix(max_samples=1_000, samples_per_block=100)
+    assert len(result.outage_matrix) == 0
+    assert not result.converged
+    assert result.number_of_samples == 1_000
+
+
+@pytest.mark.parametrize("strategy", ["monte_carlo", "importance"])
+def test_unique_outage_matrix(strategy, tmp_path):
+    scenario_generator = get_scenario_generator(2, 50, 2.0)
+    outage_matrix = scenario_generator.outage_matrix(
+        2_000, seed=5, strategy=strategy, samples_per_block=300
+    )
+    unique = scenario_generator.unique_outage_matrix(
+        2_000, seed=5, strategy=strategy, samples_per_block=300
+    )
+    assert unique.number_of_samples < outage_matrix.number_of_samples
+    assert unique.counts.sum() == 2_000
+    assert len({row.tobytes() for row in unique.first_failures}) == unique.number_of_samples
+    assert np.array_equal(unique.first_failures[0], outage_matrix.first_failures[0])
+
+    # Probabilities of the distinct scenarios match the expectations of the full matrix
+    failures = (outage_matrix.first_failures != -1).sum(axis=1)
+    unique_failures = (unique.first_failures != -1).sum(axis=1)
+    assert (unique_failures * unique.sample_weights).sum() == pytest.approx(
+        (failures * outage_matrix.sample_weights).sum()
+    )
+    for row, count in zip(unique.first_failures[:5], unique.counts[:5]):
+        assert (outage_matrix.first_failures == row).all(axis=1).sum() == count
+
+    unique.to_npz(tmp_path / "unique.npz")
+    loaded = OutageMatrix.from_npz(tmp_path / "unique.npz")
+    assert np.array_equal(loaded.counts, unique.counts)
+    assert np.array_equal(loaded.log_weights, unique.log_weights)
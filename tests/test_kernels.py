@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+
+from geopy.distance import geodesic
+from infrasys.quantities import Distance
+from shapely.geometry import Point, Polygon
+import numpy as np
+import shapely
+import pytest
+
+from erad.kernels.common import WGS84, geodesic_distance_km
+from erad.kernels.fire import fire_boundary_index
+from erad.kernels import (
+    earthquake_ground_motion,
+    earthquake_ground_motion_events,
+    fire_boundary_distance,
+    flood_depth_and_velocity,
+    wind_speed,
+    wind_speed_track,
+)
+from erad.models.asset import AssetState
+from erad.models.hazard import EarthQuakeModel, FireModel, FloodModel, WindModel
+from erad.models.hazard.flood import FloodModelArea
+from erad.models.hazard.wild_fire import FireModelArea
+
+
+def test_geodesic_distance_matches_geopy():
+    rng = np.random.default_rng(0)
+    latitude = rng.uniform(-89, 89, 200)
+    longitude = rng.uniform(-180, 180, 200)
+    distance = geodesic_distance_km(latitude, longitude, 36.60144, -121.93036)
+    expected = [geodesic((36.60144, -121.93036), (y, x)).km for y, x in zip(latitude, longitude)]
+    assert np.allclose(distance, expected, rtol=0, atol=1e-6)
+
+
+def test_wind_speed_track():
+    track = [
+        WindModel.example().model_copy(
+            update={
+                "timestamp": datetime(2020, 1, 1) + timedelta(hours=i),
+                "center": Point(-121.93036 + 0.2 * i, 36.60144),
+            }
+        )
+        for i in range(4)
+    ]
+    latitude, longitude = np.meshgrid(
+        np.linspace(36.0, 37.2, 9), np.linspace(-122.6, -121.0, 9), indexing="ij"
+    )
+    latitude, longitude = latitude.ravel(), longitude.ravel()
+
+    speeds = wind_speed_track(latitude, longitude, track)
+    assert speeds.shape == (len(track), len(latitude))
+    assert speeds.max() > 0
+    for wind_model, row in zip(track, speeds):
+        assert np.array_equal(row, wind_speed(latitude, longitude, wind_model))
+        for y, x, value in zip(latitude, longitude, row):
+            asset_state = AssetState(timestamp=wind_model.timestamp)
+            asset_state.calculate_wind_vectors(Point(x, y), wind_model)
+            assert np.isclose(
+                asset_state.wind_speed.speed.to("miles/hour").magnitude, value, atol=1e-9
+            )
+
+
+def test_earthquake_ground_motion_events():
+    events = [
+        EarthQuakeModel.example().model_copy(
+            update={
+                "origin": Point(-120.93036 + 0.5 * i, 36.60144),
+                "depth": Distance(10 + 50 * i, "km"),
+                "magnitude": 5.0 + 0.5 * i,
+            }
+        )
+        for i in range(3)
+    ]
+    latitude = np.linspace(36.0, 37.2, 12)
+    longitude = np.linspace(-122.6, -120.0, 12)
+
+    pgv, pga = earthquake_ground_motion_events(latitude, longitude, events)
+    assert pgv.shape == pga.shape == (len(events), len(latitude))
+    for event, pgv_row, pga_row in zip(events, pgv, pga):
+        event_pgv, event_pga = earthquake_ground_motion(latitude, longitude, event)
+        assert np.array_equal(pgv_row, event_pgv)
+        assert np.array_equal(pga_row, event_pga)
+        for y, x, velocity, acceleration in zip(latitude, longitude, pgv_row, pga_row):
+            asset_state = AssetState(timestamp=event.timestamp)
+            asset_state.calculate_earthquake_vectors(Point(x, y), event)
+            assert np.isclose(
+                asset_state.peak_ground_velocity.speed.to("centimeter/second").magnitude,
+                velocity,
+            )
+            assert np.isclose(
+                asset_state.peak_ground_acceleration.acceleration.to("meter/second**2").magnitude,
+                acceleration,
+            )
+
+
+def test_fire_boundary_distance_is_metric():
+    square = Polygon([(-121.0, 36.5), (-120.9, 36.5), (-120.9, 36.6), (-121.0, 36.6)])
+    fire_model = FireModel.example().model_copy(
+        update={
+            "affected_areas": [
+                FireModelArea.example(),
+                FireModelArea.example().model_copy(update={"affected_area": square}),
+            ]
+        }
+    )
+    latitude = np.array([36.55, 36.55, 36.70])
+    longitude = np.array([-120.80, -120.95, -120.99])
+
+    distance = fire_boundary_distance(latitude, longitude, fire_model)
+    assert distance[1] == 0
+    assert np.isclose(distance[0], geodesic((36.55, -120.8), (36.55, -120.9)).km, rtol=1e-3)
+    assert np.isclose(distance[2], geodesic((36.7, -120.99), (36.6, -120.99)).km, rtol=1e-3)
+
+
+def test_fire_boundary_index_is_reused_per_model():
+    fire_model = FireModel.example()
+    index = fire_boundary_index(fire_model)
+    assert fire_boundary_index(fire_model) is index
+
+    # Copies keep the uuid, so the index must follow the affected areas as well
+    square = Polygon([(-121.0, 36.5), (-120.9, 36.5), (-120.9, 36.6), (-121.0, 36.6)])
+    moved_model = fire_model.model_copy(
+        update={
+            "affected_areas": [
+                FireModelArea.example().model_copy(update={"affected_area": square})
+            ]
+        }
+    )
+    assert moved_model.uuid == fire_model.uuid
+    assert fire_boundary_index(moved_model) is not index
+    assert (
+        fire_boundary_index(moved_model).distance_km(np.array([36.55]), np.array([-120.95]))[0]
+        == 0
+    )
+
+
+def test_flood_overlapping_areas():
+    square = Polygon([(-121.0, 36.5), (-120.9, 36.5), (-120.9, 36.6), (-121.0, 36.6)])
+    flood_model = FloodModel.example().model_copy(
+        update={
+            "affected_areas": [
+                FloodModelArea.example(),
+                FloodModelArea.example().model_copy(
+                    update={"affected_area": square, "water_elevation": Distance(5, "meter")}
+                ),
+                FloodModelArea.example(),
+            ]
+        }
+    )
+    latitude, longitude = np.meshgrid(
+        np.linspace(36.45, 36.65, 15), np.linspace(-121.05, -120.85, 15), indexing="ij"
+    )
+    latitude, longitude = latitude.ravel(), longitude.ravel()
+    asset_elevation = np.linspace(0, 4, len(latitude))
+
+    depth, velocity, flooded = flood_depth_and_velocity(
+        latitude, longitude, asset_elevation, flood_model
+    )
+    assert flooded.any() and not flooded.all()
+    for y, x, elevation, *values in zip(latitude, longitude, asset_elevation, depth, velocity):
+        asset_state = AssetState(timestamp=flood_model.timestamp)
+        asset_state.calculate_flood_vectors(Point(x, y), flood_model, Distance(elevation, "m"))
+        assert np.isclose(asset_state.flood_depth.distance.to("meter").magnitude, values[0])
+        assert np.isclose(asset_state.flood_velocity.speed.to("meter/second").magnitude, values[1])
+
+
+@pytest.mark.parametrize("center_latitude", [0.0, 36.6, 70.0, -55.0])
+def test_wind_influence_footprint_is_conservative(center_latitude):
+    wind_model = WindModel.example().model_copy(
+        update={"center": Point(-121.93036, center_latitude)}
+    )
+    radius_m = wind_model.radius_of_closest_isobar.to("meter").magnitude
+    azimuth = np.linspace(-180, 180, 721)
+    longitude, latitude, _ = WGS84.fwd(
+        np.full(len(azimuth), wind_model.center.x),
+        np.full(len(azimuth), wind_model.center.y),
+        azimuth,
+        np.full(len(azimuth), radius_m),
+    )
+    assert shapely.contains_xy(wind_model.influence_footprint(), longitude, latitude).all()
@@ -0,0 +1,144 @@
+from uuid import uuid4
+import sqlite3
+
+from infrasys.quantities import Distance
+import numpy as np
+import pytest
+
+from erad.constants import DEFAULT_HEIGHTS_M, HAZARD_PARAMETER_UNITS
+from erad.engine import PROBABILITY_MODELS
+from erad.runner import HazardScenarioGenerator, HazardSimulator
+from erad.models.asset import Asset
+from erad.enums import AssetTypes
+from erad.systems.asset_system import AssetSystem
+from erad.systems.hazard_system import HazardSystem
+
+
+def get_asset_grid(size: int = 7, spacing: float = 0.01) -> AssetSystem:
+    asset_types = list(AssetTypes)
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    for i in range(size):
+        for j in range(size):
+            asset_type = asset_types[(i * size + j) % len(asset_types)]
+            asset_system.add_component(
+                Asset(
+                    name=f"asset_{i}_{j}",
+                    asset_type=asset_type,
+                    distribution_asset=uuid4(),
+                    height=Distance(DEFAULT_HEIGHTS_M[asset_type], "meter"),
+                    latitude=36.59 + (i - size // 2) * spacing,
+                    longitude=-120.92 + (j - size // 2) * spacing,
+                    asset_state=[],
+                )
+            )
+    return asset_system
+
+
+def run_vectorized(hazard_system: HazardSystem, **kwargs) -> HazardSimulator:
+    simulator = HazardSimulator(asset_system=get_asset_grid())
+    simulator.run(hazard_system=hazard_system, engine="vectorized", **kwargs)
+    return simulator
+
+
+def assert_same_asset_states(expected: AssetSystem, actual: AssetSystem):
+    expected_assets = sorted(expected.get_components(Asset), key=lambda x: x.name)
+    actual_assets = sorted(actual.get_components(Asset), key=lambda x: x.name)
+    for expected_asset, actual_asset in zip(expected_assets, actual_assets):
+        assert len(expected_asset.get_asset_states()) == len(actual_asset.get_asset_states())
+        for expected_state, actual_state in zip(
+            sorted(expected_asset.get_asset_states(), key=lambda x: x.timestamp),
+            sorted(actual_asset.get_asset_states(), key=lambda x: x.timestamp),
+        ):
+            assert expected_state.timestamp == actual_state.timestamp
+            assert actual_state.survival_probability == pytest.approx(
+                expected_state.survival_probability, abs=1e-9
+            )
+            for param, unit in HAZARD_PARAMETER_UNITS.items():
+                expected_model = getattr(expected_state, param)
+                actual_model = getattr(actual_state, param)
+                assert (expected_model is None) == (actual_model is None)
+                if expected_model is None:
+                    continue
+                _, quantity_name, _ = PROBABILITY_MODELS[param]
+                expected_value = getattr(expected_model, quantity_name).to(unit).magnitude
+                actual_value = getattr(actual_model, quantity_name).to(unit).magnitude
+                assert actual_value == pytest.approx(expected_value, rel=1e-9, abs=1e-9)
+                assert actual_model.survival_probability == pytest.approx(
+                    expected_model.survival_probability, abs=1e-9
+                )
+
+
+def test_vectorized_engine_does_not_create_asset_states():
+    simulator = run_vectorized(HazardSystem.multihazard_example())
+    for asset in simulator.asset_system.get_components(Asset):
+        assert asset.asset_state == []
+        assert len(asset.get_asset_states()) == len(simulator.result_store.timestamps)
+
+    store = simulator.result_store
+    assert store.survival_probability.shape == (49, 2)
+    assert set(store.intensities) == {"wind_speed", "flood_depth", "flood_velocity"}
+    assert np.isnan(store.intensities["wind_speed"]).sum() == 49
+
+
+def test_float32_store():
+    simulator = run_vectorized(HazardSystem.flood_example(), result_dtype=np.float32)
+    store = simulator.result_store
+    assert store.survival_probability.dtype == np.float32
+    reference = run_vectorized(HazardSystem.flood_example()).result_store
+    assert np.allclose(store.survival_probability, reference.survival_probability, atol=1e-6)
+    # The offline test elevation leaves the assets below the 10 ft flood
+    assert np.nanmax(reference.intensities["flood_depth"]) > 0
+
+
+def test_materialize_asset_states():
+    hazard_system = HazardSystem.earthquake_example()
+    per_asset = HazardSimulator(asset_system=get_asset_grid())
+    per_asset.run(hazard_system=hazard_system)
+    simulator = run_vectorized(hazard_system)
+    simulator.asset_system.materialize_asset_states()
+    assert simulator.asset_system.result_store is None
+    for asset in simulator.asset_system.get_components(Asset):
+        assert len(asset.asset_state) == 1
+    assert_same_asset_states(per_asset.asset_system, simulator.asset_system)
+
+
+def test_per_asset_run_after_vectorized_run():
+    scenario_generator = HazardScenarioGenerator(
+        get_asset_grid(), HazardSystem.wind_example(), engine="vectorized"
+    )
+    simulator = scenario_generator.hazard_simulator
+    wind_timestamps = simulator.result_store.timestamps
+    simulator.run(hazard_system=HazardSystem.earthquake_example())
+    assert simulator.result_store is None
+    assert simulator.asset_system.result_store is None
+
+    # The survival matrix holds the states of both runs, not the stale vectorized store
+    survival, timestamps = scenario_generator.get_survival_matrix()
+    assert timestamps == sorted({*wind_timestamps, *simulator.timestamps})
+    assert survival.shape == (49, len(timestamps))
+
+
+@pytest.mark.parametrize(
+    "hazard_system",
+    [HazardSystem.earthquake_example, HazardSystem.flood_example, HazardSystem.wind_example],
+)
+def test_export_results_from_store(tmp_path, hazard_system):
+    per_asset = HazardSimulator(asset_system=get_asset_grid())
+    per_asset.run(hazard_system=hazard_system())
+    per_asset.asset_system.export_results(tmp_path / "per_asset.db")
+    simulator = run_vectorized(hazard_system())
+    simulator.asset_system.export_results(tmp_path / "vectorized.db")
+
+    query = "SELECT * FROM assetstatetable ORDER BY asset_name, timestamp"
+    with sqlite3.connect(tmp_path / "per_asset.db") as conn:
+        expected = conn.execute(query).fetchall()
+    with sqlite3.connect(tmp_path / "vectorized.db") as conn:
+        actual = conn.execute(query).fetchall()
+    assert len(expected) == len(actual) == 49
+    for expected_row, actual_row in zip(expected, actual):
+        assert expected_row[1:3] == actual_row[1:3]
+        for expected_value, actual_value in zip(expected_row[5:], actual_row[5:]):
+            if expected_value is None:
+                assert actual_value is None
+            else:
+                assert actual_value == pytest.approx(expected_value, rel=1e-9, abs=1e-9)
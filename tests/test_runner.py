@@ -1,4 +1,15 @@
-from erad.models.asset import Asset
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from infrasys.quantities import Distance
+from shapely.geometry import Point
+import pytest
+
+from erad.constants import DEFAULT_HEIGHTS_M, HAZARD_PARAMETER_UNITS
+from erad.engine import PROBABILITY_MODELS
+from erad.models.asset import Asset, AssetState
+from erad.models.hazard import WindModel
+from erad.enums import AssetTypes
 from erad.runner import HazardSimulator
 from erad.systems.asset_system import AssetSystem
 from erad.systems.hazard_system import HazardSystem
@@ -37,3 +48,110 @@ def test_flood_simulation(tmp_path):
     hazard_scenario.run(hazard_system=HazardSystem.flood_example())
     hazard_scenario.asset_system.export_results(tmp_path / "test_flood_simulation.db")
     assert (tmp_path / "test_flood_simulation.db").exists()
+
+
+def get_asset_grid(
+    latitude: float, longitude: float, spacing: float, size: int = 7
+) -> AssetSystem:
+    asset_types = list(AssetTypes)
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    for i in range(size):
+        for j in range(size):
+            asset_type = asset_types[(i * size + j) % len(asset_types)]
+            asset_system.add_component(
+                Asset(
+                    name=f"asset_{i}_{j}",
+                    asset_type=asset_type,
+                    distribution_asset=uuid4(),
+                    height=Distance(DEFAULT_HEIGHTS_M[asset_type], "meter"),
+                    latitude=latitude + (i - size // 2) * spacing,
+                    longitude=longitude + (j - size // 2) * spacing,
+                    asset_state=[],
+                )
+            )
+    return asset_system
+
+
+def assert_same_asset_states(expected: AssetSystem, actual: AssetSystem):
+    expected_assets = sorted(expected.get_components(Asset), key=lambda x: x.name)
+    actual_assets = sorted(actual.get_components(Asset), key=lambda x: x.name)
+    for expected_asset, actual_asset in zip(expected_assets, actual_assets):
+        assert len(expected_asset.get_asset_states()) == len(actual_asset.get_asset_states())
+        for expected_state, actual_state in zip(
+            sorted(expected_asset.get_asset_states(), key=lambda x: x.timestamp),
+            sorted(actual_asset.get_asset_states(), key=lambda x: x.timestamp),
+        ):
+            assert expected_state.timestamp == actual_state.timestamp
+            assert actual_state.survival_probability == pytest.approx(
+                expected_state.survival_probability, abs=1e-9
+            )
+            for param, unit in HAZARD_PARAMETER_UNITS.items():
+                expected_model = getattr(expected_state, param)
+                actual_model = getattr(actual_state, param)
+                assert (expected_model is None) == (actual_model is None)
+                if expected_model is None:
+                    continue
+                _, quantity_name, _ = PROBABILITY_MODELS[param]
+                expected_value = getattr(expected_model, quantity_name).to(unit).magnitude
+                actual_value = getattr(actual_model, quantity_name).to(unit).magnitude
+                assert actual_value == pytest.approx(expected_value, rel=1e-9, abs=1e-9)
+                assert actual_model.survival_probability == pytest.approx(
+                    expected_model.survival_probability, abs=1e-9
+                )
+
+
+@pytest.mark.parametrize(
+    "hazard_system, latitude, longitude, spacing",
+    [
+        (HazardSystem.earthquake_example, 36.59, -120.92, 0.5),
+        (HazardSystem.fire_example, 36.59, -120.92, 0.01),
+        (HazardSystem.flood_example, 36.59, -120.92, 0.01),
+        (HazardSystem.wind_example, 36.60, -121.93, 2.0),
+        (HazardSystem.multihazard_example, 36.59, -120.92, 0.01),
+    ],
+)
+def test_vectorized_engine_matches_per_asset(hazard_system, latitude, longitude, spacing):
+    hazard = hazard_system()
+    per_asset = HazardSimulator(asset_system=get_asset_grid(latitude, longitude, spacing))
+    per_asset.run(hazard_system=hazard)
+    vectorized = HazardSimulator(asset_system=get_asset_grid(latitude, longitude, spacing))
+    vectorized.run(hazard_system=hazard, engine="vectorized")
+    assert_same_asset_states(per_asset.asset_system, vectorized.asset_system)
+
+
+def test_unsupported_engine():
+    with pytest.raises(ValueError):
+        HazardSimulator(asset_system=get_asset_system()).run(
+            hazard_system=HazardSystem.wind_example(), engine="unknown"
+        )
+
+
+def get_wind_track(number_of_timestamps: int) -> HazardSystem:
+    hazard_system = HazardSystem(auto_add_composed_components=True)
+    for i in range(number_of_timestamps):
+        wind_model = WindModel.example().model_copy(
+            update={
+                "timestamp": datetime(2020, 1, 1) + timedelta(hours=i),
+                "center": Point(-121.93036 + 0.1 * i, 36.60144),
+            }
+        )
+        hazard_system.add_component(wind_model)
+    return hazard_system
+
+
+def test_asset_state_timestamp_index():
+    asset_system = get_asset_grid(36.60, -121.93, 0.5, size=3)
+    simulator = HazardSimulator(asset_system=asset_system)
+    simulator.run(hazard_system=get_wind_track(6))
+    simulator.run(hazard_system=get_wind_track(6))
+    assert len(list(asset_system.get_components(AssetState))) == 9 * 6
+    for asset in asset_system.get_components(Asset):
+        assert len(asset.asset_state) == 6
+        for asset_state in asset.asset_state:
+            assert asset.get_asset_state(asset_state.timestamp) is asset_state
+
+    asset = next(iter(asset_system.get_components(Asset)))
+    asset_state = AssetState(timestamp=datetime(2021, 1, 1))
+    asset.asset_state.append(asset_state)
+    assert asset.get_asset_state(datetime(2021, 1, 1)) is asset_state
+    assert asset.get_asset_state(datetime(2022, 1, 1)) is None
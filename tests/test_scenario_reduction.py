@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from infrasys.quantities import Distance
+from shapely.geometry import Point
+import numpy as np
+import pytest
+
+from erad.constants import DEFAULT_HEIGHTS_M
+from erad.runner import HazardScenarioGenerator
+from erad.models.hazard import WindModel
+from erad.models.asset import Asset
+from erad.quantities import Speed
+from erad.enums import AssetTypes
+from erad.systems.asset_system import AssetSystem
+from erad.systems.hazard_system import HazardSystem
+from erad.outage_matrix import OutageMatrix
+from erad.scenario_reduction import get_scenario_distances, reduce_scenarios
+from erad import scenario_reduction
+
+
+def get_scenario_generator() -> HazardScenarioGenerator:
+    """Vectorized generator of a coarse 7 x 7 asset grid in a two hour wind track."""
+    asset_types = list(AssetTypes)
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    for i in range(7):
+        for j in range(7):
+            asset_type = asset_types[(i * 7 + j) % len(asset_types)]
+            asset_system.add_component(
+                Asset(
+                    name=f"asset_{i}_{j}",
+                    asset_type=asset_type,
+                    distribution_asset=uuid4(),
+                    height=Distance(DEFAULT_HEIGHTS_M[asset_type], "meter"),
+                    latitude=36.60 + (i - 3) * 2.0,
+                    longitude=-121.93 + (j - 3) * 2.0,
+                    asset_state=[],
+                )
+            )
+    hazard_system = HazardSystem(auto_add_composed_components=True)
+    for i in range(2):
+        hazard_system.add_component(
+            WindModel.example().model_copy(
+                update={
+                    "timestamp": datetime(2020, 1, 1) + timedelta(hours=i),
+                    "center": Point(-121.93036 + 0.1 * i, 36.60144),
+                    "max_wind_speed": Speed(50, "miles/hour"),
+                }
+            )
+        )
+    return HazardScenarioGenerator(
+        asset_system=asset_system, hazard_system=hazard_system, engine="vectorized"
+    )
+
+
+def get_outage_matrix(first_failures: list[list[int]]) -> OutageMatrix:
+    first_failures = np.array(first_failures)
+    return OutageMatrix(
+        first_failures,
+        [uuid4() for _ in range(first_failures.shape[1])],
+        [datetime(2024, 1, 1, hour) for hour in range(3)],
+    )
+
+
+def test_scenario_distances():
+    outage_matrix = get_outage_matrix([[-1, -1, -1], [0, -1, -1], [1, 2, -1], [-1, -1, 0]])
+    distances = get_scenario_distances(outage_matrix)
+    assert distances.tolist() == [[0, 1, 2, 1], [1, 0, 1, 2], [2, 1, 0, 3], [1, 2, 3, 0]]
+
+    distances = get_scenario_distances(outage_matrix, np.array([1.0, 10.0, 100.0]))
+    assert distances[2].tolist() == [11, 10, 0, 111]
+
+
+def test_scenario_reduction_limit(monkeypatch):
+    outage_matrix = get_outage_matrix([[-1, -1, -1], [0, -1, -1], [1, 2, -1], [0, -1, -1]])
+    monkeypatch.setattr(scenario_reduction, "MAX_REDUCTION_SCENARIOS", 3)
+    with pytest.raises(ValueError, match="limited to 3 scenarios"):
+        get_scenario_distances(outage_matrix)
+    # The limit applies to the distinct scenarios
+    assert reduce_scenarios(outage_matrix, 2).counts.sum() == 4
+
+
+@pytest.mark.parametrize("method", ["fast_forward", "k_medoids"])
+def test_reduce_scenarios(method):
+    # Mostly quiet scenarios, a cluster where asset 0 fails and one rare outage of asset 3
+    rows = [[-1, -1, -1, -1]] * 6 + [[0, -1, -1, -1]] * 3 + [[0, 1, -1, -1], [-1, -1, -1, 2]]
+    outage_matrix = get_outage_matrix(rows)
+
+    reduced = reduce_scenarios(outage_matrix, 2, method)
+    assert reduced.first_failures.tolist() == [[-1, -1, -1, -1], [0, -1, -1, -1]]
+    assert reduced.counts.tolist() == [7, 4]
+    assert reduced.sample_weights.tolist() == pytest.approx([7 / 11, 4 / 11])
+
+    # Weighting asset 3 by its load makes its outage a scenario of its own
+    loads = {outage_matrix.component_uuids[3]: 100.0}
+    reduced = reduce_scenarios(outage_matrix, 2, method, loads)
+    assert reduced.first_failures.tolist() == [[-1, -1, -1, -1], [-1, -1, -1, 2]]
+    assert reduced.counts.tolist() == [10, 1]
+
+    reduced = reduce_scenarios(outage_matrix, 10, method)
+    assert reduced.number_of_samples == 4
+    assert reduced.counts.sum() == 11
+
+
+def test_reduced_outage_matrix():
+    scenario_generator = get_scenario_generator()
+    unique = scenario_generator.unique_outage_matrix(1_000, seed=2)
+    reduced = scenario_generator.reduced_outage_matrix(20, 1_000, seed=2, method="k_medoids")
+    assert reduced.number_of_samples == min(20, unique.number_of_samples)
+    assert reduced.counts.sum() == 1_000
+    assert reduced.sample_weights.sum() == pytest.approx(1.0)
+    assert {row.tobytes() for row in reduced.first_failures} <= {
+        row.tobytes() for row in unique.first_failures
+    }
+
+    with pytest.raises(ValueError):
+        reduce_scenarios(unique, 5, "unknown")
@@ -0,0 +1,226 @@
+from datetime import datetime
+from uuid import uuid4
+
+from infrasys.quantities import Distance
+import numpy as np
+
+from erad.elevation import ElevationProvider
+from erad.runner import HazardScenarioGenerator
+from erad.analytics import FailureStatistics
+from erad.outage_matrix import OutageMatrix
+from erad.topology import MeshedTopology, RadialTopology
+from erad.models.asset import Asset
+from erad.enums import AssetTypes
+from erad.systems.asset_system import AssetSystem
+
+
+class FlatElevationProvider(ElevationProvider):
+    def get_elevations(self, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+        return np.zeros(len(latitude))
+
+
+def get_asset(name: str, asset_type: AssetTypes, connections=(), uuid=None) -> Asset:
+    return Asset(
+        name=name,
+        asset_type=asset_type,
+        distribution_asset=uuid or uuid4(),
+        connections=list(connections),
+        height=Distance(10, "meter"),
+        latitude=40.0,
+        longitude=-105.0,
+        asset_state=[],
+    )
+
+
+def get_feeder() -> tuple[AssetSystem, list[Asset]]:
+    """Feeder b0 - b1 - (b2, b3 - b4) with a substation at b0 and solar panels at b4."""
+    buses = [uuid4() for _ in range(5)]
+    assets = [get_asset("substation", AssetTypes.substation, [buses[0]])]
+    assets += [
+        get_asset(f"pole_{ii}", AssetTypes.distribution_poles, uuid=bus)
+        for ii, bus in enumerate(buses)
+    ]
+    assets += [
+        get_asset(f"line_{u}{v}", AssetTypes.distribution_overhead_lines, [buses[u], buses[v]])
+        for u, v in [(0, 1), (1, 2), (1, 3), (4, 3)]
+    ]
+    assets.append(get_asset("solar", AssetTypes.solar_panels, [buses[4]]))
+    asset_system = AssetSystem(auto_add_composed_components=True)
+    asset_system.add_components(*assets)
+    asset_system.set_elevations(FlatElevationProvider())
+    return asset_system, assets
+
+
+def test_radial_topology():
+    asset_system, assets = get_feeder()
+    topology = RadialTopology.from_asset_system(asset_system)
+    assert topology.number_of_nodes == 5
+    names = [asset.name for asset in assets]
+    index = {name: ii for ii, name in enumerate(names)}
+
+    first_failures = np.full((5, len(assets)), -1)
+    first_failures[1, index["solar"]] = 0
+    first_failures[2, index["line_13"]] = 1
+    first_failures[3, index["pole_1"]] = 2
+    first_failures[3, index["line_43"]] = 0
+    first_failures[4, index["substation"]] = 1
+    first_failures[4, index["pole_4"]] = 0
+    outage_matrix = OutageMatrix(
+        first_failures,
+        [asset.distribution_asset for asset in assets],
+        [datetime(2024, 1, 1, hour) for hour in range(3)],
+    )
+    propagated = topology.propagate(outage_matrix).first_failures
+
+    def outages(sample):
+        return {
+            names[ii]: int(propagated[sample, ii])
+            for ii in np.flatnonzero(propagated[sample] != -1)
+        }
+
+    assert outages(0) == {}
+    assert outages(1) == {"solar": 0}
+    assert outages(2) == {"line_13": 1, "pole_3": 1, "line_43": 1, "pole_4": 1, "solar": 1}
+    assert outages(3) == {
+        "line_43": 0,
+        "pole_4": 0,
+        "solar": 0,
+        "pole_1": 2,
+        "pole_2": 2,
+        "pole_3": 2,
+        "line_12": 2,
+        "line_13": 2,
+    }
+    assert outages(4) == {
+        **{name: 1 for name in names},
+        "pole_4": 0,
+        "solar": 0,
+    }
+
+    buses = {name: assets[index[name]].distribution_asset for name in ["pole_2", "pole_4"]}
+    customers = {buses["pole_2"]: 3, buses["pole_4"]: 5}
+    assert topology.get_customers_out(outage_matrix, customers).tolist() == [0, 0, 5, 8, 8]
+    assert topology.get_customers_out(outage_matrix, customers, 0).tolist() == [0, 0, 0, 5, 5]
+
+
+def test_connection_probabilities():
+    asset_system, assets = get_feeder()
+    topology = RadialTopology.from_asset_system(asset_system)
+    names = [asset.name for asset in assets]
+    rng = np.random.default_rng(4)
+    survival = 1 - 0.3 * rng.random((len(assets), 3))
+    survival[names.index("pole_2"), 2] = 0.0
+    timestamps = [datetime(2024, 1, 1, hour) for hour in range(3)]
+    uuids = [asset.distribution_asset for asset in assets]
+    statistics = FailureStatistics(survival, timestamps, uuids)
+
+    survived = dict(zip(names, np.cumprod(survival, axis=1)))
+    path_to_b3 = ["substation", "pole_0", "line_01", "pole_1", "line_13", "pole_3"]
+    connected = topology.get_connection_probabilities(statistics)
+    node = topology.node_index[str(assets[names.index("pole_3")].distribution_asset)]
+    assert np.allclose(connected[node], np.prod([survived[name] for name in path_to_b3], axis=0))
+    node = topology.node_index[str(assets[names.index("pole_2")].distribution_asset)]
+    assert connected[node, 2] == 0.0
+
+    asset_connected = topology.get_asset_connection_probabilities(statistics)
+    expected = np.prod([survived[name] for name in [*path_to_b3, "line_43"]], axis=0)
+    assert np.allclose(asset_connected[names.index("line_43")], expected)
+    assert np.allclose(
+        asset_connected[names.index("solar")], expected * survived["pole_4"] * survived["solar"]
+    )
+
+    # Sampled de-energizations of the propagation converge to the exact probabilities
+    rng = np.random.default_rng(0)
+    failed = rng.random((20_000, *survival.shape)) > survival
+    first_failures = HazardScenarioGenerator.get_first_failures(
+        failed.astype(float), np.full(survival.shape, 0.5)
+    )
+    outage_matrix = OutageMatrix(first_failures, uuids, timestamps)
+    propagated = topology.propagate(outage_matrix).first_failures
+    for timestamp_index in range(3):
+        in_service = (propagated == -1) | (propagated > timestamp_index)
+        assert np.allclose(
+            in_service.mean(axis=0), asset_connected[:, timestamp_index], atol=0.015
+        )
+
+    bus = assets[names.index("pole_4")].distribution_asset
+    assert np.allclose(
+        topology.get_expected_customers_out(statistics, {bus: 10}),
+        10 * (1 - connected[topology.node_index[str(bus)]]),
+    )
+
+
+def test_meshed_topology_matches_radial_topology():
+    asset_system, assets = get_feeder()
+    radial = RadialTopology.from_asset_system(asset_system)
+    meshed = MeshedTopology.from_asset_system(asset_system)
+    rng = np.random.default_rng(1)
+    first_failures = np.where(
+        rng.random((500, len(assets))) < 0.1, rng.integers(0, 3, (500, len(assets))), -1
+    )
+    outage_matrix = OutageMatrix(
+        first_failures,
+        [asset.distribution_asset for asset in assets],
+        [datetime(2024, 1, 1, hour) for hour in range(3)],
+    )
+    order = [meshed.node_index[node] for node in radial.nodes]
+    assert np.array_equal(
+        meshed.get_node_deenergization(outage_matrix)[:, order],
+        radial.get_node_deenergization(outage_matrix),
+    )
+    assert np.array_equal(
+        meshed.propagate(outage_matrix).first_failures,
+        radial.propagate(outage_matrix).first_failures,
+    )
+
+
+def test_meshed_topology():
+    asset_system, assets = get_feeder()
+    buses = [asset.distribution_asset for asset in assets if asset.name.startswith("pole")]
+    loop = get_asset("line_24", AssetTypes.distribution_overhead_lines, [buses[2], buses[4]])
+    second_source = get_asset("substation_4", AssetTypes.substation, [buses[4]])
+    assets += [loop, second_source]
+    asset_system.add_components(loop, second_source)
+    asset_system.set_elevations(FlatElevationProvider())
+    topology = MeshedTopology.from_asset_system(asset_system)
+    names = [asset.name for asset in assets]
+    index = {name: ii for ii, name in enumerate(names)}
+
+    first_failures = np.full((4, len(assets)), -1)
+    first_failures[1, index["line_13"]] = 0
+    first_failures[1, index["substation"]] = 1
+    first_failures[2, [index["substation"], index["substation_4"]]] = [0, 1]
+    first_failures[3, [index["line_01"], index["line_24"], index["line_43"]]] = [0, 0, 1]
+    outage_matrix = OutageMatrix(
+        first_failures,
+        [asset.distribution_asset for asset in assets],
+        [datetime(2024, 1, 1, hour) for hour in range(2)],
+    )
+    propagated = topology.propagate(outage_matrix).first_failures
+
+    def outages(sample):
+        return {
+            names[ii]: int(propagated[sample, ii])
+            for ii in np.flatnonzero(propagated[sample] != -1)
+        }
+
+    assert outages(0) == {}
+    # Both sources keep every bus energized through the loop
+    assert outages(1) == {"line_13": 0, "substation": 1}
+    assert outages(2) == {
+        **{name: 1 for name in names},
+        "substation": 0,
+    }
+    assert outages(3) == {
+        "line_01": 0,
+        "line_24": 0,
+        "line_43": 1,
+        "pole_1": 1,
+        "pole_2": 1,
+        "pole_3": 1,
+        "line_12": 1,
+        "line_13": 1,
+    }
+
+    customers = {buses[1]: 1, buses[3]: 2, buses[4]: 4}
+    assert topology.get_customers_out(outage_matrix, customers).tolist() == [0, 0, 7, 3]